@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class Api1Config(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api1"
+
+    def ready(self) -> None:
+        from .authentication import connect
+
+        connect()
@@ -0,0 +1,287 @@
+from abc import ABCMeta, abstractmethod
+from typing import Any, Callable, List, Optional, Sequence, Type
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Model, QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+from rest_framework import exceptions, filters, permissions, serializers, throttling
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.timings import timer
+
+from .compilers import compile_serializer
+from .conditions import Validators
+from .paginations import KeysetPagination
+from .querysets import optimize_queryset
+from .renderers import FastJSONRenderer
+
+
+class AsyncAPIView(View, metaclass=ABCMeta):
+    """非同期ORMでモデルを取得する読み取り専用の非同期APIビュー
+
+    ASGIで配信すると、データベースの応答やクライアントの受信を待つ間もワーカーのスレッドを占有しない
+    ため、1つのワーカーで多くの遅いクライアントを同時に処理できる。
+    Django REST frameworkのビューは同期ビューのため、クエリパラメーターの解析にはDjango REST
+    frameworkのリクエストを使用して、レスポンスは同期ビューと同じJSONレンダラーでレンダリングする。
+    同期ビューと同様に、認証、権限及びスロットリングを検査して、条件付きリクエストを評価する。
+    認証クラスなどは同期ORMを使用する可能性があるため、スレッドで検査する。
+    """
+
+    # モデルを取得するQuerySet
+    queryset: QuerySet
+    # シリアライザークラス
+    serializer_class: Type[serializers.Serializer]
+    # 結合するすべてのモデルで読み込むフィールド名
+    required_fields: Sequence[str] = ("updated_at",)
+    # レスポンスをレンダリングするレンダラー
+    renderer = FastJSONRenderer()
+    # 認証クラス
+    authentication_classes: Sequence[
+        Type[BaseAuthentication]
+    ] = api_settings.DEFAULT_AUTHENTICATION_CLASSES  # type: ignore[assignment]
+    # 権限クラス
+    permission_classes: Sequence[
+        Type[permissions.BasePermission]
+    ] = api_settings.DEFAULT_PERMISSION_CLASSES  # type: ignore[assignment]
+    # スロットリングクラス
+    throttle_classes: Sequence[
+        Type[throttling.BaseThrottle]
+    ] = api_settings.DEFAULT_THROTTLE_CLASSES  # type: ignore[assignment]
+
+    def get_queryset(self) -> QuerySet:
+        """モデルを取得するQuerySetを返却する。
+
+        Returns:
+            QuerySet。
+        """
+        return self.queryset.all()
+
+    def render(self, data: Any, status: int = 200) -> HttpResponse:
+        """データをJSONにレンダリングしたレスポンスを返却する。
+
+        Args:
+            data: レスポンスデータ。
+            status: HTTPステータスコード。
+        Returns:
+            レスポンス。
+        """
+        return HttpResponse(
+            self.renderer.render(data),
+            content_type=self.renderer.media_type,
+            status=status,
+        )
+
+    def initial(self, request: Request) -> None:
+        """リクエストを認証して、権限及びスロットリングを検査する。
+
+        Args:
+            request: Django REST frameworkのリクエストインスタンス。
+        Exceptions:
+            rest_framework.exceptions.APIException: 認証に失敗した場合、権限がない場合、
+                またはスロットリングされた場合。
+        """
+        # ユーザーを参照すると認証クラスでリクエストを認証
+        request.user
+        for permission in [cls() for cls in self.permission_classes]:
+            if not permission.has_permission(request, self):  # type: ignore[arg-type]
+                self.permission_denied(request, permission)
+        waits = [
+            throttle.wait()
+            for throttle in [cls() for cls in self.throttle_classes]
+            if not throttle.allow_request(request, self)  # type: ignore[arg-type]
+        ]
+        if waits:
+            durations = [wait for wait in waits if wait is not None]
+            raise exceptions.Throttled(max(durations, default=None))
+
+    def check_object_permissions(self, request: Request, instance: Model) -> None:
+        """モデルインスタンスに対する権限を検査する。
+
+        Args:
+            request: Django REST frameworkのリクエストインスタンス。
+            instance: 取得したモデルインスタンス。
+        Exceptions:
+            rest_framework.exceptions.APIException: 権限がない場合。
+        """
+        for permission in [cls() for cls in self.permission_classes]:
+            if not permission.has_object_permission(
+                request, self, instance  # type: ignore[arg-type]
+            ):
+                self.permission_denied(request, permission)
+
+    def permission_denied(
+        self, request: Request, permission: permissions.BasePermission
+    ) -> None:
+        """権限がないことを示す例外をスローする。
+
+        Args:
+            request: Django REST frameworkのリクエストインスタンス。
+            permission: 権限を拒否した権限クラスのインスタンス。
+        Exceptions:
+            rest_framework.exceptions.NotAuthenticated: 認証されていない場合。
+            rest_framework.exceptions.PermissionDenied: 認証されている場合。
+        """
+        if request.authenticators and not request.successful_authenticator:
+            raise exceptions.NotAuthenticated()
+        raise exceptions.PermissionDenied(
+            getattr(permission, "message", None), getattr(permission, "code", None)
+        )
+
+    def handle_exception(
+        self, request: Request, e: exceptions.APIException
+    ) -> HttpResponse:
+        """Django REST frameworkの例外をレスポンスに変換する。
+
+        Args:
+            request: Django REST frameworkのリクエストインスタンス。
+            e: Django REST frameworkの例外。
+        Returns:
+            レスポンス。
+        """
+        headers = {}
+        if isinstance(
+            e, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)
+        ):
+            # 同期ビューと同様に、認証方法を提示できない場合は403を返却
+            authenticators = request.authenticators
+            if authenticators:
+                authenticator: Any = authenticators[0]
+                headers["WWW-Authenticate"] = authenticator.authenticate_header(request)
+            else:
+                e.status_code = exceptions.PermissionDenied.status_code
+        wait = getattr(e, "wait", None)
+        if isinstance(e, exceptions.Throttled) and wait is not None:
+            headers["Retry-After"] = str(int(wait))
+        detail = e.detail
+        if not isinstance(detail, (list, dict)):
+            detail = {"detail": detail}
+        response = self.render(detail, e.status_code)
+        for name, value in headers.items():
+            if value:
+                response[name] = value
+        return response
+
+    async def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+        drf_request = Request(
+            request,
+            authenticators=[cls() for cls in self.authentication_classes],
+        )
+        try:
+            await sync_to_async(self.initial)(drf_request)
+            return await self.aget(drf_request, *args, **kwargs)
+        except exceptions.APIException as e:
+            return self.handle_exception(drf_request, e)
+
+    @abstractmethod
+    async def aget(self, request: Request, *args: Any, **kwargs: Any) -> Any:
+        """GETメソッドのリクエストを処理する。
+
+        Args:
+            request: Django REST frameworkのリクエストインスタンス。
+        Returns:
+            レスポンス。
+        Exceptions:
+            rest_framework.exceptions.APIException: リクエストを処理できない場合。
+        """
+
+
+class AsyncListAPIView(AsyncAPIView):
+    """非同期の一覧取得APIビュー
+
+    シリアライザーをコンパイルできる場合は、`aiterator`で取得した名前付きタプルから、モデル
+    インスタンスを構築せずにシリアライズする。
+    """
+
+    # 絞り込みに使用するフィルターバックエンド
+    filter_backends: Sequence[Type[filters.BaseFilterBackend]] = ()
+    # ページネーションクラス
+    pagination_class: Optional[Type[KeysetPagination]] = None
+
+    def filter_queryset(self, request: Request, queryset: QuerySet) -> QuerySet:
+        """フィルターバックエンドでQuerySetを絞り込む。
+
+        Args:
+            request: Django REST frameworkのリクエストインスタンス。
+            queryset: 絞り込むQuerySet。
+        Returns:
+            絞り込んだQuerySet。
+        """
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(
+                request, queryset, self  # type: ignore[arg-type]
+            )
+        return queryset
+
+    async def aget(self, request: Request, *args: Any, **kwargs: Any) -> Any:
+        serializer = self.serializer_class()
+        queryset = optimize_queryset(
+            self.get_queryset(), serializer, defer=True, required=self.required_fields
+        )
+        queryset = self.filter_queryset(request, queryset)
+        validators = Validators.for_collection(request, queryset)
+        response = validators.evaluate(request)
+        if response is not None:
+            return response
+        paginator = self.pagination_class() if self.pagination_class else None
+        compiled = compile_serializer(serializer, queryset.model)
+        represent: Callable[[Any], Any] = serializer.to_representation
+        if compiled is not None:
+            # キーセットページネーションは、並び替えキーの値で次のページのカーソルを構築
+            extra: List[str] = []
+            if paginator is not None:
+                keys = paginator.get_paginator(request, queryset).get_keys(queryset)
+                extra = [name for name, _ in keys]
+            queryset = compiled.values(queryset, *extra)
+            represent = compiled.to_representation
+        if paginator is not None:
+            queryset = paginator.prepare(queryset, request)
+        rows = [row async for row in self._iterate(queryset)]
+        if paginator is not None:
+            rows = paginator.finish(rows)
+        with timer("serialize"):
+            data: Any = [represent(row) for row in rows]
+        if paginator is not None:
+            data = paginator.get_paginated_data(data)
+        return validators.apply(self.render(data))
+
+    def _iterate(self, queryset: QuerySet) -> Any:
+        """QuerySetの行を非同期に反復する。
+
+        `aiterator`は`prefetch_related`をサポートしないため、その場合はすべての行を取得してから
+        反復する。
+        """
+        if queryset._prefetch_related_lookups:  # type: ignore[attr-defined]
+            return queryset
+        return queryset.aiterator()  # type: ignore[attr-defined]
+
+
+class AsyncRetrieveAPIView(AsyncAPIView):
+    """非同期の詳細取得APIビュー"""
+
+    # モデルインスタンスを検索するフィールド名
+    lookup_field = "pk"
+    # モデルインスタンスを検索する値を受け取るURLのキーワード引数
+    lookup_url_kwarg: Optional[str] = None
+
+    async def aget(self, request: Request, *args: Any, **kwargs: Any) -> Any:
+        serializer = self.serializer_class()
+        queryset = optimize_queryset(
+            self.get_queryset(), serializer, defer=True, required=self.required_fields
+        )
+        value = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            instance = await queryset.aget(**{self.lookup_field: value})
+        except (ObjectDoesNotExist, ValueError):
+            raise exceptions.NotFound()
+        await sync_to_async(self.check_object_permissions)(request, instance)
+        validators = Validators.for_object(request, instance, queryset)
+        response = validators.evaluate(request)
+        if response is not None:
+            return response
+        with timer("serialize"):
+            data = serializer.to_representation(instance)
+        return validators.apply(self.render(data))
@@ -0,0 +1,131 @@
+import hashlib
+from typing import Any, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AbstractBaseUser
+from django.core.cache import cache
+from django.db import models, transaction
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+# 認証したユーザーのうち、キャッシュするフィールド(主キーに加えて、認可に使用するフィールドのみ)
+CACHED_USER_FIELDS = ("email", "name", "is_active", "is_staff", "is_superuser")
+
+
+def get_cached_user_fields(user_model: Type[models.Model]) -> List[str]:
+    """ユーザーモデルのフィールドのうち、キャッシュするフィールドの属性名を返却する。
+
+    Args:
+        user_model: ユーザーモデルクラス。
+    Returns:
+        主キー及び`CACHED_USER_FIELDS`のフィールドの属性名(モデルのフィールドの順)。
+    """
+    return [
+        field.attname
+        for field in user_model._meta.concrete_fields  # type: ignore[attr-defined]
+        if field.primary_key or field.attname in CACHED_USER_FIELDS
+    ]
+
+
+def get_user_cache_key(user_id: Any) -> str:
+    """認証したユーザーを保存するキャッシュのキーを返却する。
+
+    Args:
+        user_id: ユーザーID(Eメールアドレス)。
+    Returns:
+        キャッシュのキー。
+    """
+    digest = hashlib.md5(str(user_id).encode("utf-8"), usedforsecurity=False)
+    return f"jwt-user:{digest.hexdigest()}"
+
+
+def invalidate_user(
+    sender: Any,
+    instance: AbstractBaseUser,
+    using: Optional[str] = None,
+    **kwargs: Any,
+) -> None:
+    """保存または削除されたユーザーをキャッシュから削除する。
+
+    コミットする前に他のリクエストが変更前のユーザーをキャッシュする場合があるため、コミットした後で
+    もう一度削除する。
+
+    Args:
+        instance: 保存または削除されたユーザーモデルインスタンス。
+        using: ユーザーを保存または削除したデータベースのエイリアス。
+    """
+    key = get_user_cache_key(getattr(instance, api_settings.USER_ID_FIELD))
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key), using=using)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """ユーザーをキャッシュするJWT認証
+
+    トークンを検証した後、ユーザーを`JWT_USER_CACHE_TTL`設定の秒数だけキャッシュすることで、
+    リクエストごとにユーザーを取得するクエリを実行しない。パスワードのハッシュなどを共有キャッシュに
+    保存しないように、主キー及び認可に使用するフィールドの値のみをキャッシュして、それ以外のフィールドの
+    読み込みを遅延したユーザーを構築する。
+    ユーザーが保存(無効化を含む)または削除されると、キャッシュからユーザーを削除する。ただし、
+    QuerySetの`update`はシグナルを送信しないため、`update`で無効化したユーザーは最大
+    `JWT_USER_CACHE_TTL`設定の秒数だけ認証される。`update`でユーザーを無効化する場合は、
+    `invalidate_user`でキャッシュから削除すること。
+    `JWT_STATELESS_SAFE_METHODS`設定が`True`の場合、安全なメソッド(`GET`など)のリクエストでは
+    データベースやキャッシュを参照せずに、トークンのクレームからユーザーを構築する。
+    """
+
+    def authenticate(self, request: Request) -> Optional[Tuple[Any, Token]]:
+        self.stateless = (
+            getattr(settings, "JWT_STATELESS_SAFE_METHODS", False)
+            and request.method in SAFE_METHODS
+        )
+        return super().authenticate(request)
+
+    def get_user(self, validated_token: Token) -> Any:
+        """トークンからユーザーを返却する。
+
+        Args:
+            validated_token: 検証したトークン。
+        Returns:
+            ユーザーモデルインスタンス。安全なメソッドのリクエストをステートレスに認証する場合は、
+            トークンのクレームから構築したトークンユーザー。
+        Exceptions:
+            rest_framework_simplejwt.exceptions.InvalidToken: トークンにユーザーIDが含まれていない場合。
+            rest_framework.exceptions.AuthenticationFailed: ユーザーが存在しないか、無効な場合。
+        """
+        if self.stateless:
+            if api_settings.USER_ID_CLAIM not in validated_token:
+                raise InvalidToken(
+                    "Token contained no recognizable user identification"
+                )
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        key = get_user_cache_key(user_id)
+        user_model = get_user_model()
+        names = get_cached_user_fields(user_model)
+        values = cache.get(key)
+        if isinstance(values, list) and len(values) == len(names):
+            return user_model.from_db(None, names, values)
+        user = super().get_user(validated_token)
+        cache.set(
+            key,
+            [getattr(user, name) for name in names],
+            getattr(settings, "JWT_USER_CACHE_TTL", 60),
+        )
+        return user
+
+
+def connect() -> None:
+    """ユーザーの保存と削除を受信して、キャッシュからユーザーを削除するシグナルハンドラーを登録する。"""
+    from django.db.models.signals import post_delete, post_save
+
+    user_model = get_user_model()
+    for signal in (post_save, post_delete):
+        signal.connect(
+            invalidate_user, sender=user_model, dispatch_uid="api1.invalidate_user"
+        )
@@ -0,0 +1,262 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+
+from books.caches import classification_detail_cache
+from books.facets import FacetKey, apply_deltas, diff
+from books.isbn import invalidate_isbns, normalize_isbn
+from books.models import Book
+from books.search import index_books
+from core.caches import TableVersion
+from divisions.caches import division_cache
+
+from .serializers import BookWriteOnlySerializer
+
+# 書籍の一括操作の種類
+CREATE, UPDATE, DELETE = "create", "update", "delete"
+
+
+@dataclass
+class BookOperation:
+    """書籍の一括操作の1件"""
+
+    # 一括操作のリスト内の位置
+    index: int
+    # 操作の種類
+    op: str
+    # 書籍ID
+    id: Optional[str] = None
+    # 書き込み専用書籍シリアライザーが検証したデータ
+    validated_data: Dict[str, Any] = field(default_factory=dict)
+    # 操作の結果を示すHTTPステータスコード
+    status: Optional[int] = None
+    # エラー
+    errors: Any = None
+
+    def fail(self, status_code: int, errors: Any) -> None:
+        """操作が失敗したことを記録する。
+
+        Args:
+            status_code: 失敗の理由を示すHTTPステータスコード。
+            errors: エラー。
+        """
+        self.status, self.errors = status_code, errors
+
+    def result(self) -> Dict[str, Any]:
+        """操作の結果を返却する。
+
+        Returns:
+            操作の結果。
+        """
+        result = {
+            "index": self.index,
+            "op": self.op,
+            "id": self.id,
+            "status": self.status,
+        }
+        if self.errors is not None:
+            result["errors"] = self.errors
+        return result
+
+
+class BookBulkWriter:
+    """書籍一括書き込み
+
+    書籍の登録、更新及び削除操作のリストを検証して、1つのトランザクション内で一括して書き込む。
+    書籍分類詳細及び部署は、データベースに問い合わせずにキャッシュから取得する。
+    1件でも検証に失敗した操作がある場合は、どの操作も書き込まない。
+    """
+
+    def __init__(self, batch_size: int) -> None:
+        """イニシャライザ
+
+        Args:
+            batch_size: 1回のINSERTまたはUPDATEで書き込む書籍の数。
+        """
+        self.batch_size = batch_size
+
+    def execute(self, items: Sequence[Any]) -> List[BookOperation]:
+        """書籍の一括操作を検証して書き込む。
+
+        Args:
+            items: 書籍の一括操作のリスト。
+        Returns:
+            一括操作の結果のリスト。
+        """
+        operations = [self._validate(index, item) for index, item in enumerate(items)]
+        books = self._resolve(operations)
+        if any(operation.errors is not None for operation in operations):
+            # 検証に成功した操作も、他の操作が失敗したため書き込まない
+            for operation in operations:
+                if operation.errors is None:
+                    operation.status = status.HTTP_424_FAILED_DEPENDENCY
+            return operations
+        self._write(operations, books)
+        return operations
+
+    def _validate(self, index: int, item: Any) -> BookOperation:
+        """書籍の一括操作の1件を検証する。
+
+        Args:
+            index: 一括操作のリスト内の位置。
+            item: 書籍の一括操作。
+        Returns:
+            書籍の一括操作。
+        """
+        if not isinstance(item, dict):
+            operation = BookOperation(index=index, op="")
+            operation.fail(status.HTTP_400_BAD_REQUEST, "Expected an object.")
+            return operation
+        data = dict(item)
+        book_id = data.pop("id", None)
+        operation = BookOperation(
+            index=index,
+            op=data.pop("op", CREATE),
+            id=str(book_id) if book_id is not None else None,
+        )
+        if operation.op not in (CREATE, UPDATE, DELETE):
+            operation.fail(status.HTTP_400_BAD_REQUEST, {"op": "Invalid operation."})
+        elif operation.op != CREATE and not operation.id:
+            operation.fail(
+                status.HTTP_400_BAD_REQUEST, {"id": "This field is required."}
+            )
+        elif operation.op != DELETE:
+            serializer = BookWriteOnlySerializer(
+                data=data, partial=operation.op == UPDATE, context={"bulk": True}
+            )
+            if serializer.is_valid():
+                operation.validated_data = serializer.validated_data
+            else:
+                operation.fail(status.HTTP_400_BAD_REQUEST, serializer.errors)
+        return operation
+
+    def _resolve(self, operations: List[BookOperation]) -> Dict[str, Book]:
+        """操作が参照する書籍分類詳細、部署及び書籍を取得して、検証したデータに設定する。
+
+        Args:
+            operations: 書籍の一括操作のリスト。
+        Returns:
+            更新または削除する書籍IDをキー、書籍モデルインスタンスを値とした辞書。
+        """
+        valid = [op for op in operations if op.errors is None]
+        classification_details = classification_detail_cache.all()
+        divisions = division_cache.all()
+        ids = [op.id for op in valid if op.op != CREATE]
+        books = Book.objects.in_bulk(ids) if ids else {}
+
+        seen = set()
+        for op in valid:
+            data = op.validated_data
+            if op.op != CREATE:
+                if op.id in seen:
+                    op.fail(status.HTTP_400_BAD_REQUEST, {"id": "Duplicate book id."})
+                    continue
+                seen.add(op.id)
+                if op.id not in books:
+                    op.fail(status.HTTP_404_NOT_FOUND, "Book doesn't exist")
+                    continue
+            if "classification_detail" in data:
+                code = data["classification_detail"]
+                if code not in classification_details:
+                    op.fail(
+                        status.HTTP_404_NOT_FOUND, "Classification detail doesn't exist"
+                    )
+                    continue
+                data["classification_detail"] = classification_details[code]
+            if "division" in data:
+                if data["division"] not in divisions:
+                    op.fail(status.HTTP_404_NOT_FOUND, "Division doesn't exist")
+                    continue
+                data["division"] = divisions[data["division"]]
+        self._check_isbns([op for op in valid if op.errors is None])
+        return books
+
+    def _check_isbns(self, operations: List[BookOperation]) -> None:
+        """登録または更新する書籍のISBNが、他の書籍と重複していないか1回のクエリで検証する。
+
+        Args:
+            operations: 検証に成功した書籍の一括操作のリスト。
+        """
+        isbns: Dict[str, List[BookOperation]] = {}
+        for op in operations:
+            isbn13 = normalize_isbn(op.validated_data.get("isbn"))
+            if isbn13 is not None:
+                isbns.setdefault(isbn13, []).append(op)
+        if not isbns:
+            return
+        owners = dict(
+            Book.objects.filter(isbn13__in=list(isbns)).values_list("isbn13", "id")
+        )
+        for isbn13, ops in isbns.items():
+            for i, op in enumerate(ops):
+                owner = owners.get(isbn13)
+                if 0 < i or (owner is not None and owner != op.id):
+                    op.fail(
+                        status.HTTP_400_BAD_REQUEST,
+                        {"isbn": ["A book with this ISBN already exists."]},
+                    )
+
+    @transaction.atomic
+    def _write(self, operations: List[BookOperation], books: Dict[str, Book]) -> None:
+        """検証した書籍の一括操作を書き込む。
+
+        Args:
+            operations: 書籍の一括操作のリスト。
+            books: 更新または削除する書籍IDをキー、書籍モデルインスタンスを値とした辞書。
+        """
+        created: List[Book] = []
+        updated: List[Book] = []
+        update_fields = {"updated_at"}
+        deleted: List[str] = []
+        deltas: "Counter[FacetKey]" = Counter()
+        # 変更前と変更後のISBN
+        isbns: List[Optional[str]] = []
+        now = timezone.now()
+        for op in operations:
+            if op.op == CREATE:
+                book = Book(**op.validated_data)
+                book.update_isbn13()
+                op.id, op.status = str(book.id), status.HTTP_201_CREATED
+                created.append(book)
+                deltas.update(diff(None, book.get_facet_key()))
+            elif op.op == UPDATE:
+                book = books[op.id]
+                old_key = book.get_facet_key()
+                for name, value in op.validated_data.items():
+                    setattr(book, name, value)
+                isbns.append(book.isbn13)
+                book.update_isbn13()
+                isbns.append(book.isbn13)
+                deltas.update(diff(old_key, book.get_facet_key()))
+                book.updated_at = now
+                update_fields.update(op.validated_data)
+                if "isbn" in op.validated_data:
+                    update_fields.add("isbn13")
+                op.status = status.HTTP_200_OK
+                updated.append(book)
+            else:
+                op.status = status.HTTP_204_NO_CONTENT
+                deleted.append(op.id)
+        if created:
+            Book.objects.bulk_create(created, batch_size=self.batch_size)
+        if updated:
+            Book.objects.bulk_update(
+                updated, sorted(update_fields), batch_size=self.batch_size
+            )
+        # 一括登録及び一括更新はシグナルを送信しないため、書籍集計、全文検索インデックス、
+        # ISBNのキャッシュ及びテーブルのバージョンを明示的に更新
+        apply_deltas(deltas)
+        invalidate_isbns(isbns)
+        if created or updated:
+            TableVersion.for_model(Book).invalidate()
+        indexed = [str(book.id) for book in created + updated]
+        for start in range(0, len(indexed), self.batch_size):
+            end = start + self.batch_size
+            index_books(indexed[start:end])
+        for start in range(0, len(deleted), self.batch_size):
+            end = start + self.batch_size
+            Book.objects.filter(pk__in=deleted[start:end]).delete()
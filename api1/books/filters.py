@@ -0,0 +1,42 @@
+from typing import Any, cast
+
+from django.db.models import QuerySet
+from rest_framework import exceptions, filters
+from rest_framework.request import Request
+
+from books.forms import BookFilterForm
+from books.models import BookQuerySet
+from books.search import search_books
+
+
+class BookFilter(filters.BaseFilterBackend):
+    """書籍絞り込みフィルター
+
+    書籍一覧ページと共通の書籍絞り込みフォームで、クエリパラメーターを検証して書籍を絞り込む。
+    """
+
+    def filter_queryset(
+        self, request: Request, queryset: QuerySet, view: Any
+    ) -> QuerySet:
+        form = BookFilterForm(request.query_params)
+        if not form.is_valid():
+            raise exceptions.ValidationError(form.errors)
+        return form.filter_queryset(cast(BookQuerySet, queryset))
+
+
+class BookSearchFilter(filters.BaseFilterBackend):
+    """書籍全文検索フィルター
+
+    `?q=`で指定された語で書籍を全文検索して、関連度の高い順に並び替える。
+    """
+
+    # 検索する語を指定するクエリパラメーター
+    search_param = "q"
+
+    def filter_queryset(
+        self, request: Request, queryset: QuerySet, view: Any
+    ) -> QuerySet:
+        q = request.query_params.get(self.search_param, "").strip()
+        if not q:
+            return queryset
+        return search_books(queryset, q)
@@ -0,0 +1,10 @@
+from ..paginations import KeysetPagination
+
+
+class BookPagination(KeysetPagination):
+    """書籍キーセットページネーション"""
+
+    # 書籍IDはULIDで、辞書順に並び替えると登録順になる
+    ordering = ("id",)
+    # 並び替えキーに指定できるフィールド
+    ordering_fields = ("id", "title")
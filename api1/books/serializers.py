@@ -1,8 +1,10 @@
-from typing import Any
+from typing import Any, Optional
 
 from rest_framework import exceptions, serializers
 
+from books.caches import classification_cache, classification_detail_cache
 from books.models import Book, Classification, ClassificationDetail
+from divisions.caches import division_cache
 from divisions.models import Division
 
 
@@ -72,10 +74,10 @@ class ClassificationDetailUpdateSerializer(serializers.ModelSerializer):
         Exceptions:
             rest_framework.exceptions.NotFound: 書籍分類が見つからない場合。
         """
-        try:
-            return Classification.objects.get(code=classification_code)
-        except Classification.DoesNotExist:
+        classification = classification_cache.get(classification_code)
+        if classification is None:
             raise exceptions.NotFound(detail="Classification doesn't exist")
+        return classification
 
     def update(
         self, instance: ClassificationDetail, validated_data: Any
@@ -237,6 +239,27 @@ class BookWriteOnlySerializer(serializers.ModelSerializer):
             "disposed_at",
         )
 
+    def validate_isbn(self, value: Optional[str]) -> Optional[str]:
+        """ISBNが他の書籍と重複していないか検証する。
+
+        書籍の一括操作は、すべての操作のISBNをまとめて検証するため、ここでは検証しない。
+
+        Args:
+            value: ISBN。
+        Returns:
+            ISBN。
+        Exceptions:
+            rest_framework.exceptions.ValidationError: 同じISBNの書籍が登録されている場合。
+        """
+        if self.context.get("bulk"):
+            return value
+        queryset = Book.objects.with_isbn(value)
+        if isinstance(self.instance, Book):
+            queryset = queryset.exclude(pk=self.instance.pk)
+        if queryset.exists():
+            raise serializers.ValidationError("A book with this ISBN already exists.")
+        return value
+
     def _get_classification_detail(self, code: str) -> ClassificationDetail:
         """書籍分類詳細コードから書籍分類詳細モデルインスタンスを取得して返却する。
 
@@ -247,10 +270,10 @@ class BookWriteOnlySerializer(serializers.ModelSerializer):
         Exceptions:
             rest_framework.exceptions.NotFound: 書籍分類詳細が見つからない場合。
         """
-        try:
-            return ClassificationDetail.objects.get(code=code)
-        except ClassificationDetail.DoesNotExist:
+        classification_detail = classification_detail_cache.get(code)
+        if classification_detail is None:
             raise exceptions.NotFound(detail="Classification detail doesn't exist")
+        return classification_detail
 
     def _get_division(self, code: str) -> Division:
         """部署コードから部署モデルインスタンスを取得して返却する。
@@ -262,10 +285,10 @@ class BookWriteOnlySerializer(serializers.ModelSerializer):
         Exceptions:
             rest_framework.exceptions.NotFound: 部署が見つからない場合。
         """
-        try:
-            return Division.objects.get(code=code)
-        except Division.DoesNotExist:
+        division = division_cache.get(code)
+        if division is None:
             raise exceptions.NotFound(detail="Division doesn't exist")
+        return division
 
     def _organize_validated_data(self, validated_data: Any) -> Any:
         """書き込み専用書籍シリアライザーが検証したデータを整理する。
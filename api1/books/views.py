@@ -1,10 +1,30 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from rest_framework import generics, permissions, serializers, status, viewsets
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from books.exports import CONTENT_TYPES, export_books
+from books.facets import get_facets
+from books.isbn import get_isbn_cache_key, normalize_isbn
 from books.models import Book, Classification, ClassificationDetail
 
+from ..asyncviews import AsyncListAPIView, AsyncRetrieveAPIView
+from ..conditions import Validators
+from ..mixins import (
+    CompiledSerializerMixin,
+    ConditionalGetMixin,
+    OptimizedQuerySetMixin,
+    QueryBudgetMixin,
+    SparseFieldsetMixin,
+)
+from ..parsers import FastJSONParser, NDJSONParser
+from .bulk import BookBulkWriter
+from .filters import BookFilter, BookSearchFilter
+from .paginations import BookPagination
 from .serializers import (
     BookReadOnlySerializer,
     BookWriteOnlySerializer,
@@ -29,8 +49,13 @@ def classification_list(request: Request) -> Response:
     if request.method == "GET":
         # GETメソッドの場合は、すべての書籍分類モデルインスタンスを返却
         classifications = Classification.objects.all()
+        # 書籍分類が変更されていない場合は、シリアライズせずに`304 Not Modified`を返却
+        validators = Validators.for_collection(request, classifications)
+        not_modified = validators.evaluate_api(request)
+        if not_modified is not None:
+            return not_modified
         serializer = ClassificationSerializer(classifications, many=True)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
     elif request.method == "POST":
         # POSTメソッドの場合は、書籍分類モデルインスタンスを登録
@@ -61,8 +86,15 @@ def classification_detail(request: Request, code: str) -> Response:
 
     if request.method == "GET":
         # GETメソッドの場合は、書籍分類モデルインスタンスを返却
+        # 書籍分類が変更されていない場合は、シリアライズせずに`304 Not Modified`を返却
+        validators = Validators.for_object(
+            request, instance, Classification.objects.all()
+        )
+        not_modified = validators.evaluate_api(request)
+        if not_modified is not None:
+            return not_modified
         serializer = ClassificationSerializer(instance)
-        return Response(serializer.data)
+        return validators.apply(Response(serializer.data))
 
     elif request.method == "PUT":
         # PUTメソッドの場合は、書籍分類モデルインスタンスを更新して返却
@@ -80,17 +112,21 @@ def classification_detail(request: Request, code: str) -> Response:
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ClassificationDetailListCreateView(generics.ListCreateAPIView):
+class ClassificationDetailListCreateView(
+    ConditionalGetMixin, generics.ListCreateAPIView
+):
     """書籍分類詳細一覧登録ビュー"""
 
-    queryset = ClassificationDetail.objects.all()
+    # 書籍分類名をシリアライズするため書籍分類を結合
+    queryset = ClassificationDetail.objects.select_related("classification")
     serializer_class = ClassificationDetailSerializer
 
 
 class ClassificationRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     """書籍分類詳細詳細更新削除ビュー"""
 
-    queryset = ClassificationDetail.objects.all()
+    # 書籍分類名をシリアライズするため書籍分類を結合
+    queryset = ClassificationDetail.objects.select_related("classification")
     serializer_class = ClassificationDetailSerializer
     lookup_field = "code"
 
@@ -100,14 +136,34 @@ class ClassificationRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIV
         return super().get_serializer_class()
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(
+    QueryBudgetMixin,
+    ConditionalGetMixin,
+    CompiledSerializerMixin,
+    SparseFieldsetMixin,
+    OptimizedQuerySetMixin,
+    viewsets.ModelViewSet,
+):
     """書籍ビューセット"""
 
     queryset = Book.objects.all()
     serializer_class = BookReadOnlySerializer
+    pagination_class = BookPagination
+    filter_backends = [BookFilter, BookSearchFilter]
+    # 一覧はコンパイルしたシリアライザーでシリアライズ
+    compile_serializer = True
     permission_classes = [
         permissions.IsAuthenticatedOrReadOnly,
     ]
+    # 書籍の一覧及び詳細は書籍を取得するクエリに加えて、認証したユーザーを取得するクエリ、
+    # 書籍集計は書籍集計を取得するクエリに加えて、コードキャッシュを読み込んでいない場合は
+    # 書籍分類、書籍分類詳細及び部署を読み込むクエリ
+    query_budget = {
+        "list": 2,
+        "retrieve": 2,
+        "facets": 4,
+        "by_isbn": 2,
+    }
 
     def get_serializer_class(self) -> serializers.Serializer:
         """書籍シリアライザークラスを返却する。
@@ -118,3 +174,147 @@ class BookViewSet(viewsets.ModelViewSet):
         if self.request.method.lower() in ("post", "put", "patch", "delete"):
             return BookWriteOnlySerializer
         return BookReadOnlySerializer
+
+    @action(detail=False, methods=["get"])
+    def facets(self, request: Request) -> Response:
+        """書籍分類、書籍分類詳細、管理部署及び廃棄済みごとの書籍の数を返却する。
+
+        書籍を登録、更新及び削除したときに増減する書籍集計を合計するため、書籍テーブルを集計しない。
+
+        Args:
+            request: リクエストインスタンス。
+        Returns:
+            書籍分類(`classification`)、書籍分類詳細(`classification_detail`)、
+            管理部署(`division`)及び廃棄済み(`disposed`)ごとの書籍の数。
+        """
+        return Response(get_facets())
+
+    @action(detail=False, methods=["get"], url_path=r"by-isbn/(?P<isbn>[^/]+)")
+    def by_isbn(self, request: Request, isbn: str) -> Response:
+        """ISBNと一致する書籍を返却する。
+
+        ISBNは、ハイフンの有無やISBN-10とISBN-13の違いによらず、正規化したISBN-13の一意索引で
+        検索する。取得した書籍は`BOOK_ISBN_CACHE_TTL`設定の秒数だけキャッシュして、書籍を保存または
+        削除したときにキャッシュから削除する。フィールドを指定した場合はキャッシュしない。
+
+        Args:
+            request: リクエストインスタンス。
+            isbn: ISBN。
+        Returns:
+            書籍を持つレスポンス。ISBNでない場合は`400 Bad Request`、書籍が見つからない場合は
+            `404 Not Found`を返却する。
+        """
+        isbn13 = normalize_isbn(isbn)
+        if isbn13 is None:
+            return Response(
+                {"isbn": f"Invalid ISBN: {isbn}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        sparse = any(
+            param in request.query_params
+            for param in (self.fields_query_param, self.omit_query_param)
+        )
+        key = get_isbn_cache_key(isbn13)
+        data = None if sparse else cache.get(key)
+        if data is None:
+            book = generics.get_object_or_404(self.get_queryset(), isbn13=isbn13)
+            data = self.get_serializer(book).data
+            if not sparse:
+                cache.set(key, data, settings.BOOK_ISBN_CACHE_TTL)
+        return Response(data)
+
+    @action(
+        detail=False, methods=["post"], parser_classes=[FastJSONParser, NDJSONParser]
+    )
+    def bulk(self, request: Request) -> Response:
+        """書籍を一括で登録、更新または削除する。
+
+        リクエストボディには、書籍の一括操作のJSON配列またはNDJSONを指定する。
+        一括操作は、`op`に操作の種類(`create`、`update`または`delete`)、`id`に更新または
+        削除する書籍ID、その他に書き込み専用書籍シリアライザーのフィールドを持つオブジェクトである。
+        `?batch_size=`で1回のINSERTまたはUPDATEで書き込む書籍の数を指定できる。
+
+        Args:
+            request: リクエストインスタンス。
+        Returns:
+            一括操作の結果のリストを持つレスポンス。
+            1件でも失敗した操作がある場合は、どの操作も書き込まずに`400 Bad Request`を返却する。
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                {"detail": "Expected a list of operations."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            batch_size = int(request.query_params["batch_size"])
+        except (KeyError, ValueError):
+            batch_size = settings.BOOK_BULK_BATCH_SIZE
+        writer = BookBulkWriter(batch_size=max(batch_size, 1))
+        operations = writer.execute(request.data)
+        failed = any(op.errors is not None for op in operations)
+        return Response(
+            {"results": [op.result() for op in operations]},
+            status=status.HTTP_400_BAD_REQUEST if failed else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["get"])
+    def export(self, request: Request) -> HttpResponseBase:
+        """書籍をNDJSONまたはCSV形式でストリーミングしてエクスポートする。
+
+        `?type=`でエクスポート形式(`ndjson`または`csv`)を指定する。
+        書籍はデータベースからチャンク単位で取得するため、書籍の数によらずメモリ使用量は一定である。
+
+        Args:
+            request: リクエストインスタンス。
+        Returns:
+            書籍をストリーミングするレスポンス。エクスポート形式が不正な場合は`400 Bad Request`。
+        """
+        export_format = request.query_params.get("type", "ndjson")
+        if export_format not in CONTENT_TYPES:
+            return Response(
+                {"type": f"Invalid export type: {export_format}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = self.filter_queryset(Book.objects.all())
+        response = StreamingHttpResponse(
+            export_books(export_format, queryset, settings.BOOK_EXPORT_CHUNK_SIZE),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="books.{export_format}"'
+        return response
+
+
+class AsyncClassificationListView(AsyncListAPIView):
+    """非同期書籍分類一覧ビュー"""
+
+    queryset = Classification.objects.all()
+    serializer_class = ClassificationSerializer
+
+
+class AsyncBookListView(AsyncListAPIView):
+    """非同期書籍一覧ビュー
+
+    書籍ビューセットの一覧と同じクエリパラメーターで絞り込み、全文検索及びページ分割して、
+    同じレスポンスを返却する。
+    """
+
+    queryset = Book.objects.all()
+    serializer_class = BookReadOnlySerializer
+    # 書籍ビューセットと同じ権限クラス
+    permission_classes = [
+        permissions.IsAuthenticatedOrReadOnly,
+    ]
+    pagination_class = BookPagination
+    filter_backends = [BookFilter, BookSearchFilter]
+
+
+class AsyncBookRetrieveView(AsyncRetrieveAPIView):
+    """非同期書籍詳細ビュー"""
+
+    queryset = Book.objects.all()
+    serializer_class = BookReadOnlySerializer
+    # 書籍ビューセットと同じ権限クラス
+    permission_classes = [
+        permissions.IsAuthenticatedOrReadOnly,
+    ]
@@ -0,0 +1,199 @@
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple, Type
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import QuerySet
+from rest_framework import fields, relations, serializers
+
+
+class NotCompilable(Exception):
+    """シリアライザーをコンパイルできないことを示す例外"""
+
+
+# シリアライズするフィールドの名前、行の値の位置、値を変換する関数及びネストしたシリアライザーのノード
+Node = List[Tuple[str, int, Optional[Callable[[Any], Any]], Optional[list]]]
+
+
+class CompiledSerializer:
+    """コンパイルしたシリアライザー
+
+    シリアライザーが宣言するフィールドツリーを、結合したテーブルから値を取得する1つの`values_list`
+    射影にコンパイルする。モデルインスタンスを構築せずに、取得したタプルからシリアライザーと同じ
+    構造のデータを構築する。値の変換には、シリアライザーのフィールドの`to_representation`をそのまま
+    使用するため、シリアライザーと同じ表現になる。
+    """
+
+    def __init__(
+        self, serializer: serializers.Serializer, model: Type[models.Model]
+    ) -> None:
+        """イニシャライザ
+
+        Args:
+            serializer: コンパイルするシリアライザーインスタンス。
+            model: シリアライザーがシリアライズするモデルクラス。
+        Exceptions:
+            NotCompilable: シリアライザーが、コンパイルできないフィールドを含む場合。
+        """
+        self.lookups: List[str] = []
+        self.node = self._compile(serializer, model, "")
+
+    def _add_lookup(self, lookup: str) -> int:
+        """射影にルックアップを追加して、行の値の位置を返却する。"""
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return self.lookups.index(lookup)
+
+    def _compile(
+        self, serializer: serializers.Serializer, model: Type[models.Model], prefix: str
+    ) -> Node:
+        """シリアライザーのフィールドツリーをコンパイルする。
+
+        Args:
+            serializer: シリアライザーインスタンス。
+            model: シリアライザーがシリアライズするモデルクラス。
+            prefix: ルックアップの接頭辞。
+        Returns:
+            コンパイルしたノード。
+        Exceptions:
+            NotCompilable: シリアライザーが、コンパイルできないフィールドを含む場合。
+        """
+        node: Node = []
+        for field in serializer._readable_fields:
+            if (
+                isinstance(
+                    field,
+                    (
+                        serializers.ListSerializer,
+                        serializers.SerializerMethodField,
+                        relations.ManyRelatedField,
+                    ),
+                )
+                or field.source == "*"
+            ):
+                raise NotCompilable(field.field_name)
+            # ソースの末尾を除く属性は、外部キーまたは一対一の関連フィールドでなければならない
+            current_model = model
+            for attr in field.source_attrs[:-1]:
+                current_model = _get_forward_relation(current_model, attr).related_model
+            lookup = prefix + "__".join(field.source_attrs)
+            last = _get_model_field(current_model, field.source_attrs[-1])
+            if isinstance(field, serializers.Serializer):
+                # ネストしたシリアライザーは、外部キーの値でNULLを判定
+                related_model = _get_forward_relation(
+                    current_model, field.source_attrs[-1]
+                ).related_model
+                child = self._compile(field, related_model, f"{lookup}__")
+                node.append((field.field_name, self._add_lookup(lookup), None, child))
+                continue
+            if last.is_relation and not (
+                isinstance(field, relations.PrimaryKeyRelatedField)
+                and field.pk_field is None
+            ):
+                raise NotCompilable(field.field_name)
+            if isinstance(field, relations.RelatedField) and not last.is_relation:
+                raise NotCompilable(field.field_name)
+            node.append(
+                (field.field_name, self._add_lookup(lookup), _representer(field), None)
+            )
+        return node
+
+    def values(self, queryset: QuerySet, *extra: str) -> QuerySet:
+        """射影した名前付きタプルを返却するQuerySetを返却する。
+
+        Args:
+            queryset: シリアライズするモデルのQuerySet。
+            extra: 射影に追加するルックアップ(キーセットページネーションの並び替えキーなど)。
+        Returns:
+            名前付きタプルを返却するQuerySet。
+        """
+        lookups = self.lookups + [
+            lookup for lookup in extra if lookup not in self.lookups
+        ]
+        return queryset.values_list(*lookups, named=True)
+
+    def _build(self, node: Node, row: Sequence[Any]) -> "OrderedDict[str, Any]":
+        ret: "OrderedDict[str, Any]" = OrderedDict()
+        for name, index, represent, child in node:
+            value = row[index]
+            if value is None:
+                ret[name] = None
+            elif child is not None:
+                ret[name] = self._build(child, row)
+            else:
+                ret[name] = represent(value)  # type: ignore
+        return ret
+
+    def to_representation(self, row: Sequence[Any]) -> "OrderedDict[str, Any]":
+        """行からシリアライザーと同じ構造のデータを構築する。
+
+        Args:
+            row: `values`メソッドが返却したQuerySetで取得した行。
+        Returns:
+            シリアライズしたデータ。
+        """
+        return self._build(self.node, row)
+
+    def to_representations(self, rows: Iterable[Sequence[Any]]) -> List[Any]:
+        """複数の行からシリアライザーと同じ構造のデータのリストを構築する。
+
+        Args:
+            rows: `values`メソッドが返却したQuerySetで取得した行。
+        Returns:
+            シリアライズしたデータのリスト。
+        """
+        return [self._build(self.node, row) for row in rows]
+
+
+def _representer(field: fields.Field) -> Callable[[Any], Any]:
+    """列の値をフィールドの表現に変換する関数を返却する。
+
+    主キー関連フィールドは、外部キーの値を主キーのみを持つオブジェクトに変換してから表現に変換する。
+    """
+    if isinstance(field, relations.PrimaryKeyRelatedField):
+        return lambda value: field.to_representation(relations.PKOnlyObject(pk=value))
+    return field.to_representation
+
+
+def _get_model_field(model: Type[models.Model], name: str) -> models.Field:
+    """モデルのフィールドを返却する。
+
+    Exceptions:
+        NotCompilable: フィールドが存在しないか、データベースの列に対応しない場合。
+    """
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        raise NotCompilable(name)
+    if not isinstance(field, models.Field) or not field.concrete:
+        raise NotCompilable(name)
+    return field
+
+
+def _get_forward_relation(model: Type[models.Model], name: str) -> models.Field:
+    """モデルの外部キーまたは一対一の関連フィールドを返却する。
+
+    Exceptions:
+        NotCompilable: フィールドが外部キーまたは一対一の関連フィールドでない場合。
+    """
+    field = _get_model_field(model, name)
+    if not (field.many_to_one or field.one_to_one):
+        raise NotCompilable(name)
+    return field
+
+
+def compile_serializer(
+    serializer: serializers.Serializer, model: Type[models.Model]
+) -> Optional[CompiledSerializer]:
+    """シリアライザーをコンパイルする。
+
+    Args:
+        serializer: シリアライザーインスタンス。
+        model: シリアライザーがシリアライズするモデルクラス。
+    Returns:
+        コンパイルしたシリアライザー。コンパイルできない場合はNone。
+    """
+    try:
+        return CompiledSerializer(serializer, model)
+    except NotCompilable:
+        return None
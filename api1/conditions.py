@@ -0,0 +1,169 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+import ulid
+from django.db.models import Model, QuerySet
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from core.caches import TableVersion
+from core.models import TimestampModel
+
+# ヘッダーを設定するレスポンスの型
+R = TypeVar("R", bound=HttpResponseBase)
+
+
+def _get_related_models(queryset: QuerySet) -> List[Tuple[str, Type[Model]]]:
+    """QuerySetが`select_related`で結合する関連フィールドのパスと関連モデルを返却する。
+
+    Args:
+        queryset: QuerySet。
+    Returns:
+        関連フィールドのパスと関連モデルのリスト。
+    """
+
+    def walk(
+        model: Any, tree: Dict[str, Any], prefix: str
+    ) -> List[Tuple[str, Type[Model]]]:
+        relations = []
+        for name, children in tree.items():
+            related_model = model._meta.get_field(name).related_model
+            path = f"{prefix}{name}"
+            relations.append((path, related_model))
+            relations.extend(walk(related_model, children, f"{path}__"))
+        return relations
+
+    tree = queryset.query.select_related
+    return walk(queryset.model, tree, "") if isinstance(tree, dict) else []
+
+
+@dataclass
+class Validators:
+    """条件付きリクエストを評価するためのエンティティタグと最終更新日時"""
+
+    # エンティティタグ
+    etag: Optional[str]
+    # 最終更新日時
+    last_modified: Optional[datetime]
+
+    @classmethod
+    def build(
+        cls, request: HttpRequest, last_modified: Optional[datetime], *keys: Any
+    ) -> "Validators":
+        """キーとリクエストから弱いエンティティタグを構築する。
+
+        同じデータでも、クエリパラメーターや表現形式が異なればレスポンスボディが異なるため、
+        リクエストのパス、クエリパラメーター及び`Accept`ヘッダーをエンティティタグに含める。
+
+        Args:
+            request: リクエストインスタンス。
+            last_modified: 最終更新日時。
+            keys: エンティティタグを構築するキー。
+        Returns:
+            エンティティタグと最終更新日時。
+        """
+        source = ":".join(
+            [request.get_full_path(), request.META.get("HTTP_ACCEPT", "")]
+            + [str(key) for key in keys]
+        )
+        digest = hashlib.md5(source.encode("utf-8"), usedforsecurity=False)
+        return cls(etag=f'W/"{digest.hexdigest()}"', last_modified=last_modified)
+
+    @classmethod
+    def for_collection(cls, request: HttpRequest, queryset: QuerySet) -> "Validators":
+        """コレクションのエンティティタグと最終更新日時を返却する。
+
+        コレクションのモデル及び結合する関連モデルのテーブルのバージョンから構築するため、
+        データベースを検索しない。テーブルのバージョンは行の削除でも更新されるため、最終更新日時も
+        削除によって変わる。
+
+        Args:
+            request: リクエストインスタンス。
+            queryset: コレクションのQuerySet。
+        Returns:
+            エンティティタグと最終更新日時。
+        """
+        models = [queryset.model] + [m for _, m in _get_related_models(queryset)]
+        versions = [TableVersion.for_model(model).version for model in models]
+        last_modified = max(ulid.ULID.from_str(v).datetime for v in versions)
+        return cls.build(request, last_modified, *versions)
+
+    @classmethod
+    def for_object(
+        cls, request: HttpRequest, instance: Model, queryset: QuerySet
+    ) -> "Validators":
+        """モデルインスタンスのエンティティタグと最終更新日時を返却する。
+
+        Args:
+            request: リクエストインスタンス。
+            instance: `queryset`で取得したモデルインスタンス。
+            queryset: モデルインスタンスを取得したQuerySet。
+        Returns:
+            エンティティタグと最終更新日時。
+        """
+        timestamps = [instance.updated_at]  # type: ignore
+        for path, model in _get_related_models(queryset):
+            if not issubclass(model, TimestampModel):
+                continue
+            related: Any = instance
+            for name in path.split("__"):
+                related = getattr(related, name, None)
+            if related is not None:
+                timestamps.append(related.updated_at)
+        return cls.build(request, max(timestamps), instance.pk, *timestamps)
+
+    def evaluate(self, request: HttpRequest) -> Optional[HttpResponse]:
+        """条件付きリクエストを評価する。
+
+        Args:
+            request: リクエストインスタンス。
+        Returns:
+            条件に応じた`304 Not Modified`または`412 Precondition Failed`レスポンス。
+            レスポンスボディを返却する必要がある場合はNone。
+        """
+        last_modified = (
+            int(self.last_modified.timestamp()) if self.last_modified else None
+        )
+        # `304 Not Modified`レスポンスにヘッダーを引き継ぐため、ヘッダーを設定したレスポンスを渡す
+        response = self.apply(HttpResponse())
+        conditional_response = get_conditional_response(
+            request, etag=self.etag, last_modified=last_modified, response=response
+        )
+        return None if conditional_response is response else conditional_response
+
+    def evaluate_api(self, request: HttpRequest) -> Optional[Response]:
+        """Django REST frameworkのビューから返却するレスポンスで、条件付きリクエストを評価する。
+
+        Args:
+            request: リクエストインスタンス。
+        Returns:
+            `evaluate`と同じステータスコード及びヘッダーのDjango REST frameworkのレスポンス。
+            レスポンスボディを返却する必要がある場合はNone。
+        """
+        response = self.evaluate(request)
+        if response is None:
+            return None
+        # レスポンスボディがないため、コンテンツタイプはDjango REST frameworkが削除する
+        api_response = Response(status=response.status_code)
+        for name, value in response.items():
+            if name.lower() != "content-type":
+                api_response[name] = value
+        return api_response
+
+    def apply(self, response: R) -> R:
+        """レスポンスに`ETag`及び`Last-Modified`ヘッダーを設定する。
+
+        Args:
+            response: レスポンス。
+        Returns:
+            ヘッダーを設定したレスポンス。
+        """
+        if self.etag:
+            response["ETag"] = self.etag
+        if self.last_modified:
+            response["Last-Modified"] = http_date(self.last_modified.timestamp())
+        return response
@@ -0,0 +1,117 @@
+from typing import Dict, List, Optional, Sequence
+
+from rest_framework import serializers
+
+# フィールド名と、ネストしたシリアライザーのフィールドのパス(フィールド全体を指定した場合はNone)
+FieldTree = Dict[str, Optional[List[str]]]
+
+
+def parse_fieldset(value: Optional[str]) -> List[str]:
+    """カンマで区切られたフィールドのパスを解析する。
+
+    Args:
+        value: `id,title,division.name`のような、カンマで区切られたフィールドのパス。
+    Returns:
+        フィールドのパスのリスト。
+    """
+    if not value:
+        return []
+    return [path.strip() for path in value.split(",") if path.strip()]
+
+
+def _build_tree(paths: Sequence[str]) -> FieldTree:
+    """ドットで区切られたフィールドのパスを、先頭のフィールド名でまとめる。
+
+    Args:
+        paths: フィールドのパス。
+    Returns:
+        フィールド名と、ネストしたシリアライザーのフィールドのパスの辞書。
+    """
+    tree: FieldTree = {}
+    for path in paths:
+        name, _, rest = path.partition(".")
+        if not rest:
+            tree[name] = None
+        elif name not in tree:
+            tree[name] = [rest]
+        elif tree[name] is not None:
+            tree[name].append(rest)  # type: ignore
+    return tree
+
+
+def _get_nested(
+    serializer: serializers.Serializer, name: str, prefix: str
+) -> serializers.Serializer:
+    """ネストしたシリアライザーを返却する。
+
+    Exceptions:
+        ValueError: フィールドがネストしたシリアライザーでない場合。
+    """
+    field = serializer.fields[name]
+    if not isinstance(field, serializers.Serializer):
+        raise ValueError(f"{prefix}{name}")
+    return field
+
+
+def _check_names(
+    serializer: serializers.Serializer, tree: FieldTree, prefix: str
+) -> None:
+    """フィールド名がシリアライザーに存在することを確認する。
+
+    Exceptions:
+        ValueError: フィールド名がシリアライザーに存在しない場合。
+    """
+    for name in tree:
+        if name not in serializer.fields:
+            raise ValueError(f"{prefix}{name}")
+
+
+def _select(
+    serializer: serializers.Serializer, paths: Sequence[str], prefix: str
+) -> None:
+    """指定されたフィールド以外をシリアライザーから削除する。"""
+    tree = _build_tree(paths)
+    _check_names(serializer, tree, prefix)
+    for name in list(serializer.fields):
+        if name not in tree:
+            del serializer.fields[name]
+        elif tree[name] is not None:
+            nested = _get_nested(serializer, name, prefix)
+            _select(nested, tree[name], f"{prefix}{name}.")  # type: ignore
+
+
+def _omit(
+    serializer: serializers.Serializer, paths: Sequence[str], prefix: str
+) -> None:
+    """指定されたフィールドをシリアライザーから削除する。"""
+    tree = _build_tree(paths)
+    _check_names(serializer, tree, prefix)
+    for name, rest in tree.items():
+        if rest is None:
+            del serializer.fields[name]
+        else:
+            _omit(_get_nested(serializer, name, prefix), rest, f"{prefix}{name}.")
+
+
+def prune_serializer(
+    serializer: serializers.Serializer,
+    fields: Sequence[str] = (),
+    omit: Sequence[str] = (),
+) -> None:
+    """シリアライザーのフィールドツリーを、指定されたフィールドのパスで刈り込む。
+
+    フィールドのパスは、ネストしたシリアライザーのフィールドをドットで区切って指定する。
+    ネストしたシリアライザーのフィールドを指定した場合、ネストしたシリアライザーは指定されたフィールド
+    のみを持つ。
+
+    Args:
+        serializer: 刈り込むシリアライザーインスタンス。
+        fields: シリアライズするフィールドのパス。空の場合はすべてのフィールド。
+        omit: シリアライズしないフィールドのパス。
+    Exceptions:
+        ValueError: シリアライザーに存在しないフィールドのパスが指定された場合。
+    """
+    if fields:
+        _select(serializer, fields, "")
+    if omit:
+        _omit(serializer, omit, "")
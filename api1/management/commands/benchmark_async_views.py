@@ -0,0 +1,121 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.test import Client, override_settings
+from django.test.client import AsyncClient
+
+# 同期ビュー(WSGI)と非同期ビュー(ASGI)のURLの組
+ENDPOINTS: List[Tuple[str, str]] = [
+    ("/api1/books/", "/api1/async/books/"),
+    ("/api1/books/classifications/", "/api1/async/books/classifications/"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "同期ビュー(WSGI)と非同期ビュー(ASGI)のスループットを比較します。"
+        "テストクライアントで同じプロセス内のハンドラーを直接呼び出すため、ネットワーク、"
+        "サーバーのワーカー及び遅いクライアントの影響を含みません。実際のASGIサーバーの性能は、"
+        "uvicornなどで起動したサーバーに負荷試験ツールでリクエストを送信して計測してください。"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--requests", "-n", type=int, default=200, help="エンドポイントごとのリクエストの数"
+        )
+        parser.add_argument(
+            "--concurrency", "-c", type=int, default=20, help="同時に送信するリクエストの数"
+        )
+        parser.add_argument("--detail", help="詳細を取得する書籍ID(省略した場合は詳細を計測しない)")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        endpoints = list(ENDPOINTS)
+        if options["detail"]:
+            endpoints.append(
+                (
+                    f"/api1/books/{options['detail']}/",
+                    f"/api1/async/books/{options['detail']}/",
+                )
+            )
+        n, concurrency = options["requests"], max(options["concurrency"], 1)
+        # テストクライアントが送信する`Host`ヘッダーを許可
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            for sync_url, async_url in endpoints:
+                self.report(sync_url, "WSGI", *run_wsgi(sync_url, n, concurrency))
+                self.report(
+                    async_url,
+                    "ASGI",
+                    *asyncio.run(run_asgi(async_url, n, concurrency)),
+                )
+
+    def report(
+        self, url: str, path: str, elapsed: float, latencies: List[float]
+    ) -> None:
+        """計測結果を出力する。
+
+        Args:
+            url: 計測したURL。
+            path: 配信方式(`WSGI`または`ASGI`)。
+            elapsed: すべてのリクエストの処理に要した時間(秒)。
+            latencies: それぞれのリクエストの処理に要した時間(秒)。
+        """
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{path} {url}: {len(latencies) / elapsed:.1f} req/s "
+            f"(p50 {quantiles[49] * 1000:.1f} ms, p95 {quantiles[94] * 1000:.1f} ms)"
+        )
+
+
+def run_wsgi(url: str, n: int, concurrency: int) -> Tuple[float, List[float]]:
+    """同じプロセス内のWSGIハンドラーに、スレッドプールから同時にリクエストを送信する。
+
+    Args:
+        url: リクエストを送信するURL。
+        n: リクエストの数。
+        concurrency: スレッドの数。
+    Returns:
+        すべてのリクエストの処理に要した時間と、それぞれのリクエストの処理に要した時間(秒)。
+    """
+    client = Client()
+
+    def request(_: int) -> float:
+        start = time.perf_counter()
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(request, range(n)))
+    return time.perf_counter() - start, latencies
+
+
+async def run_asgi(url: str, n: int, concurrency: int) -> Tuple[float, List[float]]:
+    """同じプロセス内のASGIハンドラーに、1つのイベントループから同時にリクエストを送信する。
+
+    Args:
+        url: リクエストを送信するURL。
+        n: リクエストの数。
+        concurrency: 同時に処理するリクエストの数。
+    Returns:
+        すべてのリクエストの処理に要した時間と、それぞれのリクエストの処理に要した時間(秒)。
+    """
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request() -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url)
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - start
+
+    tasks: List[Callable[[], Awaitable[float]]] = [request for _ in range(n)]
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*[task() for task in tasks])
+    return time.perf_counter() - start, list(latencies)
@@ -0,0 +1,196 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponseBase
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer, Serializer
+
+from core.db import count_queries
+from core.timings import timer
+
+from .compilers import compile_serializer
+from .conditions import Validators
+from .fieldsets import parse_fieldset, prune_serializer
+from .paginations import KeysetPagination
+from .querysets import optimize_queryset
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """リクエストで実行したクエリの数が、エンドポイントのクエリ予算を超過したことを示す例外"""
+
+
+class OptimizedQuerySetMixin:
+    """シリアライザーのフィールドツリーから関連フィールドを結合したQuerySetを返却するミックスイン
+
+    安全なメソッド(`GET`など)のリクエストでは、シリアライザーが参照しない列の読み込みを遅延する。
+    """
+
+    # シリアライザーが参照しなくても、結合するすべてのモデルで読み込むフィールド名
+    required_fields: Sequence[str] = ()
+
+    def get_queryset(self) -> QuerySet:
+        """シリアライザーがネストして参照する関連フィールドを結合したQuerySetを返却する。
+
+        Returns:
+            関連フィールドを結合したQuerySet。
+        """
+        queryset = super().get_queryset()  # type: ignore
+        request = getattr(self, "request", None)
+        defer = request is not None and request.method in SAFE_METHODS
+        return optimize_queryset(
+            queryset,
+            self.get_serializer(),  # type: ignore
+            defer=defer,
+            required=self.required_fields,
+        )
+
+
+class SparseFieldsetMixin:
+    """クエリパラメーターで指定されたフィールドのみをシリアライズするミックスイン
+
+    安全なメソッド(`GET`など)のリクエストで、`fields`クエリパラメーターに指定されたフィールドのみを
+    シリアライズして、`omit`クエリパラメーターに指定されたフィールドをシリアライズしない。
+    ネストしたシリアライザーのフィールドは、`division.name`のようにドットで区切って指定する。
+    刈り込んだシリアライザーから結合する関連フィールドや読み込む列を決定するため、
+    `OptimizedQuerySetMixin`や`CompiledSerializerMixin`と組み合わせると、取得する列と結合する
+    テーブルも減少する。
+    """
+
+    # シリアライズするフィールドを指定するクエリパラメーター
+    fields_query_param = "fields"
+    # シリアライズしないフィールドを指定するクエリパラメーター
+    omit_query_param = "omit"
+
+    def get_serializer(self, *args: Any, **kwargs: Any) -> Serializer:
+        serializer = super().get_serializer(*args, **kwargs)  # type: ignore
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return serializer
+        fields = parse_fieldset(request.query_params.get(self.fields_query_param))
+        omit = parse_fieldset(request.query_params.get(self.omit_query_param))
+        if not fields and not omit:
+            return serializer
+        target = (
+            serializer.child if isinstance(serializer, ListSerializer) else serializer
+        )
+        try:
+            prune_serializer(target, fields, omit)
+        except ValueError as e:
+            raise ValidationError({"fields": [f"Invalid field: {e}"]})
+        return serializer
+
+
+class CompiledSerializerMixin:
+    """コンパイルしたシリアライザーで一覧をシリアライズするミックスイン
+
+    `compile_serializer`を`True`に設定したビューは、一覧を取得するときに、シリアライザーのフィールド
+    ツリーを1つの`values_list`射影にコンパイルして、モデルインスタンスを構築せずにシリアライズする。
+    シリアライザーをコンパイルできない場合は、通常どおりシリアライザーでシリアライズする。
+    """
+
+    compile_serializer = False
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        if not self.compile_serializer:
+            return super().list(request, *args, **kwargs)  # type: ignore
+        queryset = self.filter_queryset(self.get_queryset())  # type: ignore
+        serializer = self.get_serializer()  # type: ignore
+        compiled = compile_serializer(serializer, queryset.model)
+        if compiled is None:
+            return super().list(request, *args, **kwargs)  # type: ignore
+        # キーセットページネーションは、並び替えキーの値で次のページのカーソルを構築
+        extra: List[str] = []
+        paginator = self.paginator  # type: ignore
+        if isinstance(paginator, KeysetPagination):
+            keys = paginator.get_paginator(request, queryset).get_keys(queryset)
+            extra = [name for name, _ in keys]
+        rows = compiled.values(queryset, *extra)
+        page = self.paginate_queryset(rows)  # type: ignore
+        if page is not None:
+            with timer("serialize"):
+                data = compiled.to_representations(page)
+            return self.get_paginated_response(data)  # type: ignore
+        fetched = list(rows)
+        with timer("serialize"):
+            data = compiled.to_representations(fetched)
+        return Response(data)
+
+
+class ConditionalGetMixin:
+    """一覧及び詳細の取得で条件付きリクエストを評価するミックスイン
+
+    シリアライズする前に、コレクションはテーブルのバージョン、モデルインスタンスは取得したモデル
+    インスタンスからエンティティタグと最終更新日時を構築して、`If-None-Match`及び`If-Modified-Since`ヘッダーを
+    評価する。
+    """
+
+    # エンティティタグと最終更新日時を構築するため、結合するすべてのモデルで更新日時を読み込む
+    required_fields: Sequence[str] = ("updated_at",)
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())  # type: ignore
+        validators = Validators.for_collection(request, queryset)
+        response = validators.evaluate_api(request)
+        if response is not None:
+            return response
+        return validators.apply(super().list(request, *args, **kwargs))  # type: ignore
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        instance = self.get_object()  # type: ignore
+        queryset = self.get_queryset()  # type: ignore
+        validators = Validators.for_object(request, instance, queryset)
+        response = validators.evaluate_api(request)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(instance)  # type: ignore
+        with timer("serialize"):
+            data = serializer.data
+        return validators.apply(Response(data))
+
+
+class QueryBudgetMixin:
+    """エンドポイントのクエリ予算を強制するミックスイン
+
+    `query_budget`にアクション名(ビューセットの場合)または小文字のHTTPメソッド名をキー、
+    1リクエストで実行できるクエリの数を値とした辞書を設定する。
+    クエリ予算を超過した場合、`QUERY_BUDGET_STRICT`設定が`True`のときは`QueryBudgetExceeded`
+    例外をスローして、`False`のときは警告をログに記録する。
+    """
+
+    query_budget: Dict[str, int] = {}
+
+    def get_query_budget(self, request: HttpRequest) -> Optional[int]:
+        """リクエストのクエリ予算を返却する。
+
+        Args:
+            request: リクエストインスタンス。
+        Returns:
+            クエリ予算。クエリ予算が宣言されていない場合はNone。
+        """
+        action = getattr(self, "action", None)
+        if action and action in self.query_budget:
+            return self.query_budget[action]
+        return self.query_budget.get(request.method.lower())
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+        with count_queries() as counter:
+            response: HttpResponseBase = super().dispatch(  # type: ignore
+                request, *args, **kwargs
+            )
+        budget = self.get_query_budget(request)
+        if budget is not None and budget < counter.count:
+            message = (
+                f"{type(self).__name__} executed {counter.count} queries "
+                f"on {request.method} {request.path} (budget: {budget})"
+            )
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
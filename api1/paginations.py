@@ -0,0 +1,198 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+from django.db.models import QuerySet
+from rest_framework import exceptions, pagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from core.keyset import Cursor, InvalidCursor, KeysetPage, KeysetPaginator
+
+
+class KeysetPagination(pagination.BasePagination):
+    """キーセットページネーション
+
+    `?cursor=`で指定されたカーソルが示す行より後ろ(または前)の行を検索してページを返却する。
+    `?ordering=`で`ordering_fields`に含まれるフィールドで並び替えることができる。
+    """
+
+    # 1ページに含める行の数
+    page_size = 100
+    # 1ページに含める行の数を指定するクエリパラメーター
+    page_size_query_param = "page_size"
+    # 1ページに含める行の最大数
+    max_page_size = 1000
+    # カーソルを指定するクエリパラメーター
+    cursor_query_param = "cursor"
+    # 並び替えキーを指定するクエリパラメーター
+    ordering_query_param = "ordering"
+    # 既定の並び替えキー
+    ordering: Sequence[str] = ("pk",)
+    # 並び替えキーに指定できるフィールド(NULLを許容しないインデックスが付与されたフィールド)
+    ordering_fields: Sequence[str] = ("pk",)
+
+    def get_page_size(self, request: Request) -> int:
+        """1ページに含める行の数を返却する。
+
+        Args:
+            request: リクエストインスタンス。
+        Returns:
+            1ページに含める行の数。
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_ordering(
+        self, request: Request, queryset: Optional[QuerySet] = None
+    ) -> Sequence[str]:
+        """並び替えキーを返却する。
+
+        並び替えキーが指定されておらず、QuerySetが明示的に並び替えられている場合(全文検索の関連度
+        など)は、QuerySetの並び替えキーを返却する。
+
+        Args:
+            request: リクエストインスタンス。
+            queryset: ページ分割するQuerySet。
+        Returns:
+            並び替えキー。
+        Exceptions:
+            rest_framework.exceptions.ValidationError: 並び替えキーに指定できないフィールドが
+            指定された場合。
+        """
+        param = request.query_params.get(self.ordering_query_param)
+        if not param:
+            order_by = queryset.query.order_by if queryset is not None else ()
+            if order_by and all(isinstance(f, str) for f in order_by):
+                return order_by
+            return self.ordering
+        ordering = [f.strip() for f in param.split(",") if f.strip()]
+        invalid = [f for f in ordering if f.lstrip("-") not in self.ordering_fields]
+        if invalid:
+            raise exceptions.ValidationError(
+                {self.ordering_query_param: f"Invalid ordering: {', '.join(invalid)}"}
+            )
+        return ordering
+
+    def get_paginator(
+        self, request: Request, queryset: Optional[QuerySet] = None
+    ) -> KeysetPaginator:
+        """リクエストに応じたキーセットページネーターを返却する。
+
+        Args:
+            request: リクエストインスタンス。
+            queryset: ページ分割するQuerySet。
+        Returns:
+            キーセットページネーター。
+        """
+        return KeysetPaginator(
+            self.get_ordering(request, queryset), self.get_page_size(request)
+        )
+
+    def decode_cursor(
+        self, request: Request, paginator: KeysetPaginator, queryset: QuerySet
+    ) -> Optional[Cursor]:
+        """リクエストで指定されたカーソルを復号する。
+
+        Args:
+            request: リクエストインスタンス。
+            paginator: キーセットページネーター。
+            queryset: ページ分割するQuerySet。
+        Returns:
+            カーソル。カーソルが指定されていない場合はNone。
+        Exceptions:
+            rest_framework.exceptions.NotFound: カーソルを復号できない場合。
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return Cursor.decode(encoded, len(paginator.get_keys(queryset)))
+        except InvalidCursor:
+            raise exceptions.NotFound(detail="Invalid cursor")
+
+    def prepare(self, queryset: QuerySet, request: Request) -> QuerySet:
+        """ページの行を取得するQuerySetを返却する。
+
+        返却したQuerySetで取得した行は、`finish`メソッドに渡してページを構築する。
+
+        Args:
+            queryset: ページ分割するQuerySet。
+            request: リクエストインスタンス。
+        Returns:
+            ページの行を取得するQuerySet。
+        """
+        self.request = request
+        self.queryset = queryset
+        self.paginator = self.get_paginator(request, queryset)
+        self.cursor = self.decode_cursor(request, self.paginator, queryset)
+        return self.paginator.get_page_queryset(queryset, self.cursor)
+
+    def finish(self, rows: List[Any]) -> List[Any]:
+        """`prepare`メソッドが返却したQuerySetで取得した行からページを構築する。
+
+        Args:
+            rows: ページの行。
+        Returns:
+            ページに含まれる行。
+        """
+        self.page: KeysetPage = self.paginator.get_page(
+            rows, self.queryset, self.cursor
+        )
+        return self.page.rows
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> List[Any]:
+        return self.finish(list(self.prepare(queryset, request)))
+
+    def get_link(self, cursor: Optional[Cursor]) -> Optional[str]:
+        """カーソルが示すページのURLを返却する。
+
+        Args:
+            cursor: カーソル。
+        Returns:
+            ページのURL。カーソルがNoneの場合はNone。
+        """
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor.encode())
+
+    def get_next_link(self) -> Optional[str]:
+        return self.get_link(self.page.next_cursor)
+
+    def get_previous_link(self) -> Optional[str]:
+        return self.get_link(self.page.previous_cursor)
+
+    def get_paginated_data(self, data: Any) -> Dict[str, Any]:
+        """ページのリンクと行を含むレスポンスデータを返却する。
+
+        Args:
+            data: シリアライズしたページの行。
+        Returns:
+            レスポンスデータ。
+        """
+        return OrderedDict(
+            [
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+                ("results", data),
+            ]
+        )
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,62 @@
+import codecs
+from typing import IO, Any, List, Mapping, Optional
+
+from django.conf import settings
+from rest_framework import exceptions, parsers
+
+from core import jsonutils
+
+
+class FastJSONParser(parsers.JSONParser):
+    """高速なJSONパーサー
+
+    orjsonがインストールされている場合は、リクエストボディのバイト列を文字列に変換せずにorjsonで
+    解析する。インストールされていない場合は、標準ライブラリのJSONデコーダーで解析する。
+    """
+
+    def parse(
+        self,
+        stream: IO[Any],
+        media_type: Optional[str] = None,
+        parser_context: Optional[Mapping[str, Any]] = None,
+    ) -> Any:
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        data = stream.read()
+        try:
+            if encoding.lower().replace("-", "") != "utf8":
+                data = data.decode(encoding)
+            return jsonutils.loads(data)
+        except ValueError as e:
+            raise exceptions.ParseError(f"JSON parse error - {e}")
+
+
+class NDJSONParser(parsers.BaseParser):
+    """NDJSON(改行区切りJSON)パーサー
+
+    ストリームを1行ずつ読み込み、各行をJSONとして解析したリストを返却する。
+    空行は無視する。
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(
+        self,
+        stream: IO[Any],
+        media_type: Optional[str] = None,
+        parser_context: Optional[Mapping[str, Any]] = None,
+    ) -> Any:
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        reader = codecs.getreader(encoding)(stream)
+        items: List[Any] = []
+        for number, line in enumerate(reader, start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(jsonutils.loads(line))
+            except ValueError as e:
+                raise exceptions.ParseError(
+                    f"NDJSON parse error at line {number} - {e}"
+                )
+        return items
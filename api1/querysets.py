@@ -0,0 +1,189 @@
+from typing import List, Optional, Sequence, Type, Union, cast
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+
+
+def _get_relation(
+    model: Type[models.Model], name: str
+) -> Optional[Union[models.Field, models.ForeignObjectRel]]:
+    """モデルから名前が一致する関連フィールドを取得する。
+
+    Args:
+        model: モデルクラス。
+        name: フィールド名。
+    Returns:
+        関連フィールド。フィールドが存在しないか、関連フィールドでない場合はNone。
+    """
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    # 汎用外部キーは結合できないため除外
+    if not isinstance(field, (models.Field, models.ForeignObjectRel)):
+        return None
+    return field if field.is_relation else None
+
+
+def _collect_related(
+    serializer: serializers.Serializer,
+    model: Type[models.Model],
+    prefix: str,
+    select_related: List[str],
+    prefetch_related: List[str],
+) -> None:
+    """シリアライザーのフィールドツリーをたどって、結合する関連フィールドのパスを収集する。
+
+    Args:
+        serializer: シリアライザーインスタンス。
+        model: シリアライザーがシリアライズするモデルクラス。
+        prefix: 関連フィールドのパスの接頭辞。
+        select_related: `select_related`で結合する関連フィールドのパスを追加するリスト。
+        prefetch_related: `prefetch_related`で取得する関連フィールドのパスを追加するリスト。
+    """
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+        # バインドしたフィールドのソースは文字列
+        source_attrs = cast(str, field.source).split(".")
+        # 主キーのみを参照する関連フィールドは、外部キーの値を使用するため結合しない
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            source_attrs = source_attrs[:-1]
+        # ソースをたどって、単一のモデルインスタンスを参照する関連フィールドを結合
+        current_model, current_prefix = model, prefix
+        for attr in source_attrs:
+            relation = _get_relation(current_model, attr)
+            if relation is None:
+                break
+            path = f"{current_prefix}{attr}"
+            if relation.many_to_many or relation.one_to_many:
+                prefetch_related.append(path)
+                break
+            select_related.append(path)
+            current_model, current_prefix = relation.related_model, f"{path}__"
+        else:
+            # ネストしたシリアライザーは、関連先のモデルでフィールドツリーをたどる
+            child = (
+                field.child if isinstance(field, serializers.ListSerializer) else field
+            )
+            if isinstance(child, serializers.Serializer):
+                _collect_related(
+                    child,
+                    current_model,
+                    current_prefix,
+                    select_related,
+                    prefetch_related,
+                )
+
+
+def _add_required(
+    model: Type[models.Model], prefix: str, required: Sequence[str], only: List[str]
+) -> None:
+    """モデルが持つ、常に読み込むフィールドのパスを追加する。"""
+    names = {
+        field.name
+        for field in model._meta.get_fields()
+        if isinstance(field, models.Field) and field.concrete
+    }
+    only.extend(f"{prefix}{name}" for name in required if name in names)
+
+
+def _collect_only(
+    serializer: serializers.Serializer,
+    model: Type[models.Model],
+    prefix: str,
+    required: Sequence[str],
+    only: List[str],
+) -> bool:
+    """シリアライザーのフィールドツリーをたどって、読み込むフィールドのパスを収集する。
+
+    Args:
+        serializer: シリアライザーインスタンス。
+        model: シリアライザーがシリアライズするモデルクラス。
+        prefix: フィールドのパスの接頭辞。
+        required: シリアライズしなくても常に読み込むフィールド名。
+        only: 読み込むフィールドのパスを追加するリスト。
+    Returns:
+        読み込むフィールドを特定できた場合はTrue。メソッドフィールドのように、参照する列を特定
+        できないフィールドを含む場合はFalse。
+    """
+    _add_required(model, prefix, required, only)
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == "*" or isinstance(
+            field,
+            (
+                serializers.ListSerializer,
+                serializers.ManyRelatedField,
+                serializers.SerializerMethodField,
+            ),
+        ):
+            return False
+        *attrs, name = cast(str, field.source).split(".")
+        # ソースの末尾を除く属性は、結合する外部キーまたは一対一の関連フィールド
+        current_model, current_prefix = model, prefix
+        for attr in attrs:
+            relation = _get_relation(current_model, attr)
+            if relation is None or not (relation.many_to_one or relation.one_to_one):
+                return False
+            only.append(f"{current_prefix}{attr}")
+            current_model, current_prefix = (
+                relation.related_model,
+                f"{current_prefix}{attr}__",
+            )
+            _add_required(current_model, current_prefix, required, only)
+        try:
+            model_field = current_model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        if not model_field.concrete:
+            return False
+        only.append(f"{current_prefix}{name}")
+        if isinstance(field, serializers.Serializer):
+            related_model = model_field.related_model
+            if related_model is None or not _collect_only(
+                field, related_model, f"{current_prefix}{name}__", required, only
+            ):
+                return False
+        elif model_field.is_relation and not isinstance(
+            field, serializers.PrimaryKeyRelatedField
+        ):
+            return False
+    return True
+
+
+def optimize_queryset(
+    queryset: models.QuerySet,
+    serializer: serializers.Serializer,
+    defer: bool = False,
+    required: Sequence[str] = (),
+) -> models.QuerySet:
+    """シリアライザーのフィールドツリーから関連フィールドを結合したQuerySetを返却する。
+
+    ネストしたシリアライザーや、ドットで区切られたソースが参照する外部キーと一対一の関連フィールドは
+    `select_related`で結合し、多対多や逆参照の関連フィールドは`prefetch_related`で取得する。
+    `defer`が`True`の場合は、シリアライザーが参照しない列の読み込みを`only`で遅延する。
+    遅延したフィールドを参照すると追加のクエリを実行するため、保存するモデルインスタンスを取得する
+    QuerySetでは`defer`を`True`にしてはならない。
+
+    Args:
+        queryset: 結合する前のQuerySet。
+        serializer: シリアライザーインスタンス。
+        defer: シリアライザーが参照しない列の読み込みを遅延する場合はTrue。
+        required: シリアライザーが参照しなくても、結合するすべてのモデルで読み込むフィールド名。
+    Returns:
+        関連フィールドを結合したQuerySet。
+    """
+    select_related: List[str] = []
+    prefetch_related: List[str] = []
+    _collect_related(serializer, queryset.model, "", select_related, prefetch_related)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    only: List[str] = []
+    if defer and _collect_only(serializer, queryset.model, "", required, only):
+        queryset = queryset.only(*dict.fromkeys(only))
+    return queryset
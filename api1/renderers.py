@@ -0,0 +1,38 @@
+from typing import Any, Mapping, Optional
+
+from rest_framework import renderers
+
+from core import jsonutils
+from core.timings import timer
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """高速なJSONレンダラー
+
+    orjsonがインストールされている場合は、orjsonで文字列を経由せずにバイト列にエンコードする。
+    インストールされていない場合は、標準ライブラリのJSONエンコーダーでエンコードする。
+    日時、日付、時刻、ULID及びUUIDを直接エンコードする。
+    インデントが指定された場合(ブラウザブルAPIなど)や、空白を含むまたはASCII文字のみのJSONを設定で
+    指定した場合は、Django REST frameworkのJSONレンダラーでレンダリングする。
+    """
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        with timer("render"):
+            ret = jsonutils.dumps(data)
+        # Django REST frameworkのJSONレンダラーと同様に、JavaScriptの文字列リテラルで使用できない
+        # U+2028とU+2029をエスケープ
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
@@ -0,0 +1,712 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from datetime import timezone as dt_timezone
+from typing import List
+from unittest import mock
+
+import ulid
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ParseError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.throttling import BaseThrottle
+
+from accounts.models import User
+from books.caches import classification_detail_cache
+from books.models import Book, Classification, ClassificationDetail
+from books.search import search_books
+from core.caches import TableVersion
+from divisions.caches import division_cache
+from divisions.models import Division
+
+from .authentication import CachedJWTAuthentication, get_user_cache_key
+from .books.serializers import BookReadOnlySerializer
+from .books.views import AsyncBookListView, BookViewSet
+from .compilers import compile_serializer
+from .mixins import QueryBudgetExceeded
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+
+FIXTURES = ["divisions", "classifications", "classification_details", "books"]
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class BookViewSetQueryTest(TestCase):
+    """書籍ビューセットのクエリ数のテスト"""
+
+    fixtures = FIXTURES
+
+    def test_list_joins_nested_relations(self) -> None:
+        """書籍一覧がネストした関連フィールドを1クエリで取得することを確認する。
+
+        条件付きリクエストはテーブルのバージョンで評価するため、クエリを実行しない。
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get("/api1/books/")
+        self.assertEqual(response.status_code, 200)
+        book = response.json()["results"][0]
+        self.assertEqual(book["classification_detail"]["classification"]["code"], "000")
+        self.assertEqual(book["division"]["code"], "58")
+
+    def test_retrieve_joins_nested_relations(self) -> None:
+        """書籍詳細がネストした関連フィールドを1クエリで取得することを確認する。"""
+        with self.assertNumQueries(1):
+            response = self.client.get("/api1/books/01GYV46C5KXWDRKMB1WR3TW6RK/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["title"], "Fluent Python")
+
+    def test_query_budget_exceeded(self) -> None:
+        """クエリ予算を超過した場合に例外をスローすることを確認する。"""
+        view = BookViewSet.as_view({"get": "list"}, query_budget={"list": 0})
+        request = APIRequestFactory().get("/api1/books/")
+        with self.assertRaises(QueryBudgetExceeded):
+            view(request)
+
+
+class BookPaginationTest(TestCase):
+    """書籍キーセットページネーションのテスト"""
+
+    fixtures = FIXTURES
+
+    def _walk(self, url: str) -> List[str]:
+        """次のページをたどって、すべての書籍のタイトルを返却する。"""
+        titles: List[str] = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            titles.extend(book["title"] for book in data["results"])
+            url = data["next"]
+        return titles
+
+    def test_walk_pages_by_id(self) -> None:
+        """書籍IDの順にすべてのページをたどれることを確認する。"""
+        titles = self._walk("/api1/books/?page_size=1")
+        expected = list(Book.objects.order_by("id").values_list("title", flat=True))
+        self.assertEqual(titles, expected)
+
+    def test_walk_pages_by_title_descending(self) -> None:
+        """タイトルの降順にすべてのページをたどれることを確認する。"""
+        titles = self._walk("/api1/books/?page_size=3&ordering=-title")
+        self.assertEqual(titles, sorted(titles, reverse=True))
+        self.assertEqual(len(titles), Book.objects.count())
+
+    def test_previous_page(self) -> None:
+        """前のページに戻れることを確認する。"""
+        first = self.client.get("/api1/books/?page_size=2").json()
+        self.assertIsNone(first["previous"])
+        second = self.client.get(first["next"]).json()
+        previous = self.client.get(second["previous"]).json()
+        self.assertEqual(previous["results"], first["results"])
+
+    def test_invalid_ordering(self) -> None:
+        """並び替えキーに指定できないフィールドを指定した場合に400を返却することを確認する。"""
+        response = self.client.get("/api1/books/?ordering=authors")
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_cursor(self) -> None:
+        """復号できないカーソルを指定した場合に404を返却することを確認する。"""
+        response = self.client.get("/api1/books/?cursor=invalid")
+        self.assertEqual(response.status_code, 404)
+
+
+class BookBulkTest(TestCase):
+    """書籍一括操作のテスト"""
+
+    fixtures = FIXTURES
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        user = User.objects.create_user("user@example.com", "password", name="user")
+        self.client.force_authenticate(user)
+        # 書籍分類詳細及び部署のキャッシュを読み込み
+        classification_detail_cache.all()
+        division_cache.all()
+
+    def test_bulk_create_update_delete(self) -> None:
+        """書籍を一括で登録、更新及び削除できることを確認する。"""
+        operations = [
+            {
+                "op": "create",
+                "title": "New Book",
+                "classification_detail_code": "000",
+                "division_code": "58",
+            },
+            {"op": "update", "id": "01GYV46C5KXWDRKMB1WR3TW6RK", "title": "Updated"},
+            {"op": "delete", "id": "01GYV585X4JNDCSVA3BY93KN54"},
+        ]
+        # 書籍、INSERT、UPDATE、書籍集計の更新、全文検索インデックスの更新3つ、削除する書籍、
+        # 全文検索ドキュメント、全文検索ドキュメント、全文検索インデックス及び書籍のDELETE、
+        # 削除した書籍の書籍集計の更新、セーブポイント2つ
+        with self.assertNumQueries(15):
+            response = self.client.post(
+                "/api1/books/bulk/?batch_size=2", operations, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([r["status"] for r in results], [201, 200, 204])
+        self.assertTrue(Book.objects.filter(pk=results[0]["id"]).exists())
+        self.assertEqual(
+            Book.objects.get(pk="01GYV46C5KXWDRKMB1WR3TW6RK").title, "Updated"
+        )
+        self.assertFalse(Book.objects.filter(pk="01GYV585X4JNDCSVA3BY93KN54").exists())
+
+    def test_bulk_ndjson(self) -> None:
+        """NDJSONで書籍を一括登録できることを確認する。"""
+        body = "\n".join(
+            json.dumps(
+                {
+                    "title": f"Book {i}",
+                    "classification_detail_code": "000",
+                    "division_code": "58",
+                }
+            )
+            for i in range(3)
+        )
+        count = Book.objects.count()
+        response = self.client.post(
+            "/api1/books/bulk/", body, content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Book.objects.count(), count + 3)
+
+    def test_bulk_rejects_all_on_error(self) -> None:
+        """1件でも失敗した場合は、どの操作も書き込まないことを確認する。"""
+        operations = [
+            {
+                "title": "Valid",
+                "classification_detail_code": "000",
+                "division_code": "58",
+            },
+            {
+                "title": "Invalid",
+                "classification_detail_code": "zzz",
+                "division_code": "58",
+            },
+        ]
+        count = Book.objects.count()
+        response = self.client.post("/api1/books/bulk/", operations, format="json")
+        self.assertEqual(response.status_code, 400)
+        results = response.json()["results"]
+        self.assertEqual([r["status"] for r in results], [424, 404])
+        self.assertEqual(Book.objects.count(), count)
+
+
+class BookExportTest(TestCase):
+    """書籍エクスポートのテスト"""
+
+    fixtures = FIXTURES
+
+    def test_export_ndjson(self) -> None:
+        """NDJSON形式で書籍をエクスポートできることを確認する。"""
+        response = self.client.get("/api1/books/export/")
+        self.assertEqual(response.status_code, 200)
+        lines = response.getvalue().decode("utf-8").splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(len(rows), Book.objects.count())
+        self.assertEqual(rows[0]["id"], "01GYV46C5KXWDRKMB1WR3TW6RK")
+        self.assertEqual(rows[0]["classification_code"], "000")
+        self.assertEqual(
+            rows[0]["division_name"], Book.objects.get(pk=rows[0]["id"]).division.name
+        )
+
+    def test_export_csv(self) -> None:
+        """CSV形式で書籍をエクスポートできることを確認する。"""
+        response = self.client.get("/api1/books/export/?type=csv")
+        self.assertEqual(response.status_code, 200)
+        content = response.getvalue().decode("utf-8")
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), Book.objects.count())
+        self.assertEqual(rows[0]["title"], "Fluent Python")
+
+    def test_export_command(self) -> None:
+        """エクスポートコマンドの出力を、`call_command`で受け取れることを確認する。"""
+        out = io.StringIO()
+        call_command("export_books", stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), Book.objects.count())
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class BookByIsbnTest(TestCase):
+    """ISBNによる書籍の取得のテスト"""
+
+    fixtures = FIXTURES
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_lookup_variants(self) -> None:
+        """ハイフンの有無やISBN-10によらず、同じ書籍を取得できることを確認する。"""
+        for isbn in ("978-4-87311-817-8", "9784873118178", "4873118174"):
+            response = self.client.get(f"/api1/books/by-isbn/{isbn}/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["id"], "01GYV46C5KXWDRKMB1WR3TW6RK")
+
+    def test_cached_until_saved(self) -> None:
+        """取得した書籍をキャッシュして、書籍を保存するとキャッシュから削除することを確認する。"""
+        url = "/api1/books/by-isbn/9784873118178/"
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.json()["title"], "Fluent Python")
+        book = Book.objects.get(pk="01GYV46C5KXWDRKMB1WR3TW6RK")
+        book.title = "Fluent Python 2nd"
+        book.save()
+        self.assertEqual(self.client.get(url).json()["title"], "Fluent Python 2nd")
+        book.isbn = "978-4-8144-0000-3"
+        book.save()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_invalid_and_missing(self) -> None:
+        """ISBNでない場合に400、書籍が見つからない場合に404を返却することを確認する。"""
+        self.assertEqual(self.client.get("/api1/books/by-isbn/123/").status_code, 400)
+        response = self.client.get("/api1/books/by-isbn/978-4-8144-0000-3/")
+        self.assertEqual(response.status_code, 404)
+
+    def test_duplicate_isbn_rejected(self) -> None:
+        """登録済みの書籍と同じISBNの書籍を登録できないことを確認する。"""
+        client = APIClient()
+        client.force_authenticate(
+            User.objects.create_user("user@example.com", "password", name="user")
+        )
+        book = {
+            "title": "Duplicate",
+            "classification_detail_code": "000",
+            "division_code": "58",
+            "isbn": "4873118174",
+        }
+        response = client.post("/api1/books/", book, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("isbn", response.json())
+        response = client.post(
+            "/api1/books/bulk/",
+            [{**book, "isbn": "9784814400003"}, {**book, "isbn": "978-4-8144-0000-3"}],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        results = response.json()["results"]
+        self.assertEqual([r["status"] for r in results], [424, 400])
+
+
+class ConditionalGetTest(TestCase):
+    """条件付きリクエストのテスト"""
+
+    fixtures = FIXTURES
+
+    def _assert_not_modified(self, url: str, num_queries: int) -> None:
+        """エンティティタグと最終更新日時で`304 Not Modified`を返却することを確認する。"""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        with self.assertNumQueries(num_queries):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+        self.assertFalse(response.has_header("Content-Type"))
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_classification_list(self) -> None:
+        self._assert_not_modified("/api1/books/classifications/", 0)
+
+    def test_classification_detail(self) -> None:
+        self._assert_not_modified("/api1/books/classifications/000/", 1)
+
+    def test_classification_detail_list(self) -> None:
+        self._assert_not_modified("/api1/books/classification-details/", 0)
+
+    def test_book_list(self) -> None:
+        self._assert_not_modified("/api1/books/", 0)
+
+    def test_book_retrieve(self) -> None:
+        self._assert_not_modified("/api1/books/01GYV46C5KXWDRKMB1WR3TW6RK/", 1)
+
+    def test_etag_changes_when_related_object_updated(self) -> None:
+        """関連する部署が更新された場合に、書籍一覧のエンティティタグが変わることを確認する。"""
+        etag = self.client.get("/api1/books/")["ETag"]
+        Division.objects.get(pk="58").save()
+        response = self.client.get("/api1/books/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_last_modified_changes_when_book_deleted(self) -> None:
+        """書籍が削除された場合に、書籍一覧の最終更新日時が変わることを確認する。"""
+        # 最終更新日時が削除した日時と同じ秒にならないように、1時間前に変更されたことにする
+        past = datetime.now(dt_timezone.utc).timestamp() - 3600
+        for model in (Book, ClassificationDetail, Classification, Division):
+            key = TableVersion.for_model(model).key
+            cache.set(key, str(ulid.ULID.from_timestamp(past)), None)
+        last_modified = self.client.get("/api1/books/")["Last-Modified"]
+        Book.objects.get(pk="01GYV46C5KXWDRKMB1WR3TW6RK").delete()
+        response = self.client.get("/api1/books/", HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["Last-Modified"], last_modified)
+
+    def test_etag_varies_by_query(self) -> None:
+        """クエリパラメーターが異なる場合に、エンティティタグが異なることを確認する。"""
+        etag = self.client.get("/api1/books/")["ETag"]
+        response = self.client.get("/api1/books/?page_size=1", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class CompiledSerializerTest(TestCase):
+    """コンパイルしたシリアライザーのテスト"""
+
+    fixtures = FIXTURES
+
+    def setUp(self) -> None:
+        # 著者、ISBN、出版社、発行日及び廃棄日がNULLの書籍の表現も比較するため、NULLを含む書籍を登録
+        Book.objects.create(
+            title="Nulls",
+            classification_detail_id="000",
+            division_id="58",
+            disposed=True,
+        )
+
+    def test_parity_with_serializer(self) -> None:
+        """コンパイルしたシリアライザーが、シリアライザーと同じバイト列を出力することを確認する。"""
+        queryset = Book.objects.select_related(
+            "classification_detail__classification", "division"
+        )
+        serializer = BookReadOnlySerializer(queryset, many=True)
+        compiled = compile_serializer(BookReadOnlySerializer(), Book)
+        self.assertIsNotNone(compiled)
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(compiled.to_representations(compiled.values(queryset))),
+            renderer.render(serializer.data),
+        )
+
+    def test_null_relation(self) -> None:
+        """関連モデルを結合できなかった行を、シリアライザーと同じくNoneで表現することを確認する。"""
+        compiled = compile_serializer(BookReadOnlySerializer(), Book)
+        assert compiled is not None
+        book = Book.objects.get(title="Nulls")
+        row = list(compiled.values(Book.objects.filter(pk=book.pk)).get())
+        # 書籍モデルの関連フィールドはNULLを許容しないため、関連フィールドをNULLにした行を作成
+        for i, lookup in enumerate(compiled.lookups):
+            if lookup.startswith(("classification_detail", "division")):
+                row[i] = None
+        book.classification_detail_id = None
+        book.division_id = None
+        expected = BookReadOnlySerializer(book).data
+        self.assertIsNone(expected["classification_detail"])
+        self.assertEqual(compiled.to_representation(row), expected)
+
+    def test_parity_with_endpoint(self) -> None:
+        """コンパイルの有無によらず、書籍一覧が同じレスポンスボディを返却することを確認する。"""
+        factory = APIRequestFactory()
+        for query in ("", "?page_size=2", "?ordering=-title&page_size=3"):
+            contents = []
+            for compiled in (False, True):
+                view = BookViewSet.as_view({"get": "list"}, compile_serializer=compiled)
+                response = view(factory.get(f"/api1/books/{query}"))
+                contents.append(response.render().content)
+            self.assertEqual(contents[0], contents[1])
+
+
+class SparseFieldsetTest(TestCase):
+    """書籍ビューセットのスパースフィールドセットのテスト"""
+
+    fixtures = FIXTURES
+
+    def test_list_fields(self) -> None:
+        """指定されたフィールドのみを取得して、不要なテーブルを結合しないことを確認する。"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api1/books/?fields=id,title,division.name")
+        self.assertEqual(response.status_code, 200)
+        book = response.json()["results"][0]
+        self.assertEqual(list(book), ["id", "title", "division"])
+        self.assertEqual(list(book["division"]), ["name"])
+        sql = context.captured_queries[-1]["sql"]
+        self.assertNotIn("classification_details", sql)
+        self.assertNotIn('"publisher"', sql)
+
+    def test_retrieve_omit(self) -> None:
+        """指定されたフィールドを除いて、読み込む列を減らすことを確認する。"""
+        url = "/api1/books/01GYV46C5KXWDRKMB1WR3TW6RK/?omit=classification_detail,isbn"
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        book = response.json()
+        self.assertNotIn("classification_detail", book)
+        self.assertNotIn("isbn", book)
+        self.assertEqual(book["division"]["code"], "58")
+        # 条件付きリクエストに必要な更新日時は読み込むため、クエリは1回
+        self.assertEqual(len(context.captured_queries), 1)
+        sql = context.captured_queries[0]["sql"]
+        self.assertNotIn("classification_details", sql)
+        self.assertNotIn('"isbn"', sql)
+
+    def test_invalid_field(self) -> None:
+        """存在しないフィールドを指定した場合に400を返却することを確認する。"""
+        for query in (
+            "fields=id,unknown",
+            "omit=title.name",
+            "fields=division.unknown",
+        ):
+            response = self.client.get(f"/api1/books/?{query}")
+            self.assertEqual(response.status_code, 400, query)
+
+
+class BookSearchFilterTest(TestCase):
+    """書籍全文検索フィルターのテスト"""
+
+    fixtures = FIXTURES
+
+    def test_search_pages_by_rank(self) -> None:
+        """検索した書籍を関連度の順にページ分割できることを確認する。"""
+        response = self.client.get("/api1/books/", {"q": "オライリー", "page_size": "1"})
+        titles: List[str] = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            titles.extend(book["title"] for book in data["results"])
+            if not data["next"]:
+                break
+            response = self.client.get(data["next"])
+        expected = [book.title for book in search_books(Book.objects.all(), "オライリー")]
+        self.assertEqual(titles, expected)
+        self.assertEqual(len(titles), 3)
+
+
+class BookFilterTest(TestCase):
+    """書籍絞り込みフィルターのテスト"""
+
+    fixtures = FIXTURES
+
+    def test_filter(self) -> None:
+        """クエリパラメーターで書籍を絞り込めることを確認する。"""
+        Book.objects.filter(pk="01GYV46C5KXWDRKMB1WR3TW6RK").update(disposed=True)
+        response = self.client.get("/api1/books/?disposed=true&division_code=58")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [book["id"] for book in response.json()["results"]],
+            ["01GYV46C5KXWDRKMB1WR3TW6RK"],
+        )
+
+    def test_invalid_filter(self) -> None:
+        """不正な絞り込み条件を指定した場合に400を返却することを確認する。"""
+        response = self.client.get("/api1/books/?published_from=invalid")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("published_from", response.json())
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class BookFacetsTest(TestCase):
+    """書籍集計エンドポイントのテスト"""
+
+    fixtures = FIXTURES
+
+    def test_facets(self) -> None:
+        """書籍集計から書籍の数を返却することを確認する。"""
+        Book.objects.get(pk="01GYV46C5KXWDRKMB1WR3TW6RK").delete()
+        # コードキャッシュのバージョンを破棄して、書籍分類詳細、書籍分類及び部署を読み込み
+        cache.clear()
+        with self.assertNumQueries(4):
+            self.client.get("/api1/books/facets/")
+        with self.assertNumQueries(1):
+            response = self.client.get("/api1/books/facets/")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            data["classification"], [{"code": "000", "name": "総記", "count": 3}]
+        )
+        self.assertEqual(data["division"][0]["count"], 3)
+        self.assertEqual(
+            data["disposed"],
+            [{"value": False, "count": 3}, {"value": True, "count": 0}],
+        )
+
+
+class CachedJWTAuthenticationTest(TestCase):
+    """ユーザーをキャッシュするJWT認証のテスト"""
+
+    fixtures = FIXTURES
+
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(
+            "user@example.com", "password", name="user"
+        )
+        response = self.client.post(
+            "/api1/auth/token/", {"email": "user@example.com", "password": "password"}
+        )
+        self.header = {"Authorization": f"Bearer {response.json()['access']}"}
+
+    def tearDown(self) -> None:
+        cache.delete(get_user_cache_key(self.user.email))
+
+    def _get(self) -> int:
+        url = "/api1/books/01GYV46C5KXWDRKMB1WR3TW6RK/"
+        return self.client.get(url, headers=self.header).status_code
+
+    def test_cache_user(self) -> None:
+        """2回目以降のリクエストでユーザーを取得するクエリを実行しないことを確認する。"""
+        with self.assertNumQueries(2):
+            self.assertEqual(self._get(), 200)
+        # 書籍を取得するクエリのみ
+        with self.assertNumQueries(1):
+            self.assertEqual(self._get(), 200)
+
+    def test_invalidate_on_save(self) -> None:
+        """ユーザーが無効化されたときにキャッシュから削除することを確認する。"""
+        self.assertEqual(self._get(), 200)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self._get(), 401)
+
+    def test_cache_authorization_fields_only(self) -> None:
+        """パスワードのハッシュをキャッシュせずに、認可に使用するフィールドを復元することを確認する。"""
+        self.assertEqual(self._get(), 200)
+        cached = cache.get(get_user_cache_key(self.user.email))
+        self.assertNotIn(self.user.password, cached)
+        request = APIRequestFactory().get("/", headers=self.header)
+        user, _ = CachedJWTAuthentication().authenticate(Request(request))
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(
+            (user.name, user.is_active, user.is_staff), ("user", True, False)
+        )
+        self.assertEqual(
+            user.get_deferred_fields(), {"password", "last_login", "date_joined"}
+        )
+
+    @override_settings(JWT_STATELESS_SAFE_METHODS=True)
+    def test_stateless_safe_methods(self) -> None:
+        """安全なメソッドのリクエストでユーザーを参照しないことを確認する。"""
+        with self.assertNumQueries(1):
+            self.assertEqual(self._get(), 200)
+        self.assertIsNone(cache.get(get_user_cache_key(self.user.email)))
+
+
+class AsyncViewTest(TestCase):
+    """非同期ビューのテスト"""
+
+    fixtures = FIXTURES
+
+    async def _assert_same(self, sync_url: str, async_url: str, **params: str) -> None:
+        expected = await self.async_client.get(sync_url, params)
+        response = await self.async_client.get(async_url, params)
+        self.assertEqual(response.status_code, expected.status_code)
+        # ページのリンクは非同期ビューのURLを指す
+        content = response.content.replace(b"/api1/async/", b"/api1/")
+        self.assertEqual(content, expected.content)
+
+    async def test_book_list(self) -> None:
+        """書籍ビューセットの一覧と同じレスポンスを返却することを確認する。"""
+        await self._assert_same("/api1/books/", "/api1/async/books/")
+        await self._assert_same("/api1/books/", "/api1/async/books/", q="オライリー")
+        await self._assert_same(
+            "/api1/books/", "/api1/async/books/", ordering="title", page_size="2"
+        )
+        await self._assert_same(
+            "/api1/books/", "/api1/async/books/", published_from="invalid"
+        )
+        response = await self.async_client.get("/api1/async/books/", {"page_size": "2"})
+        next_url = response.json()["next"]
+        self.assertIn("/api1/async/books/", next_url)
+        response = await self.async_client.get(next_url)
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    async def test_book_retrieve(self) -> None:
+        """書籍ビューセットの詳細と同じレスポンスを返却することを確認する。"""
+        for pk in ("01GYV46C5KXWDRKMB1WR3TW6RK", "01GYV46C5KXWDRKMB1WR3TW6RZ"):
+            await self._assert_same(f"/api1/books/{pk}/", f"/api1/async/books/{pk}/")
+
+    async def test_classification_list(self) -> None:
+        """書籍分類一覧と同じレスポンスを返却することを確認する。"""
+        await self._assert_same(
+            "/api1/books/classifications/", "/api1/async/books/classifications/"
+        )
+
+    async def test_not_modified(self) -> None:
+        """条件付きリクエストを評価することを確認する。"""
+        response = await self.async_client.get("/api1/async/books/")
+        response = await self.async_client.get(
+            "/api1/async/books/", headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_authentication(self) -> None:
+        """同期ビューと同様にリクエストを認証することを確認する。"""
+        header = {"Authorization": "Bearer invalid"}
+        expected = await self.async_client.get("/api1/books/", headers=header)
+        response = await self.async_client.get("/api1/async/books/", headers=header)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response["WWW-Authenticate"], expected["WWW-Authenticate"])
+        self.assertEqual(response.json(), expected.json())
+
+    async def test_permission(self) -> None:
+        """権限クラスで権限を検査することを確認する。"""
+        with mock.patch.object(
+            AsyncBookListView, "permission_classes", [IsAuthenticated]
+        ):
+            response = await self.async_client.get("/api1/async/books/")
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("WWW-Authenticate", response)
+
+    async def test_throttle(self) -> None:
+        """スロットリングクラスでリクエストを制限することを確認する。"""
+
+        class DenyThrottle(BaseThrottle):
+            def allow_request(self, request: object, view: object) -> bool:
+                return False
+
+            def wait(self) -> float:
+                return 30.0
+
+        with mock.patch.object(AsyncBookListView, "throttle_classes", [DenyThrottle]):
+            response = await self.async_client.get("/api1/async/books/")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "30")
+
+
+class FastJSONTest(TestCase):
+    """高速なJSONレンダラー及びパーサーのテスト"""
+
+    fixtures = FIXTURES
+
+    def test_parity_with_json_renderer(self) -> None:
+        """Django REST frameworkのJSONレンダラーと同じバイト列を出力することを確認する。"""
+        queryset = Book.objects.select_related(
+            "classification_detail__classification", "division"
+        )
+        data = BookReadOnlySerializer(queryset, many=True).data
+        for value in (data, {"detail": "\u2028改行\u2029"}, [1, 2.5, None, True]):
+            self.assertEqual(
+                FastJSONRenderer().render(value), JSONRenderer().render(value)
+            )
+
+    def test_native_types(self) -> None:
+        """日時、日付及びULIDを直接エンコードすることを確認する。"""
+        value = {
+            "datetime": datetime(2023, 4, 25, 1, 2, 3, tzinfo=dt_timezone.utc),
+            "date": date(2023, 4, 25),
+            "ulid": ulid.ULID.from_str("01GYV46C5KXWDRKMB1WR3TW6RK"),
+        }
+        self.assertEqual(
+            FastJSONRenderer().render(value),
+            b'{"datetime":"2023-04-25T01:02:03+00:00","date":"2023-04-25",'
+            b'"ulid":"01GYV46C5KXWDRKMB1WR3TW6RK"}',
+        )
+
+    def test_parse(self) -> None:
+        """JSONを解析して、不正なJSONを拒否することを確認する。"""
+        parser = FastJSONParser()
+        data = parser.parse(io.BytesIO('{"title": "書籍"}'.encode("utf-8")))
+        self.assertEqual(data, {"title": "書籍"})
+        for invalid in (b"{", b'{"value": NaN}'):
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(invalid))
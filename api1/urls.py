@@ -15,6 +15,10 @@ urlpatterns = [
         "books/classification-details/<str:code>/",
         views.ClassificationRetrieveUpdateDestroyView.as_view(),
     ),
+    # 非同期ビュー(ASGIで配信する読み取り専用のエンドポイント)
+    path("async/books/", views.AsyncBookListView.as_view()),
+    path("async/books/classifications/", views.AsyncClassificationListView.as_view()),
+    path("async/books/<str:pk>/", views.AsyncBookRetrieveView.as_view()),
     path("auth/token/", TokenObtainPairView.as_view()),
     path("auth/token/refresh/", TokenRefreshView.as_view()),
 ]
@@ -0,0 +1,36 @@
+from typing import Any, Dict
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+def get_cache_config(url: str, max_entries: int = 10000) -> Dict[str, Any]:
+    """キャッシュのURLから、`CACHES`設定のキャッシュの設定を作成する。
+
+    - `redis://`または`rediss://`: Redis(`redis`パッケージが必要)
+    - `memcached://ホスト:ポート[,ホスト:ポート...]`: memcached(`pymemcache`パッケージが必要)
+    - 空文字列: ローカルメモリキャッシュ(プロセス間で共有しないため、開発サーバー及びテスト用)
+
+    Args:
+        url: キャッシュのURL。
+        max_entries: ローカルメモリキャッシュに保存するエントリの最大数。
+    Returns:
+        キャッシュの設定。
+    Exceptions:
+        ImproperlyConfigured: URLのスキームに対応していない場合。
+    """
+    if not url:
+        return {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {"MAX_ENTRIES": max_entries},
+        }
+    if url.startswith(("redis://", "rediss://")):
+        return {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": url,
+        }
+    if url.startswith("memcached://"):
+        return {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": url.replace("memcached://", "", 1).split(","),
+        }
+    raise ImproperlyConfigured(f"対応していないキャッシュのURLです: {url}")
@@ -11,10 +11,13 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 from typing import List
 
+from book_management.cache import get_cache_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +47,7 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt",
     "django_bootstrap5",
     "debug_toolbar",
+    "core.apps.CoreConfig",
     "accounts.apps.AccountsConfig",
     "divisions.apps.DivisionsConfig",
     "books.apps.BooksConfig",
@@ -51,7 +55,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # すべてのミドルウェアを含めて計測するため、最初に配置
+    "core.middleware.ServerTimingMiddleware",
+    "core.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # ログインで変更したセッションキーを参照するため、セッションミドルウェアより前に配置
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -87,13 +96,76 @@ WSGI_APPLICATION = "book_management.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# SQLiteの本番用プロファイルを使用するか(環境変数`SQLITE_PROFILE`に`production`を指定)
+SQLITE_PRODUCTION = os.environ.get("SQLITE_PROFILE") == "production"
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # 本番用プロファイルでは、リクエストごとに接続せずに接続を再利用
+        "CONN_MAX_AGE": 600 if SQLITE_PRODUCTION else 0,
+        "CONN_HEALTH_CHECKS": SQLITE_PRODUCTION,
     }
 }
 
+# リードレプリカの数(環境変数`SQLITE_REPLICAS`で指定)
+# リードレプリカは`refresh_replicas`コマンドで、プライマリのデータベースファイルを複製して更新
+DATABASE_REPLICAS: List[str] = []
+for i in range(int(os.environ.get("SQLITE_REPLICAS", "0"))):
+    DATABASES[f"replica{i + 1}"] = {
+        **DATABASES["default"],
+        "NAME": BASE_DIR / f"db.replica{i + 1}.sqlite3",
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{i + 1}")
+
+# 安全なメソッドのリクエストの読み込みを、リードレプリカに振り分けるデータベースルーター
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+
+# 書き込んだクライアントを、リードレプリカから読み込まずにプライマリに固定する秒数
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+# SQLiteの接続を作成したときに設定するPRAGMA
+# 本番用プロファイルでは、WALで書き込み中も読み込みをブロックせず、コミットごとのfsyncを省略して、
+# 256MiBのメモリマップドI/Oと64MiBのページキャッシュを使用する。ロックを5秒まで待機する。
+SQLITE_PRAGMAS = (
+    {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,
+        "busy_timeout": 5000,
+        "temp_store": "MEMORY",
+    }
+    if SQLITE_PRODUCTION
+    else {}
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# 次のキャッシュは、書き込んだワーカープロセスと異なるワーカープロセスからも参照されるため、
+# 複数のワーカープロセスで実行する場合は、プロセス間で共有するキャッシュが必要である(プロセスごとの
+# ローカルメモリキャッシュでは、他のプロセスが古いデータを返却したり、書き込んだクライアントを
+# リードレプリカに振り分けたりする)。
+# - コードキャッシュ及びテーブルのバージョン
+# - 書き込んだクライアントをプライマリに固定する期限
+# - ISBNで取得した書籍、認証したユーザー及び書籍一覧の行のテンプレートの断片
+# 共有するキャッシュは、環境変数`CACHE_URL`にRedis(`redis://ホスト:ポート/DB番号`)または
+# memcached(`memcached://ホスト:ポート`)のURLを指定する。指定しない場合は、1つのプロセスで実行する
+# 開発サーバー用のローカルメモリキャッシュを使用する。
+# ファイルキャッシュは書き込むたびにディレクトリ内のすべてのファイルを列挙するため使用しない。
+
+# テストを実行しているか
+TESTING = sys.argv[1:2] == ["test"]
+
+CACHES = {
+    # テストは開発者のキャッシュを参照及び削除しないように、常にローカルメモリキャッシュを使用
+    "default": get_cache_config("" if TESTING else os.environ.get("CACHE_URL", "")),
+}
+
 
 # 認証で使用するユーザーモデル
 AUTH_USER_MODEL = "accounts.User"
@@ -148,12 +220,71 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Django REST Framework
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+    "DEFAULT_AUTHENTICATION_CLASSES": ("api1.authentication.CachedJWTAuthentication",),
+    # orjsonがインストールされている場合は、orjsonでJSONをレンダリング及び解析
+    "DEFAULT_RENDERER_CLASSES": (
+        "api1.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "api1.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(hours=1),
     "USER_ID_FIELD": "email",
 }
+
+
+# クエリ予算を超過したときに例外をスローするか(Falseの場合は警告をログに記録)
+QUERY_BUDGET_STRICT = False
+
+# 書籍一覧ページで、1ページに表示する書籍の数
+BOOK_LIST_PAGE_SIZE = 50
+
+# 書籍一覧ページで、書籍の行をレンダリングした結果をキャッシュする秒数
+# (書籍の行は多いため、表示されなくなった行がキャッシュに長く残らないように短くする)
+BOOK_LIST_ROW_CACHE_TTL = 600
+
+# 書籍フォームの選択肢を、ブラウザーがキャッシュする秒数(URLにバージョンを含むため変更されない)
+BOOK_CHOICES_MAX_AGE = 365 * 24 * 60 * 60
+
+# 書籍の一括操作で、1回のINSERTまたはUPDATEで書き込む書籍の既定の数
+BOOK_BULK_BATCH_SIZE = 500
+
+# 書籍のエクスポートで、1回にデータベースから取得する行の数
+BOOK_EXPORT_CHUNK_SIZE = 2000
+
+# 書籍のインポートで、まとめて検証及び登録する行の既定の数
+BOOK_IMPORT_BATCH_SIZE = 1000
+
+# ISBNで取得した書籍をキャッシュする秒数
+BOOK_ISBN_CACHE_TTL = 300
+
+# JWT認証で、認証したユーザーをキャッシュする秒数
+JWT_USER_CACHE_TTL = 60
+
+# JWT認証で、安全なメソッドのリクエストをデータベースを参照せずに認証するか
+JWT_STATELESS_SAFE_METHODS = False
+
+# `Server-Timing`ヘッダーで処理時間を報告するリクエストを無作為に抽出する割合(0.0から1.0)
+SERVER_TIMING_SAMPLE_RATE = 0.0
+
+# 常に`Server-Timing`ヘッダーで処理時間を報告するリクエストのパスの正規表現
+SERVER_TIMING_PATHS: List[str] = []
+
+# 複数のプロセスでメトリクスを共有するディレクトリ(環境変数`METRICS_DIR`で指定)
+# 指定しない場合は、メトリクスを記録したプロセスのメトリクスのみを返却
+# 終了したプロセスのファイルはプロセスIDで判定して削除するため、同じホストのプロセスのみで共有
+METRICS_DIR = os.environ.get("METRICS_DIR")
+
+# メトリクスを共有するディレクトリに、プロセスのメトリクスを書き込む間隔(秒)
+METRICS_FLUSH_INTERVAL = 5.0
+
+# メトリクスを取得するときに`Authorization: Bearer`ヘッダーで送信するトークン
+# (環境変数`METRICS_TOKEN`で指定)
+# 指定しない場合は、スタッフユーザーのみメトリクスを取得可能
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
@@ -18,12 +18,15 @@ from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import metrics
+
 urlpatterns = [
     path("accounts/", include("accounts.urls")),
     path("divisions/", include("divisions.urls")),
     path("books/", include("books.urls")),
     path("api1/", include("api1.urls")),
     path("admin/", admin.site.urls),
+    path("metrics", metrics, name="metrics"),
 ]
 
 if settings.DEBUG:
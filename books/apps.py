@@ -5,3 +5,10 @@ class BooksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "books"
     verbose_name = "書籍アプリ"
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
+        from .caches import classification_cache, classification_detail_cache
+
+        classification_cache.connect()
+        classification_detail_cache.connect()
@@ -0,0 +1,11 @@
+from core.caches import CodeCache
+
+from .models import Classification, ClassificationDetail
+
+# 書籍分類コードをキー、書籍分類モデルインスタンスを値としたキャッシュ
+classification_cache = CodeCache(Classification)
+
+# 書籍分類詳細コードをキー、書籍分類詳細モデルインスタンスを値としたキャッシュ
+classification_detail_cache = CodeCache(
+    ClassificationDetail, select_related=("classification",)
+)
@@ -0,0 +1,71 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from core import jsonutils
+from divisions.caches import division_cache
+
+from .caches import classification_cache, classification_detail_cache
+
+
+@dataclass(frozen=True)
+class BookChoices:
+    """書籍フォームの選択肢"""
+
+    # 選択肢の内容のハッシュ値(マスターテーブルが変更されると変わる)
+    version: str
+    # 書籍分類、書籍分類詳細及び部署の選択肢のJSON
+    content: bytes
+
+
+# 選択肢を作成したときのコードキャッシュのバージョンと、作成した選択肢
+_choices: Optional[Tuple[Tuple[str, ...], BookChoices]] = None
+_lock = threading.Lock()
+
+
+def build_book_choices() -> BookChoices:
+    """コードキャッシュから書籍フォームの選択肢を作成する。
+
+    バージョンには選択肢の内容のハッシュ値を使用するため、どのプロセスで作成しても、マスターテーブルが
+    同じであれば同じバージョンとなる。
+
+    Returns:
+        書籍フォームの選択肢。
+    """
+    data = {
+        "classifications": [
+            {"code": c.code, "name": c.name}
+            for c in classification_cache.all().values()
+        ],
+        "classification_details": [
+            {"code": d.code, "classification": d.classification_id, "name": d.name}
+            for d in classification_detail_cache.all().values()
+        ],
+        "divisions": [
+            {"code": d.code, "name": d.name} for d in division_cache.all().values()
+        ],
+    }
+    content = jsonutils.dumps(data)
+    return BookChoices(hashlib.sha256(content).hexdigest()[:16], content)
+
+
+def get_book_choices() -> BookChoices:
+    """書籍フォームの選択肢を返却する。
+
+    コードキャッシュのバージョンが変わるまで、作成した選択肢をプロセス内に保持する。
+
+    Returns:
+        書籍フォームの選択肢。
+    """
+    global _choices
+    versions = (
+        classification_cache.version,
+        classification_detail_cache.version,
+        division_cache.version,
+    )
+    current = _choices
+    if current is None or current[0] != versions:
+        with _lock:
+            current = _choices = (versions, build_book_choices())
+    return current[1]
@@ -0,0 +1,153 @@
+import csv
+import json
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from django.db.models import QuerySet
+
+from .models import Book
+
+# エクスポートする列名と、列の値を取得するルックアップ
+EXPORT_COLUMNS: Sequence[Tuple[str, str]] = (
+    ("id", "id"),
+    ("title", "title"),
+    ("classification_code", "classification_detail__classification_id"),
+    ("classification_name", "classification_detail__classification__name"),
+    ("classification_detail_code", "classification_detail_id"),
+    ("classification_detail_name", "classification_detail__name"),
+    ("authors", "authors"),
+    ("isbn", "isbn"),
+    ("publisher", "publisher"),
+    ("published_at", "published_at"),
+    ("division_code", "division_id"),
+    ("division_name", "division__name"),
+    ("disposed", "disposed"),
+    ("disposed_at", "disposed_at"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+)
+
+# エクスポートする列名
+EXPORT_FIELD_NAMES = [name for name, _ in EXPORT_COLUMNS]
+
+# エクスポート形式とコンテンツタイプ
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _to_text(value: Any) -> Any:
+    """日付及び日時をISO 8601形式の文字列に変換する。
+
+    Args:
+        value: 値。
+    Returns:
+        変換した値。
+    """
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def iter_book_rows(
+    queryset: Optional[QuerySet[Book]] = None, chunk_size: int = 2000
+) -> Iterator[List[Any]]:
+    """エクスポートする書籍の行を、データベースからチャンク単位で取得しながら返却する。
+
+    モデルインスタンスを構築せずに、結合したテーブルから必要な列の値のみを取得する。
+
+    Args:
+        queryset: エクスポートする書籍のQuerySet。Noneの場合はすべての書籍。
+        chunk_size: 1回にデータベースから取得する行の数。
+    Yields:
+        `EXPORT_COLUMNS`の順に並んだ列の値のリスト。
+    """
+    if queryset is None:
+        queryset = Book.objects.all()
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    rows = queryset.order_by("id").values_list(*lookups)
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield [_to_text(value) for value in row]
+
+
+def _buffered(lines: Iterator[str], size: int) -> Iterator[bytes]:
+    """複数行をまとめてUTF-8でエンコードしたバイト列を返却する。
+
+    Args:
+        lines: 行。
+        size: まとめる行の数。
+    Yields:
+        エンコードしたバイト列。
+    """
+    buffer: List[str] = []
+    for line in lines:
+        buffer.append(line)
+        if size <= len(buffer):
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def iter_ndjson(rows: Iterator[List[Any]], buffer_size: int = 500) -> Iterator[bytes]:
+    """書籍の行をNDJSON形式で返却する。
+
+    Args:
+        rows: `iter_book_rows`が返却する書籍の行。
+        buffer_size: まとめてエンコードする行の数。
+    Returns:
+        NDJSON形式のバイト列を返却するイテレーター。
+    """
+    lines = (
+        json.dumps(dict(zip(EXPORT_FIELD_NAMES, row)), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+    return _buffered(lines, buffer_size)
+
+
+class _Echo:
+    """書き込まれた値をそのまま返却する疑似バッファ"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(rows: Iterator[List[Any]], buffer_size: int = 500) -> Iterator[bytes]:
+    """書籍の行をヘッダー行付きのCSV形式で返却する。
+
+    Args:
+        rows: `iter_book_rows`が返却する書籍の行。
+        buffer_size: まとめてエンコードする行の数。
+    Yields:
+        CSV形式のバイト列。
+    """
+    writer = csv.writer(_Echo())
+    header = writer.writerow(EXPORT_FIELD_NAMES)
+    lines = (writer.writerow(row) for row in rows)
+    yield header.encode("utf-8")
+    yield from _buffered(lines, buffer_size)
+
+
+# エクスポート形式と、書籍の行をエクスポート形式に変換する関数
+ENCODERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}
+
+
+def export_books(
+    export_format: str,
+    queryset: Optional[QuerySet[Book]] = None,
+    chunk_size: int = 2000,
+) -> Iterator[bytes]:
+    """書籍をエクスポート形式でストリーミングする。
+
+    Args:
+        export_format: エクスポート形式(`ndjson`または`csv`)。
+        queryset: エクスポートする書籍のQuerySet。Noneの場合はすべての書籍。
+        chunk_size: 1回にデータベースから取得する行の数。
+    Returns:
+        エクスポート形式のバイト列を返却するイテレーター。
+    Exceptions:
+        KeyError: エクスポート形式が不正な場合。
+    """
+    encoder = ENCODERS[export_format]
+    return encoder(iter_book_rows(queryset, chunk_size))
@@ -0,0 +1,120 @@
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import connection
+
+from divisions.caches import division_cache
+
+from .caches import classification_cache, classification_detail_cache
+from .models import Book, BookFacetCount
+
+# 書籍分類詳細コード、管理部署コード及び廃棄済みのタプル
+FacetKey = Tuple[str, str, bool]
+
+
+def diff(old: Optional[FacetKey], new: Optional[FacetKey]) -> "Counter[FacetKey]":
+    """書籍集計のキーの変更から、書籍の数の増減を返却する。
+
+    Args:
+        old: 変更前のキー。書籍を登録した場合はNone。
+        new: 変更後のキー。書籍を削除した場合はNone。
+    Returns:
+        キーと書籍の数の増減。
+    """
+    deltas: "Counter[FacetKey]" = Counter()
+    if old != new:
+        if old is not None:
+            deltas[old] -= 1
+        if new is not None:
+            deltas[new] += 1
+    return deltas
+
+
+def apply_deltas(deltas: Dict[FacetKey, int]) -> None:
+    """書籍集計の書籍の数を増減する。
+
+    キーが存在しない場合は行を登録して、存在する場合は書籍の数を増減する。
+
+    Args:
+        deltas: キーと書籍の数の増減。
+    """
+    rows = [(*key, delta) for key, delta in deltas.items() if delta]
+    if not rows:
+        return
+    table = BookFacetCount._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} "
+            "(classification_detail_code, division_code, disposed, count) "
+            "VALUES (%s, %s, %s, %s) "
+            "ON CONFLICT (classification_detail_code, division_code, disposed) "
+            f"DO UPDATE SET count = {table}.count + excluded.count",
+            rows,
+        )
+
+
+def rebuild_facets() -> int:
+    """書籍テーブルを集計して、書籍集計を再構築する。
+
+    Returns:
+        書籍集計の行の数。
+    """
+    table = BookFacetCount._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(
+            f"INSERT INTO {table} "
+            "(classification_detail_code, division_code, disposed, count) "
+            "SELECT classification_detail_code, division_code, disposed, COUNT(*) "
+            f"FROM {Book._meta.db_table} "
+            "GROUP BY classification_detail_code, division_code, disposed"
+        )
+        return cursor.rowcount
+
+
+def _to_list(counts: "Counter[Any]", names: Dict[Any, str]) -> List[Dict[str, Any]]:
+    return [
+        OrderedDict(code=code, name=names.get(code), count=count)
+        for code, count in sorted(counts.items())
+        if count
+    ]
+
+
+def get_facets() -> Dict[str, Any]:
+    """書籍分類、書籍分類詳細、管理部署及び廃棄済みごとの書籍の数を返却する。
+
+    書籍テーブルを集計せずに、書籍集計の行を合計する。書籍分類などの名前はキャッシュから参照する。
+
+    Returns:
+        書籍分類(`classification`)、書籍分類詳細(`classification_detail`)、
+        管理部署(`division`)及び廃棄済み(`disposed`)ごとの書籍の数。
+    """
+    rows = BookFacetCount.objects.values_list(
+        "classification_detail_id", "division_id", "disposed", "count"
+    )
+    details = classification_detail_cache.all()
+    classifications: "Counter[str]" = Counter()
+    classification_details: "Counter[str]" = Counter()
+    divisions: "Counter[str]" = Counter()
+    disposed: "Counter[bool]" = Counter()
+    for detail_code, division_code, is_disposed, count in rows:
+        detail = details.get(detail_code)
+        if detail is not None:
+            classifications[detail.classification_id] += count
+        classification_details[detail_code] += count
+        divisions[division_code] += count
+        disposed[is_disposed] += count
+    return OrderedDict(
+        classification=_to_list(
+            classifications, {c: o.name for c, o in classification_cache.all().items()}
+        ),
+        classification_detail=_to_list(
+            classification_details, {c: o.name for c, o in details.items()}
+        ),
+        division=_to_list(
+            divisions, {c: o.name for c, o in division_cache.all().items()}
+        ),
+        disposed=[
+            OrderedDict(value=value, count=disposed[value]) for value in (False, True)
+        ],
+    )
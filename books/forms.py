@@ -1,14 +1,27 @@
+from typing import Optional
+
 from django import forms
 
-from .models import Book, Classification
+from core.forms import CodeChoiceField
+from divisions.caches import division_cache
+
+from .caches import classification_cache, classification_detail_cache
+from .models import Book, BookQuerySet, ClassificationDetail
 
 
 class BookForm(forms.ModelForm):
-    """書籍フォーム"""
+    """書籍フォーム
 
-    classification = forms.ModelChoiceField(
-        label="書籍分類", queryset=Classification.objects.all(), empty_label=None
+    書籍分類、書籍分類詳細及び管理部署の選択肢は、コードキャッシュから生成する。
+    """
+
+    classification = CodeChoiceField(
+        classification_cache, label="書籍分類", empty_label=None
+    )
+    classification_detail = CodeChoiceField(
+        classification_detail_cache, label="書籍分類詳細", empty_label=None
     )
+    division = CodeChoiceField(division_cache, label="管理部署", empty_label=None)
 
     class Meta:
         model = Book
@@ -25,8 +38,80 @@ class BookForm(forms.ModelForm):
             "disposed_at",
         )
 
-    def __init__(self, *args, **kwargs) -> None:
-        """イニシャライザ"""
-        super().__init__(*args, **kwargs)
-        self.fields["classification_detail"].empty_label = None
-        self.fields["division"].empty_label = None
+    def clean_isbn(self) -> Optional[str]:
+        """ISBNが他の書籍と重複していないか検証する。
+
+        Returns:
+            ISBN。
+        Exceptions:
+            ValidationError: 同じISBNの書籍が登録されている場合。
+        """
+        isbn = self.cleaned_data.get("isbn")
+        if Book.objects.with_isbn(isbn).exclude(pk=self.instance.pk).exists():
+            raise forms.ValidationError("同じISBNの書籍が既に登録されています。")
+        return isbn
+
+
+class BookFilterForm(forms.Form):
+    """書籍絞り込みフォーム
+
+    書籍一覧ページと書籍APIで共通の絞り込み条件を宣言する。
+    それぞれの条件は、書籍テーブルのインデックスを検索できるように、書籍テーブルの列のみを比較する。
+    """
+
+    # 管理部署コード
+    division_code = forms.CharField(label="管理部署コード", max_length=2, required=False)
+    # 書籍分類コード
+    classification_code = forms.CharField(label="書籍分類コード", max_length=3, required=False)
+    # 書籍分類詳細コード
+    classification_detail_code = forms.CharField(
+        label="書籍分類詳細コード", max_length=3, required=False
+    )
+    # 廃棄済み
+    disposed = forms.NullBooleanField(label="廃棄済み", required=False)
+    # 発行日の開始日
+    published_from = forms.DateField(label="発行日(開始)", required=False)
+    # 発行日の終了日
+    published_to = forms.DateField(label="発行日(終了)", required=False)
+    # 登録日時の開始日時
+    created_from = forms.DateTimeField(label="登録日時(開始)", required=False)
+    # 登録日時の終了日時
+    created_to = forms.DateTimeField(label="登録日時(終了)", required=False)
+
+    def filter_queryset(self, queryset: BookQuerySet) -> BookQuerySet:
+        """検証に成功した絞り込み条件で書籍を絞り込む。
+
+        書籍分類は、書籍分類詳細テーブルを結合せずに、書籍分類に属する書籍分類詳細コードの
+        サブクエリで絞り込む。
+
+        Args:
+            queryset: 絞り込む書籍のQuerySet。
+        Returns:
+            絞り込んだ書籍のQuerySet。
+        """
+        data = self.cleaned_data
+        if data.get("division_code"):
+            queryset = queryset.filter(division_id=data["division_code"])
+        if data.get("classification_code"):
+            codes = ClassificationDetail.objects.filter(
+                classification_id=data["classification_code"]
+            ).values("code")
+            queryset = queryset.filter(classification_detail_id__in=codes)
+        if data.get("classification_detail_code"):
+            queryset = queryset.filter(
+                classification_detail_id=data["classification_detail_code"]
+            )
+        if data.get("disposed") is not None:
+            # `disposed=True`は`WHERE disposed`に変換されてインデックスを検索できないため、
+            # 値と比較する`IN`で絞り込む
+            queryset = queryset.filter(disposed__in=[data["disposed"]])
+        if data.get("published_from"):
+            queryset = queryset.filter(published_at__gte=data["published_from"])
+        if data.get("published_to"):
+            queryset = queryset.filter(published_at__lte=data["published_to"])
+        if data.get("created_from") or data.get("created_to"):
+            # 登録日時は、書籍IDのタイムスタンプで主キーの範囲を検索
+            queryset = queryset.created_between(
+                data.get("created_from"), data.get("created_to")
+            )
+        return queryset
@@ -0,0 +1,340 @@
+import csv
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import django
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+
+from core import jsonutils
+from core.caches import TableVersion
+from divisions.caches import division_cache
+
+from .caches import classification_detail_cache
+from .facets import FacetKey, apply_deltas
+from .isbn import normalize_isbn
+from .models import Book
+from .search import index_books
+
+# インポートする書籍モデルのフィールド名(書籍分類詳細及び管理部署を除く)
+IMPORT_FIELD_NAMES = (
+    "title",
+    "authors",
+    "isbn",
+    "publisher",
+    "published_at",
+    "disposed",
+    "disposed_at",
+)
+
+# 入力の行番号と、解析前の行(CSVの場合は列名をキーとした辞書、NDJSONの場合は文字列)
+RawRow = Tuple[int, Any]
+
+
+@dataclass
+class RejectedRow:
+    """検証に失敗した行"""
+
+    # 入力の行番号
+    line: int
+    # フィールド名をキー、エラーメッセージのリストを値とした辞書
+    errors: Dict[str, List[str]]
+    # 解析前の行
+    row: Any
+
+    def to_dict(self) -> Dict[str, Any]:
+        """検証に失敗した行を辞書に変換する。
+
+        Returns:
+            検証に失敗した行の辞書。
+        """
+        return {"line": self.line, "errors": self.errors, "row": self.row}
+
+
+@dataclass
+class ImportStats:
+    """書籍のインポートの結果"""
+
+    # 読み込んだ行の数
+    read: int = 0
+    # 登録した書籍の数
+    inserted: int = 0
+    # 検証に失敗した行の数
+    rejected: int = 0
+    # インポートに要した時間(秒)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """1秒あたりに処理した行の数"""
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+def iter_csv_rows(f: IO[str]) -> Iterator[RawRow]:
+    """ヘッダー行付きのCSVの行を読み込む。
+
+    エクスポートしたCSVと同じ列名を使用し、インポートしない列は無視する。
+
+    Args:
+        f: `newline=""`で開いたテキストファイル。
+    Yields:
+        行番号と、列名をキーとした辞書。
+    """
+    reader = csv.DictReader(f)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_ndjson_rows(f: IO[str]) -> Iterator[RawRow]:
+    """NDJSONの行を読み込む。空行は無視する。
+
+    JSONの解析は検証と同時に行うため、読み込んだ行をそのまま返却する。
+
+    Args:
+        f: テキストファイル。
+    Yields:
+        行番号と、行の文字列。
+    """
+    for line_number, line in enumerate(f, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+# インポート形式と、行を読み込む関数
+READERS: Dict[str, Callable[[IO[str]], Iterator[RawRow]]] = {
+    "csv": iter_csv_rows,
+    "ndjson": iter_ndjson_rows,
+}
+
+
+# 解析した行、書籍モデルのフィールド名をキーとした検証したデータ及びエラー
+ValidatedRow = Tuple[RawRow, Dict[str, Any], Dict[str, List[str]]]
+
+# ISBNが重複している行のエラーメッセージ
+DUPLICATE_ISBN_MESSAGE = "A book with this ISBN already exists."
+
+
+@lru_cache(maxsize=None)
+def _get_form_fields() -> Dict[str, forms.Field]:
+    """書籍フォームと同じ検証規則のフォームフィールドを、書籍モデルのフィールドから作成する。"""
+    # 汎用外部キー及び逆参照を除いた、書籍モデルの具象フィールド
+    model_fields = {
+        field.name: field
+        for field in Book._meta.get_fields()
+        if isinstance(field, models.Field) and field.concrete
+    }
+    return {name: model_fields[name].formfield() for name in IMPORT_FIELD_NAMES}
+
+
+@dataclass(frozen=True)
+class BookRowValidator:
+    """書籍の行の検証器
+
+    書籍フォームと同じ規則でフィールドを検証して、書籍分類詳細コード及び管理部署コードを
+    データベースに問い合わせずにコードの集合と照合する。ISBNの重複は、データベースを検索する
+    必要があるため検証しない。プロセスプールのワーカーに渡せるように、
+    データベース接続やモデルインスタンスを保持しない。
+    """
+
+    # 書籍分類詳細コードの集合
+    classification_detail_codes: FrozenSet[str]
+    # 部署コードの集合
+    division_codes: FrozenSet[str]
+
+    def __call__(self, rows: List[RawRow]) -> List[ValidatedRow]:
+        """行を検証する。
+
+        Args:
+            rows: 行番号と解析前の行のリスト。
+        Returns:
+            検証した行のリスト。
+        """
+        return [self.validate(line, raw) for line, raw in rows]
+
+    def validate(self, line: int, raw: Any) -> ValidatedRow:
+        """1行を解析して検証する。
+
+        Args:
+            line: 行番号。
+            raw: 解析前の行。
+        Returns:
+            解析した行、検証したデータ及びエラー。エラーが空の場合は検証に成功している。
+        """
+        if isinstance(raw, str):
+            try:
+                raw = jsonutils.loads(raw)
+            except ValueError:
+                return (line, raw), {}, {"row": ["Invalid JSON."]}
+        if not isinstance(raw, dict):
+            return (line, raw), {}, {"row": ["Expected an object."]}
+        data: Dict[str, Any] = {}
+        errors: Dict[str, List[str]] = {}
+        for name, field in _get_form_fields().items():
+            try:
+                data[name] = field.clean(raw.get(name))
+            except ValidationError as e:
+                errors[name] = e.messages
+        code = str(raw.get("classification_detail_code") or "")
+        if code not in self.classification_detail_codes:
+            errors["classification_detail_code"] = [
+                "Classification detail doesn't exist"
+            ]
+        data["classification_detail_id"] = code
+        code = str(raw.get("division_code") or "")
+        if code not in self.division_codes:
+            errors["division_code"] = ["Division doesn't exist"]
+        data["division_id"] = code
+        data["isbn13"] = normalize_isbn(data.get("isbn"))
+        return (line, raw), data, errors
+
+
+def _batched(rows: Iterable[RawRow], size: int) -> Iterator[List[RawRow]]:
+    """行を指定された数ずつまとめる。"""
+    batch: List[RawRow] = []
+    for row in rows:
+        batch.append(row)
+        if size <= len(batch):
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate_batches(
+    batches: Iterable[List[RawRow]], validator: BookRowValidator, workers: int
+) -> Iterator[List[ValidatedRow]]:
+    """行をまとめて検証する。
+
+    ワーカーが2以上の場合は、プロセスプールで解析及び検証する。入力をすべて読み込まないように、
+    ワーカーの2倍までのまとまりを先行して送信して、入力の順に結果を返却する。
+
+    Args:
+        batches: 行のまとまり。
+        validator: 書籍の行の検証器。
+        workers: ワーカープロセスの数。
+    Yields:
+        検証した行のまとまり。
+    """
+    if workers <= 1:
+        for batch in batches:
+            yield validator(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+        pending: Deque[Future] = deque()
+        for batch in batches:
+            pending.append(executor.submit(validator, batch))
+            if workers * 2 <= len(pending):
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _check_isbns(batch: List[ValidatedRow], seen: Set[str]) -> None:
+    """検証に成功した行のISBNが、登録済みの書籍や前の行と重複していないか検証する。
+
+    Args:
+        batch: 検証した行のまとまり。重複している行にエラーを設定する。
+        seen: これまでに読み込んだ行のISBN-13の集合。このまとまりのISBN-13を追加する。
+    """
+    isbns = [
+        data["isbn13"] for _, data, errors in batch if not errors and data["isbn13"]
+    ]
+    if not isbns:
+        return
+    existing = set(
+        Book.objects.filter(isbn13__in=isbns).values_list("isbn13", flat=True)
+    )
+    for _, data, errors in batch:
+        isbn13 = data.get("isbn13")
+        if errors or not isbn13:
+            continue
+        if isbn13 in existing or isbn13 in seen:
+            errors["isbn"] = [DUPLICATE_ISBN_MESSAGE]
+        seen.add(isbn13)
+
+
+def _insert(rows: List[Dict[str, Any]]) -> None:
+    """検証した書籍を一括で登録して、全文検索インデックスと書籍集計を更新する。
+
+    Args:
+        rows: 書籍モデルのフィールド名をキーとした検証したデータのリスト。
+    """
+    books = [Book(**data) for data in rows]
+    deltas: "Counter[FacetKey]" = Counter(book.get_facet_key() for book in books)
+    with transaction.atomic():
+        Book.objects.bulk_create(books)
+        # 一括登録はシグナルを送信しないため、全文検索インデックス、書籍集計及びテーブルの
+        # バージョンを明示的に更新
+        index_books([book.id for book in books])
+        apply_deltas(deltas)
+        TableVersion.for_model(Book).invalidate()
+
+
+def import_books(
+    rows: Iterable[RawRow],
+    batch_size: int = 1000,
+    workers: int = 1,
+    dry_run: bool = False,
+    on_reject: Optional[Callable[[RejectedRow], None]] = None,
+    on_batch: Optional[Callable[[ImportStats], None]] = None,
+) -> ImportStats:
+    """書籍の行を読み込みながら検証して、検証に成功した書籍をまとめて登録する。
+
+    まとまりごとにトランザクションを分けて登録するため、途中で失敗した場合も、それまでに登録した
+    書籍は登録されたままとなる。検証に失敗した行は登録せずに、`on_reject`に渡す。
+    書籍IDは、入力に含まれていても新しく生成する。
+
+    Args:
+        rows: `READERS`の関数が返却する行。
+        batch_size: まとめて検証及び登録する行の数。
+        workers: 解析及び検証するワーカープロセスの数。1以下の場合は現在のプロセスで検証する。
+        dry_run: 検証のみを行い、登録しない場合は`True`。
+        on_reject: 検証に失敗した行を受け取る関数。
+        on_batch: まとまりを処理するたびに、それまでの結果を受け取る関数。
+    Returns:
+        インポートの結果。
+    """
+    start = time.perf_counter()
+    stats = ImportStats()
+    # 書籍分類詳細及び部署をメモリに読み込み、コードの照合でデータベースに問い合わせない
+    validator = BookRowValidator(
+        frozenset(classification_detail_cache.all()),
+        frozenset(division_cache.all()),
+    )
+    # 読み込んだ行のISBN-13(検証のみを行う場合は登録しないため、前のまとまりとの重複も検証)
+    seen: Set[str] = set()
+    batches = _validate_batches(_batched(rows, batch_size), validator, workers)
+    for batch in batches:
+        _check_isbns(batch, seen)
+        valid = [data for _, data, errors in batch if not errors]
+        for (line, raw), _, errors in batch:
+            if errors and on_reject is not None:
+                on_reject(RejectedRow(line, errors, raw))
+        if valid and not dry_run:
+            _insert(valid)
+            stats.inserted += len(valid)
+        stats.read += len(batch)
+        stats.rejected += len(batch) - len(valid)
+        stats.elapsed = time.perf_counter() - start
+        if on_batch is not None:
+            on_batch(stats)
+    stats.elapsed = time.perf_counter() - start
+    return stats
@@ -0,0 +1,85 @@
+import re
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+# ISBNの数字とチェックディジット以外の文字(ハイフン、空白、`ISBN`の接頭辞など)
+_NON_ISBN_CHARS = re.compile(r"[^0-9X]")
+
+
+def isbn13_check_digit(digits: str) -> str:
+    """ISBN-13のチェックディジットを計算する。
+
+    Args:
+        digits: ISBN-13の先頭12桁。
+    Returns:
+        チェックディジット。
+    """
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return str((10 - total % 10) % 10)
+
+
+def _isbn10_check_digit(digits: str) -> str:
+    """ISBN-10のチェックディジットを計算する。
+
+    Args:
+        digits: ISBN-10の先頭9桁。
+    Returns:
+        チェックディジット。
+    """
+    check = (11 - sum(int(d) * (10 - i) for i, d in enumerate(digits)) % 11) % 11
+    return "X" if check == 10 else str(check)
+
+
+def normalize_isbn(value: Optional[str]) -> Optional[str]:
+    """ISBNを、ハイフンなどの区切り文字を含まないISBN-13に正規化する。
+
+    ISBN-10は、接頭辞`978`を付与したISBN-13に変換する。
+
+    Args:
+        value: ISBN。`ISBN978-4-87311-817-8`のように区切り文字や接頭辞を含んでもよい。
+    Returns:
+        正規化したISBN-13。ISBNでない場合や、チェックディジットが誤っている場合はNone。
+    """
+    if not value:
+        return None
+    chars = _NON_ISBN_CHARS.sub("", value.upper())
+    if len(chars) == 13 and chars.isdigit():
+        if isbn13_check_digit(chars[:12]) == chars[12]:
+            return chars
+    elif len(chars) == 10 and chars[:9].isdigit():
+        if _isbn10_check_digit(chars[:9]) == chars[9]:
+            digits = "978" + chars[:9]
+            return digits + isbn13_check_digit(digits)
+    return None
+
+
+def get_isbn_cache_key(isbn13: str) -> str:
+    """ISBNで取得した書籍を保存するキャッシュのキーを返却する。
+
+    Args:
+        isbn13: 正規化したISBN-13。
+    Returns:
+        キャッシュのキー。
+    """
+    return f"book-isbn:{isbn13}"
+
+
+def invalidate_isbns(
+    isbns: Iterable[Optional[str]], using: Optional[str] = None
+) -> None:
+    """ISBNで取得した書籍をキャッシュから削除する。
+
+    コミットする前に他のリクエストが変更前の書籍をキャッシュする場合があるため、コミットした後で
+    もう一度削除する。
+
+    Args:
+        isbns: 正規化したISBN-13。Noneは無視する。
+        using: 書籍を保存または削除したデータベースのエイリアス。
+    """
+    keys = [get_isbn_cache_key(isbn13) for isbn13 in set(isbns) if isbn13]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys), using=using)
@@ -0,0 +1,47 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from books.exports import ENCODERS, export_books
+
+
+class Command(BaseCommand):
+    help = "すべての書籍をNDJSONまたはCSV形式でエクスポートします。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=sorted(ENCODERS),
+            default="ndjson",
+            help="エクスポート形式",
+        )
+        parser.add_argument("--output", "-o", help="出力するファイルのパス(省略した場合は標準出力)")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.BOOK_EXPORT_CHUNK_SIZE,
+            help="1回にデータベースから取得する行の数",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        chunks = export_books(
+            options["export_format"], chunk_size=options["chunk_size"]
+        )
+        if not options["output"]:
+            # 標準出力がバイト列を書き込めるバッファを持つ場合はデコードせずに書き込み、
+            # `call_command`に渡されたテキストストリームなどにはデコードして書き込む
+            buffer = getattr(self.stdout, "buffer", None)
+            self.stdout.flush()
+            for chunk in chunks:
+                if buffer is not None:
+                    buffer.write(chunk)
+                else:
+                    self.stdout.write(chunk.decode("utf-8"), ending="")
+            if buffer is not None:
+                buffer.flush()
+            return
+        with open(options["output"], "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
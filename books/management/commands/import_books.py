@@ -0,0 +1,87 @@
+import json
+import sys
+from contextlib import ExitStack
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from books.imports import READERS, ImportStats, RejectedRow, import_books
+
+
+class Command(BaseCommand):
+    help = "CSV(ヘッダー行付き)またはNDJSON形式のファイルから書籍を一括でインポートします。列名はエクスポートと同じで、書籍IDは新しく生成します。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", help="インポートするファイルのパス(`-`の場合は標準入力)")
+        parser.add_argument(
+            "--format",
+            dest="import_format",
+            choices=sorted(READERS),
+            help="インポート形式(省略した場合はファイルの拡張子から判定)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.BOOK_IMPORT_BATCH_SIZE,
+            help="まとめて検証及び登録する行の数",
+        )
+        parser.add_argument("--workers", type=int, default=1, help="解析及び検証するワーカープロセスの数")
+        parser.add_argument("--rejects", help="検証に失敗した行をNDJSON形式で書き込むファイルのパス")
+        parser.add_argument("--dry-run", action="store_true", help="検証のみを行い、登録しない")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        verbosity = options["verbosity"]
+        path = options["path"]
+        import_format = options["import_format"] or Path(path).suffix.lstrip(".")
+        if import_format not in READERS:
+            raise CommandError("--formatでインポート形式を指定してください。")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-sizeには1以上の整数を指定してください。")
+        with ExitStack() as stack:
+            if path == "-":
+                f: IO[str] = sys.stdin
+            else:
+                f = stack.enter_context(open(path, encoding="utf-8-sig", newline=""))
+            rejects: Optional[IO[str]] = None
+            if options["rejects"]:
+                rejects = stack.enter_context(
+                    open(options["rejects"], "w", encoding="utf-8")
+                )
+
+            def on_reject(rejected: RejectedRow) -> None:
+                if rejects is not None:
+                    rejects.write(json.dumps(rejected.to_dict(), ensure_ascii=False))
+                    rejects.write("\n")
+                elif verbosity >= 2:
+                    self.stderr.write(f"{rejected.line}行目: {rejected.errors}")
+
+            def on_batch(stats: ImportStats) -> None:
+                if verbosity >= 2:
+                    self.stdout.write(self.summarize(stats))
+
+            stats = import_books(
+                READERS[import_format](f),
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+                dry_run=options["dry_run"],
+                on_reject=on_reject,
+                on_batch=on_batch,
+            )
+        self.stdout.write(self.summarize(stats))
+        if stats.rejected and not options["rejects"]:
+            self.stdout.write("--rejectsを指定すると、検証に失敗した行を確認できます。")
+
+    def summarize(self, stats: ImportStats) -> str:
+        """インポートの結果を要約する。
+
+        Args:
+            stats: インポートの結果。
+        Returns:
+            インポートの結果の要約。
+        """
+        return (
+            f"{stats.read}行を読み込み、{stats.inserted}件を登録、{stats.rejected}行を拒否しました"
+            f"({stats.elapsed:.1f}秒、{stats.rows_per_second:.0f}行/秒)。"
+        )
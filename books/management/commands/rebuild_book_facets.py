@@ -0,0 +1,15 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from books.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = "書籍テーブルを集計して、書籍集計を再構築します。"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            count = rebuild_facets()
+        self.stdout.write(f"{count}件の書籍集計を登録しました。")
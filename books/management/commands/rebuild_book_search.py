@@ -0,0 +1,15 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from books.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "書籍の全文検索インデックスを再構築します。"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(f"{count}冊の書籍を全文検索インデックスに登録しました。")
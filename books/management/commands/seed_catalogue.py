@@ -0,0 +1,58 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from books.seeding import seed_catalogue
+
+# 登録したモデルの名前と表示名
+LABELS = {
+    "classifications": "書籍分類",
+    "classification_details": "書籍分類詳細",
+    "divisions": "部署",
+    "users": "ユーザー",
+    "books": "書籍",
+}
+
+
+class Command(BaseCommand):
+    help = "性能を計測するために、書籍分類、部署、ユーザー及び書籍の合成データを一括で登録します。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--books", type=int, default=10000, help="追加で登録する書籍の数")
+        parser.add_argument(
+            "--classifications", type=int, default=10, help="書籍分類の数(最大100)"
+        )
+        parser.add_argument(
+            "--details", type=int, default=10, help="書籍分類ごとの書籍分類詳細の数(最大10)"
+        )
+        parser.add_argument("--divisions", type=int, default=10, help="部署の数(最大100)")
+        parser.add_argument("--users", type=int, default=10, help="ユーザーの数")
+        parser.add_argument("--seed", type=int, default=0, help="乱数のシード")
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="1回のINSERTで登録する行の数"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        for name in ("books", "classifications", "details", "divisions", "users"):
+            if options[name] < 0:
+                raise CommandError(f"--{name}には0以上の整数を指定してください。")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-sizeには1以上の整数を指定してください。")
+        start = time.perf_counter()
+        try:
+            counts = seed_catalogue(
+                books=options["books"],
+                classifications=options["classifications"],
+                details=options["details"],
+                divisions=options["divisions"],
+                users=options["users"],
+                seed=options["seed"],
+                batch_size=options["batch_size"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+        summary = "、".join(f"{LABELS[name]}{count}件" for name, count in counts.items())
+        self.stdout.write(f"{summary}を登録しました({elapsed:.1f}秒)。")
+        self.stdout.write("既存の書籍分類、部署及びユーザーは登録されません。")
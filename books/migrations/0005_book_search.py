@@ -0,0 +1,91 @@
+# Generated by Django 4.2 on 2026-10-18 17:02
+
+import core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+CREATE_INDEX = """
+CREATE VIRTUAL TABLE books_fts USING fts5(
+    title, authors, publisher, tokenize = 'trigram'
+)
+"""
+
+DROP_INDEX = "DROP TABLE books_fts"
+
+
+def index_books(apps, schema_editor):
+    """既存の書籍を全文検索インデックスに登録する。"""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO book_search_documents (book_id) SELECT id FROM books"
+        )
+        cursor.execute(
+            "INSERT INTO books_fts (rowid, title, authors, publisher) "
+            "SELECT d.id, b.title, b.authors, b.publisher "
+            "FROM books b INNER JOIN book_search_documents d ON d.book_id = b.id"
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0004_book_title_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookSearchDocument",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "book",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="books.book",
+                        verbose_name="書籍",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "書籍全文検索ドキュメント",
+                "verbose_name_plural": "書籍全文検索ドキュメント",
+                "db_table": "book_search_documents",
+            },
+        ),
+        migrations.CreateModel(
+            name="BookSearchIndex",
+            fields=[
+                (
+                    "document",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="index",
+                        serialize=False,
+                        to="books.booksearchdocument",
+                        verbose_name="書籍全文検索ドキュメント",
+                    ),
+                ),
+                (
+                    "search",
+                    core.models.FullTextSearchField(
+                        db_column="books_fts", verbose_name="全文検索"
+                    ),
+                ),
+                ("title", models.TextField(verbose_name="タイトル")),
+                ("authors", models.TextField(null=True, verbose_name="著者または訳者")),
+                ("publisher", models.TextField(null=True, verbose_name="出版社")),
+                ("rank", models.FloatField(verbose_name="関連度")),
+            ],
+            options={
+                "verbose_name": "書籍全文検索インデックス",
+                "verbose_name_plural": "書籍全文検索インデックス",
+                "db_table": "books_fts",
+                "managed": False,
+            },
+        ),
+        migrations.RunSQL(CREATE_INDEX, DROP_INDEX),
+        migrations.RunPython(index_books, migrations.RunPython.noop),
+    ]
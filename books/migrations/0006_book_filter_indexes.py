@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-18 17:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("divisions", "0002_alter_division_options_alter_division_code_and_more"),
+        ("books", "0005_book_search"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="book",
+            name="division",
+            field=models.ForeignKey(
+                db_column="division_code",
+                db_index=False,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="books",
+                to="divisions.division",
+                verbose_name="管理部署",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["division", "disposed"], name="books_division_disposed_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(
+                fields=["disposed", "published_at"], name="books_disposed_published_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="book",
+            index=models.Index(fields=["published_at"], name="books_published_at_idx"),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2 on 2026-10-18 17:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_facets(apps, schema_editor):
+    """既存の書籍を集計する。"""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO book_facet_counts "
+            "(classification_detail_code, division_code, disposed, count) "
+            "SELECT classification_detail_code, division_code, disposed, COUNT(*) "
+            "FROM books GROUP BY classification_detail_code, division_code, disposed"
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("divisions", "0002_alter_division_options_alter_division_code_and_more"),
+        ("books", "0006_book_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookFacetCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("disposed", models.BooleanField(verbose_name="廃棄済み")),
+                ("count", models.IntegerField(default=0, verbose_name="書籍の数")),
+                (
+                    "classification_detail",
+                    models.ForeignKey(
+                        db_column="classification_detail_code",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="books.classificationdetail",
+                        verbose_name="書籍分類詳細",
+                    ),
+                ),
+                (
+                    "division",
+                    models.ForeignKey(
+                        db_column="division_code",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="divisions.division",
+                        verbose_name="管理部署",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "書籍集計",
+                "verbose_name_plural": "書籍集計",
+                "db_table": "book_facet_counts",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="bookfacetcount",
+            constraint=models.UniqueConstraint(
+                fields=("classification_detail", "division", "disposed"),
+                name="book_facet_counts_key_unique",
+            ),
+        ),
+        migrations.RunPython(count_facets, migrations.RunPython.noop),
+    ]
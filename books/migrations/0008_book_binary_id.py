@@ -0,0 +1,58 @@
+# Generated by Django 4.2 on 2026-10-18 17:09
+
+import core.models
+import core.ulids
+from django.db import migrations
+import ulid
+
+# 書籍IDを保存するテーブルと列
+ID_COLUMNS = [("books", "id"), ("book_search_documents", "book_id")]
+
+
+def convert(schema_editor, source_type, func):
+    """書籍IDを保存する列の値を変換する。"""
+    with schema_editor.connection.cursor() as cursor:
+        for table, column in ID_COLUMNS:
+            cursor.execute(
+                f"SELECT {column} FROM {table} WHERE typeof({column}) = %s",
+                [source_type],
+            )
+            rows = [(func(value), value) for (value,) in cursor.fetchall()]
+            cursor.executemany(
+                f"UPDATE {table} SET {column} = %s WHERE {column} = %s", rows
+            )
+
+
+def to_binary(apps, schema_editor):
+    """文字列の書籍IDを16バイトのバイナリに変換する。"""
+    convert(schema_editor, "text", lambda value: ulid.ULID.from_str(value).bytes)
+
+
+def to_text(apps, schema_editor):
+    """バイナリの書籍IDを26文字の文字列に変換する。"""
+    convert(
+        schema_editor, "blob", lambda value: str(ulid.ULID.from_bytes(bytes(value)))
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0007_book_facet_count"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="book",
+            name="id",
+            field=core.models.ULIDField(
+                binary=True,
+                default=core.ulids.monotonic_ulid,
+                editable=False,
+                max_length=26,
+                primary_key=True,
+                serialize=False,
+                verbose_name="書籍ID",
+            ),
+        ),
+        migrations.RunPython(to_binary, to_text),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2 on 2026-10-18 17:32
+
+import logging
+from typing import Dict
+
+from django.db import migrations, models
+
+from books.isbn import normalize_isbn
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_isbn13(apps, schema_editor):
+    """既存の書籍のISBNを正規化する。
+
+    同じISBNの書籍が複数存在する場合は、書籍IDが最も小さい書籍のみにISBN-13を設定して、
+    ISBN-13を設定しなかった書籍の書籍IDを警告として記録する。
+    """
+    Book = apps.get_model("books", "Book")
+    # ISBN-13をキーとした、ISBN-13を設定した書籍の書籍ID
+    seen: Dict[str, str] = {}
+    batch = []
+    rows = Book.objects.exclude(isbn=None).order_by("id").values_list("id", "isbn")
+    for book_id, isbn in rows.iterator(chunk_size=2000):
+        isbn13 = normalize_isbn(isbn)
+        if isbn13 is None:
+            continue
+        if isbn13 in seen:
+            logger.warning(
+                "Book %s duplicates the ISBN %s of book %s; its isbn13 is left NULL.",
+                book_id,
+                isbn13,
+                seen[isbn13],
+            )
+            continue
+        seen[isbn13] = book_id
+        batch.append(Book(id=book_id, isbn13=isbn13))
+        if len(batch) >= 1000:
+            Book.objects.bulk_update(batch, ["isbn13"])
+            batch.clear()
+    Book.objects.bulk_update(batch, ["isbn13"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("books", "0008_book_binary_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="isbn13",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=13,
+                null=True,
+                verbose_name="ISBN-13",
+            ),
+        ),
+        migrations.RunPython(backfill_isbn13, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="book",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("isbn13__isnull", False)),
+                fields=("isbn13",),
+                name="books_isbn13_uniq",
+            ),
+        ),
+    ]
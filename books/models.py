@@ -1,7 +1,12 @@
-import ulid
-from django.db import models
+from datetime import datetime
+from typing import Any, Collection, Optional, Tuple
 
-from core.models import TimestampModel, ULIDField
+from django.db import models, router, transaction
+
+from core.models import FullTextSearchField, TimestampModel, ULIDField
+from core.ulids import monotonic_ulid, ulid_range
+
+from .isbn import normalize_isbn
 
 
 class Classification(TimestampModel):
@@ -72,11 +77,58 @@ class ClassificationDetail(TimestampModel):
         return f"{self.code}: {self.name}"
 
 
+class BookQuerySet(models.QuerySet):
+    """書籍QuerySet"""
+
+    def with_isbn(self, isbn: Optional[str]) -> "BookQuerySet":
+        """ISBNで書籍を絞り込む。
+
+        正規化したISBN-13の一意索引を検索するため、ハイフンの有無やISBN-10とISBN-13の違いによらず
+        同じ書籍と一致する。
+
+        Args:
+            isbn: ISBN。
+        Returns:
+            絞り込んだ書籍QuerySet。ISBNでない場合は空のQuerySet。
+        """
+        isbn13 = normalize_isbn(isbn)
+        if isbn13 is None:
+            return self.none()
+        return self.filter(isbn13=isbn13)
+
+    def created_between(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> "BookQuerySet":
+        """書籍IDを生成した日時で書籍を絞り込む。
+
+        書籍IDのULIDはタイムスタンプを先頭に持つため、日時の範囲を主キーの範囲検索に変換する。
+
+        Args:
+            start: 開始日時。Noneの場合は下限なし。
+            end: 終了日時(この日時を含む)。Noneの場合は上限なし。
+        Returns:
+            絞り込んだ書籍QuerySet。
+        """
+        lower, upper = ulid_range(start, end)
+        queryset = self
+        if lower is not None:
+            queryset = queryset.filter(pk__gte=lower)
+        if upper is not None:
+            queryset = queryset.filter(pk__lte=upper)
+        return queryset
+
+
 class Book(TimestampModel):
     """書籍モデル"""
 
-    # 書籍ID
-    id = ULIDField("書籍ID", primary_key=True, editable=False, default=ulid.ULID)
+    # 書籍ID(連続して登録した書籍の書籍IDが単調増加するように生成)
+    id = ULIDField(
+        "書籍ID",
+        primary_key=True,
+        editable=False,
+        default=monotonic_ulid,
+        binary=True,
+    )
     # タイトル
     title = models.CharField("タイトル", max_length=120)
     # 書籍分類詳細
@@ -91,6 +143,10 @@ class Book(TimestampModel):
     authors = models.TextField("著者または訳者", null=True, blank=True)
     # ISBN
     isbn = models.CharField("ISBN", max_length=40, null=True, blank=True)
+    # 正規化したISBN-13(ISBNから生成するため、直接編集しない)
+    isbn13 = models.CharField(
+        "ISBN-13", max_length=13, null=True, blank=True, editable=False
+    )
     # 出版社
     publisher = models.CharField("出版社", max_length=80, null=True, blank=True)
     # 発行日
@@ -102,16 +158,48 @@ class Book(TimestampModel):
         on_delete=models.PROTECT,
         related_name="books",
         verbose_name="管理部署",
+        # 管理部署と廃棄済みの複合インデックスで管理部署を検索できるため、単独のインデックスは作成しない
+        db_index=False,
     )
     # 廃棄済み
     disposed = models.BooleanField("廃棄済み", default=False)
     # 廃棄日
     disposed_at = models.DateField("廃棄日", null=True, blank=True)
 
+    objects = BookQuerySet.as_manager()
+
     class Meta:
         db_table = "books"
         verbose_name = verbose_name_plural = "書籍"
         ordering = ("id",)
+        indexes = [
+            # タイトルで並び替えたキーセットページネーション用
+            models.Index(fields=["title", "id"], name="books_title_id_idx"),
+            # 管理部署と廃棄済みによる絞り込み用
+            models.Index(
+                fields=["division", "disposed"], name="books_division_disposed_idx"
+            ),
+            # 廃棄済みと発行日の範囲による絞り込み用
+            models.Index(
+                fields=["disposed", "published_at"],
+                name="books_disposed_published_idx",
+            ),
+            # 発行日の範囲による絞り込み用
+            models.Index(fields=["published_at"], name="books_published_at_idx"),
+        ]
+        constraints = [
+            # ISBNによる検索用(ISBNでない書籍は索引に含めない)
+            models.UniqueConstraint(
+                fields=["isbn13"],
+                condition=models.Q(isbn13__isnull=False),
+                name="books_isbn13_uniq",
+            ),
+        ]
+
+    # データベースから読み込んだ書籍集計のキー(データベースから読み込んでいない場合はNone)
+    _loaded_facet_key: Optional[Tuple[str, str, bool]] = None
+    # データベースから読み込んだISBN-13(データベースから読み込んでいない場合はNone)
+    _loaded_isbn13: Optional[str] = None
 
     def __str__(self) -> str:
         """書籍のタイトルを返却する。
@@ -120,3 +208,146 @@ class Book(TimestampModel):
             書籍のタイトル。
         """
         return self.title
+
+    @classmethod
+    def from_db(
+        cls, db: Optional[str], field_names: Collection[str], values: Collection[Any]
+    ) -> "Book":
+        instance = super().from_db(db, field_names, values)
+        # 書籍集計のキーの変更を検出するため、データベースから読み込んだキーを保持
+        instance._loaded_facet_key = instance.get_facet_key()
+        # ISBNを変更したときに変更前のISBNのキャッシュを削除するため、読み込んだISBN-13を保持
+        instance._loaded_isbn13 = instance.__dict__.get("isbn13")
+        return instance
+
+    def get_facet_key(self) -> Optional[Tuple[str, str, bool]]:
+        """書籍集計のキーを返却する。
+
+        Returns:
+            書籍分類詳細コード、管理部署コード及び廃棄済みのタプル。
+            いずれかのフィールドの読み込みが遅延されている場合はNone。
+        """
+        if self.get_deferred_fields() & set(FACET_KEY_ATTNAMES):
+            return None
+        return (self.classification_detail_id, self.division_id, self.disposed)
+
+    def update_isbn13(self) -> None:
+        """ISBNを正規化したISBN-13を設定する。
+
+        ISBNの読み込みが遅延されている場合は、ISBNは変更されていないため何もしない。
+        一括登録や一括更新は`save`を呼び出さないため、書籍を一括で書き込む前に呼び出す。
+        """
+        if "isbn" not in self.get_deferred_fields():
+            self.isbn13 = normalize_isbn(self.isbn)
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """書籍を保存する。
+
+        書籍を保存したときに同じトランザクションで書籍集計を更新するため、トランザクション内で保存する。
+        ISBNを保存する場合は、正規化したISBN-13も保存する。
+        """
+        self.update_isbn13()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "isbn" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "isbn13"}
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+# 書籍集計のキーとなる書籍の列の属性名
+FACET_KEY_ATTNAMES = ("classification_detail_id", "division_id", "disposed")
+
+
+class BookFacetCount(models.Model):
+    """書籍集計モデル
+
+    書籍分類詳細、管理部署及び廃棄済みの組み合わせごとの書籍の数を保持する。
+    書籍を登録、更新及び削除したときに、同じトランザクションで増減する。
+    """
+
+    # 書籍分類詳細
+    classification_detail = models.ForeignKey(
+        ClassificationDetail,
+        db_column="classification_detail_code",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="書籍分類詳細",
+    )
+    # 管理部署
+    division = models.ForeignKey(
+        "divisions.Division",
+        db_column="division_code",
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="管理部署",
+    )
+    # 廃棄済み
+    disposed = models.BooleanField("廃棄済み")
+    # 書籍の数
+    count = models.IntegerField("書籍の数", default=0)
+
+    class Meta:
+        db_table = "book_facet_counts"
+        verbose_name = verbose_name_plural = "書籍集計"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["classification_detail", "division", "disposed"],
+                name="book_facet_counts_key_unique",
+            ),
+        ]
+
+
+class BookSearchDocument(models.Model):
+    """書籍全文検索ドキュメントモデル
+
+    FTS5仮想テーブルの行は整数の行IDで識別するため、書籍IDと行IDを対応付ける。
+    """
+
+    # 全文検索仮想テーブルの行ID
+    id = models.BigAutoField(primary_key=True)
+    # 書籍
+    book = models.OneToOneField(
+        Book,
+        on_delete=models.CASCADE,
+        related_name="search_document",
+        verbose_name="書籍",
+    )
+
+    class Meta:
+        db_table = "book_search_documents"
+        verbose_name = verbose_name_plural = "書籍全文検索ドキュメント"
+
+
+class BookSearchIndex(models.Model):
+    """書籍全文検索インデックスモデル
+
+    タイトル、著者または訳者及び出版社を、トライグラムで分割して索引付けしたFTS5仮想テーブル。
+    日本語のように単語を空白で区切らないテキストも部分一致で検索できる。
+    仮想テーブルはマイグレーションで作成して、`books.search`モジュールで更新する。
+    """
+
+    # 書籍全文検索ドキュメント(仮想テーブルの行ID)
+    document = models.OneToOneField(
+        BookSearchDocument,
+        primary_key=True,
+        db_column="rowid",
+        on_delete=models.DO_NOTHING,
+        related_name="index",
+        verbose_name="書籍全文検索ドキュメント",
+    )
+    # 仮想テーブルのすべての列を全文検索する隠し列
+    search = FullTextSearchField("全文検索", db_column="books_fts")
+    # タイトル
+    title = models.TextField("タイトル")
+    # 著者または訳者
+    authors = models.TextField("著者または訳者", null=True)
+    # 出版社
+    publisher = models.TextField("出版社", null=True)
+    # 全文検索の関連度(BM25、値が小さいほど関連度が高い)
+    rank = models.FloatField("関連度")
+
+    class Meta:
+        managed = False
+        db_table = "books_fts"
+        verbose_name = verbose_name_plural = "書籍全文検索インデックス"
@@ -0,0 +1,124 @@
+from typing import Any, List, Sequence
+
+from django.db import connection
+from django.db.models import F, Q, QuerySet
+
+from .models import Book, BookSearchDocument, BookSearchIndex
+
+# トライグラムトークナイザーで検索できる語の最小の文字数
+MIN_TOKEN_LENGTH = 3
+
+# 全文検索インデックスに登録する書籍の列
+INDEXED_COLUMNS = ("title", "authors", "publisher")
+
+
+def _placeholders(values: Sequence[Any]) -> str:
+    return ", ".join(["%s"] * len(values))
+
+
+def index_books(book_ids: Sequence[str]) -> None:
+    """書籍を全文検索インデックスに登録または再登録する。
+
+    データベースに保存した書籍の列から全文検索インデックスを構築するため、書籍を保存した後で呼び出す。
+
+    Args:
+        book_ids: 書籍IDのリスト。
+    """
+    pk = Book._meta.pk
+    book_ids = [pk.get_db_prep_value(book_id, connection) for book_id in book_ids]
+    if not book_ids:
+        return
+    fts = BookSearchIndex._meta.db_table
+    documents = BookSearchDocument._meta.db_table
+    books = Book._meta.db_table
+    columns = ", ".join(INDEXED_COLUMNS)
+    placeholders = _placeholders(book_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT OR IGNORE INTO {documents} (book_id) "
+            f"SELECT id FROM {books} WHERE id IN ({placeholders})",
+            book_ids,
+        )
+        cursor.execute(
+            f"DELETE FROM {fts} WHERE rowid IN "
+            f"(SELECT id FROM {documents} WHERE book_id IN ({placeholders}))",
+            book_ids,
+        )
+        cursor.execute(
+            f"INSERT INTO {fts} (rowid, {columns}) "
+            f"SELECT d.id, {', '.join(f'b.{c}' for c in INDEXED_COLUMNS)} "
+            f"FROM {books} b INNER JOIN {documents} d ON d.book_id = b.id "
+            f"WHERE b.id IN ({placeholders})",
+            book_ids,
+        )
+
+
+def unindex_documents(document_ids: Sequence[int]) -> None:
+    """全文検索インデックスから書籍全文検索ドキュメントの行を削除する。
+
+    Args:
+        document_ids: 書籍全文検索ドキュメントIDのリスト。
+    """
+    if document_ids:
+        BookSearchIndex.objects.filter(pk__in=document_ids).delete()
+
+
+def rebuild_index() -> int:
+    """全文検索インデックスを再構築する。
+
+    Returns:
+        全文検索インデックスに登録した書籍の数。
+    """
+    fts = BookSearchIndex._meta.db_table
+    documents = BookSearchDocument._meta.db_table
+    books = Book._meta.db_table
+    columns = ", ".join(INDEXED_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {fts}")
+        cursor.execute(
+            f"INSERT OR IGNORE INTO {documents} (book_id) SELECT id FROM {books}"
+        )
+        cursor.execute(
+            f"INSERT INTO {fts} (rowid, {columns}) "
+            f"SELECT d.id, {', '.join(f'b.{c}' for c in INDEXED_COLUMNS)} "
+            f"FROM {books} b INNER JOIN {documents} d ON d.book_id = b.id"
+        )
+        count = cursor.rowcount
+        # セグメントを統合して検索を高速化
+        cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('optimize')")
+    return count
+
+
+def _quote(token: str) -> str:
+    """語をFTS5のフレーズとして引用符で囲む。"""
+    return '"' + token.replace('"', '""') + '"'
+
+
+def search_books(queryset: QuerySet[Book], q: str) -> QuerySet[Book]:
+    """空白で区切られた語をすべて含む書籍を、関連度の高い順に返却する。
+
+    トライグラムトークナイザーは3文字未満の語を検索できないため、3文字未満の語はタイトル、著者または
+    訳者及び出版社の部分一致で絞り込む。3文字以上の語を含む場合は、関連度を`rank`として注釈する。
+
+    Args:
+        queryset: 検索する書籍のQuerySet。
+        q: 検索する語。
+    Returns:
+        検索した書籍のQuerySet。
+    """
+    tokens = q.split()
+    long_tokens: List[str] = [t for t in tokens if MIN_TOKEN_LENGTH <= len(t)]
+    for token in tokens:
+        if len(token) < MIN_TOKEN_LENGTH:
+            condition = Q()
+            for column in INDEXED_COLUMNS:
+                condition |= Q(**{f"{column}__icontains": token})
+            queryset = queryset.filter(condition)
+    if not long_tokens:
+        return queryset
+    expression = " ".join(_quote(token) for token in long_tokens)
+    return (
+        queryset.filter(search_document__index__search__match=expression)
+        .annotate(rank=F("search_document__index__rank"))
+        .order_by("rank", "id")
+    )
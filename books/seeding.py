@@ -0,0 +1,181 @@
+import random
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Sequence, Set, Tuple, Type
+
+from django.contrib.auth.hashers import make_password
+from django.db import models, transaction
+
+from accounts.models import User
+from core.caches import CodeCache, TableVersion
+from divisions.caches import division_cache
+from divisions.models import Division
+
+from .caches import classification_cache, classification_detail_cache
+from .facets import FacetKey, apply_deltas
+from .isbn import isbn13_check_digit
+from .models import Book, Classification, ClassificationDetail
+from .search import index_books
+
+# 書籍のタイトルを構成する語
+TITLE_WORDS = (
+    ("プログラミング", "入門", "実践", "詳解", "はじめての", "プロを目指す人のための"),
+    ("Python", "Rust", "TypeScript", "Go", "SQL", "Django", "WebAssembly", "Linux"),
+    ("", "入門", "実践ガイド", "クックブック", "徹底攻略", "設計と実装", "第2版"),
+)
+# 著者の姓と名
+AUTHOR_NAMES = (
+    ("佐藤", "鈴木", "高橋", "田中", "伊藤", "渡辺", "山本", "中村", "小林", "加藤"),
+    ("太郎", "花子", "一郎", "美咲", "健太", "陽子", "翔", "由美", "大輔", "彩"),
+)
+# 出版社
+PUBLISHERS = ("オライリー", "技術評論社", "翔泳社", "インプレス", "マイナビ出版", "森北出版")
+# 書籍を廃棄済みにする割合
+DISPOSED_RATE = 0.05
+
+
+def _isbn13(rng: random.Random, used: Set[str]) -> str:
+    """登録済みの書籍と重複しない、チェックディジットが正しいISBN-13を生成する。
+
+    Args:
+        rng: 乱数生成器。
+        used: 登録済みのISBN-13の集合。生成したISBN-13を追加する。
+    Returns:
+        ISBN-13。
+    """
+    while True:
+        digits = "9784" + "".join(str(rng.randrange(10)) for _ in range(8))
+        isbn = digits + isbn13_check_digit(digits)
+        if isbn not in used:
+            used.add(isbn)
+            return isbn
+
+
+def _build_book(
+    rng: random.Random,
+    detail_codes: List[str],
+    division_codes: List[str],
+    used_isbns: Set[str],
+) -> Book:
+    """無作為に値を選択した書籍モデルインスタンスを構築する。"""
+    title = "".join(rng.choice(words) for words in TITLE_WORDS)
+    authors = "、".join(
+        "".join(rng.choice(names) for names in AUTHOR_NAMES)
+        for _ in range(rng.randint(1, 3))
+    )
+    published_at = date(2000, 1, 1) + timedelta(days=rng.randrange(365 * 23))
+    disposed = rng.random() < DISPOSED_RATE
+    isbn = _isbn13(rng, used_isbns)
+    return Book(
+        title=title,
+        classification_detail_id=rng.choice(detail_codes),
+        authors=authors,
+        isbn=isbn,
+        isbn13=isbn,
+        publisher=rng.choice(PUBLISHERS),
+        published_at=published_at,
+        division_id=rng.choice(division_codes),
+        disposed=disposed,
+        disposed_at=published_at + timedelta(days=365 * 5) if disposed else None,
+    )
+
+
+def seed_catalogue(
+    books: int,
+    classifications: int = 10,
+    details: int = 10,
+    divisions: int = 10,
+    users: int = 10,
+    seed: int = 0,
+    batch_size: int = 500,
+) -> Dict[str, int]:
+    """書籍分類、書籍分類詳細、部署、ユーザー及び書籍を一括で登録する。
+
+    書籍分類、書籍分類詳細、部署及びユーザーは、同じコードまたはEメールアドレスの行が存在する場合は
+    登録しない。書籍は指定された数だけ追加で登録して、全文検索インデックスと書籍集計を更新する。
+    同じ`seed`を指定すると、同じ値の書籍を登録する(書籍IDを除く)。
+
+    Args:
+        books: 追加で登録する書籍の数。
+        classifications: 書籍分類の数(最大100)。書籍分類コードは`000`、`010`、`020`...となる。
+        details: 書籍分類ごとの書籍分類詳細の数(最大10)。
+        divisions: 部署の数(最大100)。
+        users: ユーザーの数。ユーザーのパスワードは`password`となる。
+        seed: 乱数のシード。
+        batch_size: 1回のINSERTで登録する行の数。
+    Returns:
+        モデルの名前と、登録を試みた行の数の辞書。
+    Exceptions:
+        ValueError: 書籍を登録するときに、書籍分類詳細または部署が1件も存在しない場合。
+    """
+    rng = random.Random(seed)
+    new_classifications = [
+        Classification(code=f"{i * 10:03d}", name=f"分類{i * 10:03d}")
+        for i in range(min(classifications, 100))
+    ]
+    new_details = [
+        ClassificationDetail(
+            code=f"{int(c.code) + j:03d}",
+            classification_id=c.code,
+            name=f"{c.name}の{j}",
+        )
+        for c in new_classifications
+        for j in range(min(details, 10))
+    ]
+    new_divisions = [
+        Division(code=f"{i:02d}", name=f"部署{i:02d}") for i in range(min(divisions, 100))
+    ]
+    # パスワードのハッシュ化は遅いため、すべてのユーザーで同じハッシュを使用
+    password = make_password("password")
+    new_users = [
+        User(email=f"user{i}@example.com", name=f"ユーザー{i}", password=password)
+        for i in range(users)
+    ]
+    with transaction.atomic():
+        rows: Sequence[Tuple[Type[models.Model], Sequence[models.Model]]] = (
+            (Classification, new_classifications),
+            (ClassificationDetail, new_details),
+            (Division, new_divisions),
+            (User, new_users),
+        )
+        for model, objs in rows:
+            model._default_manager.bulk_create(
+                objs, batch_size=batch_size, ignore_conflicts=True
+            )
+        detail_codes = sorted(
+            ClassificationDetail.objects.values_list("code", flat=True)
+        )
+        division_codes = sorted(Division.objects.values_list("code", flat=True))
+        if books and not (detail_codes and division_codes):
+            raise ValueError("書籍を登録するには、書籍分類詳細及び部署が1件以上必要です。")
+        used_isbns = set(
+            Book.objects.exclude(isbn13=None).values_list("isbn13", flat=True)
+        )
+        deltas: "Counter[FacetKey]" = Counter()
+        for start in range(0, books, batch_size):
+            batch = [
+                _build_book(rng, detail_codes, division_codes, used_isbns)
+                for _ in range(min(batch_size, books - start))
+            ]
+            # 一括登録はシグナルを送信しないため、全文検索インデックスと書籍集計を更新
+            Book.objects.bulk_create(batch)
+            index_books([book.id for book in batch])
+            deltas.update(book.get_facet_key() for book in batch)
+        apply_deltas(deltas)
+        # 一括登録はシグナルを送信しないため、コードキャッシュを破棄して、テーブルのバージョンを更新
+        code_caches: Sequence[CodeCache] = (
+            classification_cache,
+            classification_detail_cache,
+            division_cache,
+        )
+        for code_cache in code_caches:
+            code_cache.invalidate()
+        for model in (Classification, ClassificationDetail, Division, Book):
+            TableVersion.for_model(model).invalidate()
+    return {
+        "classifications": len(new_classifications),
+        "classification_details": len(new_details),
+        "divisions": len(new_divisions),
+        "users": len(new_users),
+        "books": books,
+    }
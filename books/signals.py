@@ -0,0 +1,104 @@
+from typing import Any, Optional
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .facets import FacetKey, apply_deltas, diff
+from .isbn import invalidate_isbns
+from .models import FACET_KEY_ATTNAMES, Book, BookSearchDocument
+from .search import index_books, unindex_documents
+
+
+@receiver(post_save, sender=Book, dispatch_uid="books.index_book")
+def index_book(sender: Any, instance: Book, **kwargs: Any) -> None:
+    """保存した書籍を全文検索インデックスに登録する。"""
+    index_books([instance.pk])
+
+
+@receiver(post_delete, sender=BookSearchDocument, dispatch_uid="books.unindex_book")
+def unindex_book(sender: Any, instance: BookSearchDocument, **kwargs: Any) -> None:
+    """削除した書籍を全文検索インデックスから削除する。
+
+    書籍を削除すると、書籍全文検索ドキュメントも削除される。
+    """
+    unindex_documents([instance.pk])
+
+
+def _load_facet_key(instance: Book) -> None:
+    """データベースから読み込んだ書籍集計のキーが不明な場合は、データベースから読み込む。"""
+    if instance._loaded_facet_key is None:
+        instance._loaded_facet_key = (
+            Book.objects.filter(pk=instance.pk).values_list(*FACET_KEY_ATTNAMES).first()
+        )
+
+
+@receiver(pre_save, sender=Book, dispatch_uid="books.load_facet_key")
+def load_facet_key(
+    sender: Any, instance: Book, raw: bool = False, **kwargs: Any
+) -> None:
+    """更新する書籍の、変更前の書籍集計のキーを確定する。
+
+    フィクスチャーから読み込む書籍は、既存の書籍を更新する場合があるため、データベースを確認する。
+    """
+    if instance._state.adding and not raw:
+        return
+    _load_facet_key(instance)
+
+
+@receiver(post_save, sender=Book, dispatch_uid="books.count_facets")
+def count_facets(sender: Any, instance: Book, created: bool, **kwargs: Any) -> None:
+    """保存した書籍の書籍集計を増減する。"""
+    old: Optional[FacetKey] = None if created else instance._loaded_facet_key
+    # 読み込みが遅延されたフィールドは変更されていないため、変更前の値を使用
+    deferred = instance.get_deferred_fields()
+    new: FacetKey = tuple(  # type: ignore
+        old[i] if old is not None and name in deferred else getattr(instance, name)
+        for i, name in enumerate(FACET_KEY_ATTNAMES)
+    )
+    apply_deltas(diff(old, new))
+    instance._loaded_facet_key = new
+
+
+@receiver(pre_delete, sender=Book, dispatch_uid="books.load_deleted_facet_key")
+def load_deleted_facet_key(sender: Any, instance: Book, **kwargs: Any) -> None:
+    """削除する書籍の書籍集計のキーを確定する。"""
+    _load_facet_key(instance)
+
+
+@receiver(post_delete, sender=Book, dispatch_uid="books.uncount_facets")
+def uncount_facets(sender: Any, instance: Book, **kwargs: Any) -> None:
+    """削除した書籍の書籍集計を減らす。"""
+    apply_deltas(diff(instance._loaded_facet_key, None))
+
+
+@receiver(pre_save, sender=Book, dispatch_uid="books.normalize_fixture_isbn")
+def normalize_fixture_isbn(
+    sender: Any, instance: Book, raw: bool = False, **kwargs: Any
+) -> None:
+    """フィクスチャーから読み込む書籍のISBNを正規化する。
+
+    フィクスチャーは`save`を呼び出さずに保存するため、ISBN-13をここで設定する。
+    """
+    if raw:
+        instance.update_isbn13()
+
+
+@receiver(post_save, sender=Book, dispatch_uid="books.invalidate_saved_isbn")
+def invalidate_saved_isbn(
+    sender: Any, instance: Book, using: Optional[str] = None, **kwargs: Any
+) -> None:
+    """保存した書籍の、変更前と変更後のISBNのキャッシュを削除する。"""
+    isbn13 = instance.__dict__.get("isbn13")
+    invalidate_isbns([instance._loaded_isbn13, isbn13], using)
+    instance._loaded_isbn13 = isbn13
+
+
+@receiver(post_delete, sender=Book, dispatch_uid="books.invalidate_deleted_isbn")
+def invalidate_deleted_isbn(
+    sender: Any, instance: Book, using: Optional[str] = None, **kwargs: Any
+) -> None:
+    """削除した書籍のISBNのキャッシュを削除する。"""
+    invalidate_isbns(
+        [instance._loaded_isbn13, instance.__dict__.get("isbn13")],
+        using,
+    )
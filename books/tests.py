@@ -0,0 +1,526 @@
+import io
+import json
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Dict, List, Tuple
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Count, QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.ulids import MonotonicULIDGenerator
+from divisions.models import Division
+
+from .caches import classification_cache, classification_detail_cache
+from .choices import get_book_choices
+from .exports import export_books
+from .facets import rebuild_facets
+from .forms import BookFilterForm, BookForm
+from .imports import RejectedRow, import_books, iter_csv_rows, iter_ndjson_rows
+from .isbn import normalize_isbn
+from .models import (
+    Book,
+    BookFacetCount,
+    BookSearchIndex,
+    Classification,
+    ClassificationDetail,
+)
+from .search import rebuild_index, search_books
+from .seeding import seed_catalogue
+
+FIXTURES = ["divisions", "classifications", "classification_details", "books"]
+
+
+class CodeCacheTest(TestCase):
+    """コードキャッシュのテスト"""
+
+    fixtures = FIXTURES
+
+    def tearDown(self) -> None:
+        # テストで変更したデータはロールバックされるため、キャッシュを破棄
+        classification_cache.clear()
+        classification_detail_cache.clear()
+
+    def test_lookup_without_queries(self) -> None:
+        """読み込んだ後はデータベースに問い合わせずに参照できることを確認する。"""
+        classification_detail_cache.all()
+        with self.assertNumQueries(0):
+            detail = classification_detail_cache.get("000")
+            self.assertEqual(detail.classification.code, "000")
+            self.assertIsNone(classification_detail_cache.get("zzz"))
+
+    def test_invalidate_on_save(self) -> None:
+        """保存されたときにキャッシュを破棄してバージョンを更新することを確認する。"""
+        classification_detail_cache.all()
+        version = cache.get(classification_detail_cache.version_key)
+        classification = Classification.objects.get(pk="000")
+        classification.name = "変更"
+        with self.captureOnCommitCallbacks(execute=True):
+            classification.save()
+        self.assertNotEqual(cache.get(classification_detail_cache.version_key), version)
+        detail = classification_detail_cache.get("000")
+        self.assertEqual(detail.classification.name, "変更")
+
+    def test_reload_when_version_changed(self) -> None:
+        """他のプロセスがバージョンを更新した場合に再読み込みすることを確認する。"""
+        classification_cache.all()
+        ClassificationDetail.objects.filter(pk="000").update(name="変更")
+        Classification.objects.filter(pk="000").update(name="変更")
+        self.assertNotEqual(classification_cache.get("000").name, "変更")
+        cache.set(classification_cache.version_key, "other", None)
+        self.assertEqual(classification_cache.get("000").name, "変更")
+
+
+class BookSearchTest(TestCase):
+    """書籍全文検索のテスト"""
+
+    fixtures = FIXTURES
+
+    def _search(self, q: str) -> List[str]:
+        return [book.title for book in search_books(Book.objects.all(), q)]
+
+    def test_search_japanese_text(self) -> None:
+        """日本語のテキストを部分一致で検索できることを確認する。"""
+        self.assertEqual(
+            sorted(self._search("オライリー")),
+            ["Fluent Python", "ハンズオンWebAssembly", "プログラミングRust"],
+        )
+        self.assertEqual(self._search("rust 中田"), ["プログラミングRust"])
+
+    def test_search_short_token(self) -> None:
+        """3文字未満の語を部分一致で検索できることを確認する。"""
+        self.assertEqual(self._search("入門"), ["プロを目指す人のためのTypeScript入門"])
+
+    def test_ranked(self) -> None:
+        """関連度の高い順に並び替えることを確認する。"""
+        books = list(search_books(Book.objects.all(), "Python"))
+        self.assertTrue(books)
+        # 関連度は`search_books`が注釈する属性
+        ranks = [getattr(book, "rank") for book in books]
+        self.assertEqual(ranks, sorted(ranks))
+
+    def test_sync_on_save_and_delete(self) -> None:
+        """書籍の保存と削除を全文検索インデックスに反映することを確認する。"""
+        book = Book.objects.get(pk="01GYV46C5KXWDRKMB1WR3TW6RK")
+        book.title = "流暢なパイソン"
+        book.save()
+        self.assertEqual(self._search("パイソン"), ["流暢なパイソン"])
+        self.assertEqual(self._search("Fluent"), [])
+        book.delete()
+        self.assertEqual(self._search("パイソン"), [])
+        self.assertEqual(BookSearchIndex.objects.count(), Book.objects.count())
+
+    def test_rebuild_index(self) -> None:
+        """全文検索インデックスを再構築できることを確認する。"""
+        BookSearchIndex.objects.all().delete()
+        self.assertEqual(self._search("オライリー"), [])
+        self.assertEqual(rebuild_index(), Book.objects.count())
+        self.assertEqual(len(self._search("オライリー")), 3)
+
+    def test_book_list_view(self) -> None:
+        """書籍一覧ページで書籍を検索できることを確認する。"""
+        response = self.client.get("/books/?q=TypeScript")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [book.title for book in response.context["book_list"]],
+            ["プロを目指す人のためのTypeScript入門"],
+        )
+
+
+class BookFilterFormTest(TestCase):
+    """書籍絞り込みフォームのテスト"""
+
+    fixtures = FIXTURES
+
+    def _filter(self, data: Dict[str, str]) -> QuerySet[Book]:
+        form = BookFilterForm(data)
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.filter_queryset(Book.objects.all())
+
+    def test_filter(self) -> None:
+        """絞り込み条件で書籍を絞り込むことを確認する。"""
+        Book.objects.filter(pk="01GYV46C5KXWDRKMB1WR3TW6RK").update(disposed=True)
+        self.assertEqual(self._filter({}).count(), Book.objects.count())
+        self.assertEqual(
+            list(self._filter({"disposed": "true"}).values_list("id", flat=True)),
+            ["01GYV46C5KXWDRKMB1WR3TW6RK"],
+        )
+        books = self._filter(
+            {"published_from": "2018-01-01", "published_to": "2018-12-31"}
+        )
+        self.assertEqual([book.title for book in books], ["プログラミングRust"])
+        self.assertEqual(self._filter({"classification_code": "000"}).count(), 4)
+        self.assertEqual(self._filter({"division_code": "zz"}).count(), 0)
+
+    def test_index_seek(self) -> None:
+        """それぞれの絞り込み条件が、書籍テーブルのインデックスを検索することを確認する。"""
+        cases = [
+            ({"division_code": "58"}, "books_division_disposed_idx"),
+            (
+                {"division_code": "58", "disposed": "false"},
+                "books_division_disposed_idx",
+            ),
+            ({"disposed": "true"}, "books_disposed_published_idx"),
+            (
+                {"disposed": "false", "published_from": "2018-01-01"},
+                "books_disposed_published_idx",
+            ),
+            ({"published_from": "2018-01-01"}, "books_published_at_idx"),
+            (
+                {"classification_detail_code": "000"},
+                "books_classification_detail_code",
+            ),
+            ({"classification_code": "000"}, "books_classification_detail_code"),
+            (
+                {"created_from": "2023-04-25 00:00", "created_to": "2023-04-30 00:00"},
+                "sqlite_autoindex_books_1",
+            ),
+        ]
+        for data, index in cases:
+            with self.subTest(data=data):
+                plan = self._filter(data).order_by().explain()
+                self.assertNotIn("SCAN books", plan)
+                self.assertRegex(plan, f"SEARCH books USING (COVERING )?INDEX {index}")
+
+
+class BookFacetCountTest(TestCase):
+    """書籍集計のテスト"""
+
+    fixtures = FIXTURES
+
+    def _counts(self) -> Dict[Tuple[str, str, bool], int]:
+        return {
+            (row.classification_detail_id, row.division_id, row.disposed): row.count
+            for row in BookFacetCount.objects.all()
+            if row.count
+        }
+
+    def _expected(self) -> Dict[Tuple[str, str, bool], int]:
+        rows = Book.objects.values_list(
+            "classification_detail_id", "division_id", "disposed"
+        ).annotate(count=Count("pk"))
+        return {
+            (detail, division, disposed): n for detail, division, disposed, n in rows
+        }
+
+    def test_loaded_from_fixtures(self) -> None:
+        """フィクスチャーから読み込んだ書籍を集計していることを確認する。"""
+        self.assertEqual(self._counts(), self._expected())
+
+    def test_incremental_update(self) -> None:
+        """書籍の登録、更新及び削除で書籍集計を増減することを確認する。"""
+        book = Book.objects.create(
+            title="New", classification_detail_id="000", division_id="58"
+        )
+        self.assertEqual(self._counts(), self._expected())
+        book = Book.objects.only("id", "title").get(pk=book.pk)
+        book.disposed = True
+        book.save()
+        self.assertEqual(self._counts(), self._expected())
+        Book.objects.get(pk="01GYV46C5KXWDRKMB1WR3TW6RK").delete()
+        Book.objects.filter(pk=book.pk).delete()
+        self.assertEqual(self._counts(), self._expected())
+
+    def test_rebuild(self) -> None:
+        """書籍テーブルから書籍集計を再構築することを確認する。"""
+        Book.objects.update(disposed=True)
+        self.assertNotEqual(self._counts(), self._expected())
+        rebuild_facets()
+        self.assertEqual(self._counts(), self._expected())
+
+
+class BookIdTest(TestCase):
+    """書籍IDのテスト"""
+
+    fixtures = FIXTURES
+
+    def test_binary_storage(self) -> None:
+        """書籍IDを16バイトのバイナリで保存して、文字列で参照できることを確認する。"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT typeof(id), length(id) FROM books")
+            self.assertEqual(cursor.fetchall(), [("blob", 16)])
+        book = Book.objects.get(pk="01GYV46C5KXWDRKMB1WR3TW6RK")
+        self.assertEqual(book.id, "01GYV46C5KXWDRKMB1WR3TW6RK")
+        self.assertEqual(
+            list(Book.objects.values_list("id", flat=True)),
+            sorted(Book.objects.values_list("id", flat=True)),
+        )
+        self.assertFalse(Book.objects.filter(pk="invalid").exists())
+
+    def test_monotonic(self) -> None:
+        """同じミリ秒に生成したULIDが単調増加することを確認する。"""
+        generator = MonotonicULIDGenerator()
+        ids = [str(generator.generate()) for _ in range(1000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_created_between(self) -> None:
+        """書籍IDのタイムスタンプで書籍を絞り込めることを確認する。"""
+        created = Book.objects.create(
+            title="New", classification_detail_id="000", division_id="58"
+        )
+        now = timezone.now()
+        books = Book.objects.created_between(now - timedelta(minutes=1), now)
+        self.assertEqual([book.pk for book in books], [created.pk])
+        start = datetime(2023, 4, 25, tzinfo=dt_timezone.utc)
+        end = datetime(2023, 4, 25, 23, 59, 59, tzinfo=dt_timezone.utc)
+        self.assertEqual(
+            sorted(
+                Book.objects.created_between(start, end).values_list("pk", flat=True)
+            ),
+            ["01GYV46C5KXWDRKMB1WR3TW6RK", "01GYV585X4JNDCSVA3BY93KN54"],
+        )
+
+
+class SeedCatalogueTest(TestCase):
+    """合成データの登録のテスト"""
+
+    def test_seed(self) -> None:
+        """書籍を一括で登録して、全文検索インデックスと書籍集計を更新することを確認する。"""
+        options = dict(classifications=2, details=3, divisions=2, users=2, batch_size=7)
+        seed_catalogue(books=30, **options)
+        # 書籍分類、書籍分類詳細、部署及びユーザーは重複して登録しない
+        seed_catalogue(books=10, **options)
+        self.assertEqual(Classification.objects.count(), 2)
+        self.assertEqual(ClassificationDetail.objects.count(), 6)
+        self.assertEqual(get_user_model().objects.count(), 2)
+        self.assertEqual(Book.objects.count(), 40)
+        self.assertEqual(BookSearchIndex.objects.count(), 40)
+        self.assertEqual(
+            sum(BookFacetCount.objects.values_list("count", flat=True)), 40
+        )
+        user = get_user_model().objects.get(pk="user1@example.com")
+        self.assertTrue(user.check_password("password"))
+
+    def test_seed_without_codes(self) -> None:
+        """書籍分類詳細または部署が存在しない場合に、書籍を登録しないことを確認する。"""
+        with self.assertRaises(CommandError):
+            call_command("seed_catalogue", books=1, details=0, stdout=io.StringIO())
+        with self.assertRaises(CommandError):
+            call_command("seed_catalogue", books=1, divisions=-1, stdout=io.StringIO())
+        self.assertFalse(Classification.objects.exists())
+        self.assertFalse(Book.objects.exists())
+
+
+class BookImportTest(TestCase):
+    """書籍のインポートのテスト"""
+
+    fixtures = FIXTURES
+
+    def _assert_indexed(self) -> None:
+        """すべての書籍を全文検索インデックスと書籍集計に登録していることを確認する。"""
+        count = Book.objects.count()
+        self.assertEqual(BookSearchIndex.objects.count(), count)
+        self.assertEqual(
+            sum(BookFacetCount.objects.values_list("count", flat=True)), count
+        )
+
+    def test_import_ndjson(self) -> None:
+        """検証に成功した行を登録して、検証に失敗した行を拒否することを確認する。"""
+        book = {
+            "title": "Imported",
+            "classification_detail_code": "000",
+            "division_code": "58",
+            "published_at": "2023-01-01",
+            "disposed": False,
+        }
+        lines = [
+            json.dumps(book),
+            "",
+            json.dumps({**book, "title": ""}),
+            json.dumps({**book, "division_code": "99", "published_at": "2023-13-01"}),
+            "{",
+            json.dumps({**book, "title": "Imported 2", "disposed": True}),
+            json.dumps({**book, "isbn": "978-4-87311-817-8"}),
+        ]
+        count = Book.objects.count()
+        rejected: List[RejectedRow] = []
+        stats = import_books(
+            iter_ndjson_rows(io.StringIO("\n".join(lines))),
+            batch_size=2,
+            on_reject=rejected.append,
+        )
+        self.assertEqual((stats.read, stats.inserted, stats.rejected), (6, 2, 4))
+        self.assertEqual([r.line for r in rejected], [3, 4, 5, 7])
+        self.assertEqual(set(rejected[3].errors), {"isbn"})
+        self.assertEqual(set(rejected[1].errors), {"division_code", "published_at"})
+        self.assertEqual(Book.objects.count(), count + 2)
+        self.assertTrue(Book.objects.filter(title="Imported 2", disposed=True).exists())
+        self._assert_indexed()
+
+    def test_import_exported_csv(self) -> None:
+        """エクスポートしたCSVを、プロセスプールで検証してインポートできることを確認する。"""
+        content = b"".join(export_books("csv")).decode("utf-8")
+        count = Book.objects.count()
+        # ISBNが重複しないように、エクスポートした書籍を削除
+        Book.objects.all().delete()
+        stats = import_books(
+            iter_csv_rows(io.StringIO(content, newline="")), batch_size=3, workers=2
+        )
+        self.assertEqual((stats.inserted, stats.rejected), (count, 0))
+        self.assertEqual(Book.objects.count(), count)
+        self.assertEqual(Book.objects.exclude(isbn13=None).count(), count)
+        self._assert_indexed()
+
+    def test_dry_run(self) -> None:
+        """検証のみを行う場合は登録しないことを確認する。"""
+        content = b"".join(export_books("csv")).decode("utf-8")
+        count = Book.objects.count()
+        stats = import_books(iter_csv_rows(io.StringIO(content)), dry_run=True)
+        self.assertEqual((stats.read, stats.inserted), (count, 0))
+        self.assertEqual(Book.objects.count(), count)
+
+
+class IsbnTest(TestCase):
+    """ISBNの正規化のテスト"""
+
+    fixtures = FIXTURES
+
+    def test_normalize(self) -> None:
+        """区切り文字を除いて、ISBN-10をISBN-13に変換することを確認する。"""
+        self.assertEqual(normalize_isbn("ISBN978-4-87311-817-8"), "9784873118178")
+        self.assertEqual(normalize_isbn("4-87311-817-4"), "9784873118178")
+        self.assertEqual(normalize_isbn("0-8044-2957-X"), "9780804429573")
+        self.assertIsNone(normalize_isbn("978-4-87311-817-9"))
+        self.assertIsNone(normalize_isbn("unknown"))
+        self.assertIsNone(normalize_isbn(None))
+
+    def test_populated_on_save(self) -> None:
+        """フィクスチャーから読み込んだ書籍と保存した書籍のISBN-13を設定することを確認する。"""
+        book = Book.objects.get(pk="01GYV46C5KXWDRKMB1WR3TW6RK")
+        self.assertEqual(book.isbn13, "9784873118178")
+        book.isbn = "4-8144-0000-4"
+        book.save(update_fields=["isbn"])
+        book.refresh_from_db()
+        self.assertEqual(book.isbn13, "9784814400003")
+        self.assertEqual(list(Book.objects.with_isbn("978-4-8144-0000-3")), [book])
+
+
+class BookListViewTest(TestCase):
+    """書籍一覧ページのテスト"""
+
+    fixtures = FIXTURES
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_query_count_independent_of_page_size(self) -> None:
+        """1ページに表示する書籍の数によらず、クエリの数が一定であることを確認する。"""
+        for page_size in (1, 2, 50):
+            with self.subTest(page_size=page_size), override_settings(
+                BOOK_LIST_PAGE_SIZE=page_size
+            ):
+                # 書籍分類と、書籍分類詳細、書籍分類及び管理部署を結合した書籍
+                with self.assertNumQueries(2):
+                    response = self.client.get("/books/")
+                self.assertEqual(len(response.context["book_list"]), min(page_size, 4))
+                self.assertContains(response, "ICT開発室")
+
+    @override_settings(BOOK_LIST_PAGE_SIZE=3)
+    def test_keyset_navigation(self) -> None:
+        """次のページと前のページを、絞り込み条件を維持してたどれることを確認する。"""
+        ids = list(Book.objects.values_list("id", flat=True))
+        response = self.client.get("/books/?disposed=false")
+        self.assertEqual([b.id for b in response.context["book_list"]], ids[:3])
+        self.assertIsNone(response.context["previous_page_url"])
+        next_url = response.context["next_page_url"]
+        self.assertIn("disposed=false", next_url)
+        response = self.client.get(next_url)
+        self.assertEqual([b.id for b in response.context["book_list"]], ids[3:])
+        self.assertIsNone(response.context["next_page_url"])
+        response = self.client.get(response.context["previous_page_url"])
+        self.assertEqual([b.id for b in response.context["book_list"]], ids[:3])
+        self.assertEqual(self.client.get("/books/?cursor=invalid").status_code, 404)
+
+    def test_invalid_filter(self) -> None:
+        """検証に失敗した絞り込み条件はエラーを表示して、他の絞り込み条件で絞り込むことを確認する。"""
+        Book.objects.filter(pk="01GYV46C5KXWDRKMB1WR3TW6RK").update(disposed=True)
+        response = self.client.get("/books/?published_from=invalid&disposed=true")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("published_from", response.context["filter_form"].errors)
+        self.assertContains(response, "日付を正しく入力してください。")
+        self.assertEqual(
+            [book.id for book in response.context["book_list"]],
+            ["01GYV46C5KXWDRKMB1WR3TW6RK"],
+        )
+
+    def test_row_fragment_cache(self) -> None:
+        """変更されていない書籍の行はキャッシュから出力して、書籍、部署が変更された場合や、
+        ログインした場合は再度レンダリングすることを確認する。"""
+        book = Book.objects.get(pk="01GYV46C5KXWDRKMB1WR3TW6RK")
+        self.assertContains(self.client.get("/books/"), "Fluent Python")
+        # 更新日時を変更しない更新は、キャッシュした行を出力
+        Book.objects.filter(pk=book.pk).update(title="Stale Python")
+        self.assertContains(self.client.get("/books/"), "Fluent Python")
+        # 書籍を保存すると更新日時が変わるため、行を再度レンダリング
+        book.title = "Fluent Python 2nd"
+        book.save()
+        self.assertContains(self.client.get("/books/"), "Fluent Python 2nd")
+        # 部署を変更すると、コミットした後でバージョンが更新されて、行を再度レンダリング
+        with self.captureOnCommitCallbacks(execute=True):
+            division = Division.objects.get(code="58")
+            division.name = "情報システム室"
+            division.save()
+        response = self.client.get("/books/")
+        self.assertContains(response, "情報システム室")
+        self.assertNotContains(response, "更新</a>")
+        # ログインしたユーザーには、更新及び削除のリンクを含む行を出力
+        self.client.force_login(get_user_model().objects.create_user("a@example.com"))
+        self.assertContains(self.client.get("/books/"), "更新</a>")
+
+
+class BookChoicesTest(TestCase):
+    """書籍フォームの選択肢のテスト"""
+
+    fixtures = FIXTURES
+
+    def setUp(self) -> None:
+        # コードキャッシュのバージョンを破棄して、他のテストで読み込んだ選択肢を使用しない
+        cache.clear()
+
+    def test_versioned_choices(self) -> None:
+        """バージョンを含むURLで選択肢を取得でき、マスターテーブルが変更されるとバージョンが
+        変わることを確認する。"""
+        choices = get_book_choices()
+        url = f"/books/choices/{choices.version}/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        data = response.json()
+        self.assertIn({"code": "58", "name": "ICT開発室"}, data["divisions"])
+        # 古いバージョンは、現在のバージョンのURLにリダイレクト
+        self.assertRedirects(self.client.get("/books/choices/old/"), url)
+        # 書籍分類詳細を変更すると、コミットした後でバージョンが変わる
+        detail = ClassificationDetail.objects.order_by("code").first()
+        assert detail is not None
+        with self.captureOnCommitCallbacks(execute=True):
+            detail.name = "変更した書籍分類詳細"
+            detail.save()
+        self.assertNotEqual(get_book_choices().version, choices.version)
+        self.assertRedirects(
+            self.client.get(url), f"/books/choices/{get_book_choices().version}/"
+        )
+
+    def test_form_uses_code_cache(self) -> None:
+        """書籍フォームが、マスターテーブルを検索せずに選択肢を生成することを確認する。"""
+        book = Book.objects.get(pk="01GYV46C5KXWDRKMB1WR3TW6RK")
+        # コードキャッシュを読み込む
+        BookForm().as_p()
+        data = {
+            "title": "新しい書籍",
+            "classification": book.classification_detail.classification_id,
+            "classification_detail": book.classification_detail_id,
+            "division": "58",
+        }
+        with self.assertNumQueries(0):
+            html = BookForm().as_p()
+        self.assertIn('value="58"', html)
+        self.assertIn("division", BookForm(data={**data, "division": "XX"}).errors)
+        form = BookForm(data=data)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data["division"].name, "ICT開発室")
@@ -69,6 +69,12 @@ urlpatterns = [
     path("", views.BookListView.as_view(), name="book-list"),
     # 書籍登録ページ (ex: /books/create/)
     path("create/", views.BookCreateView.as_view(), name="book-create"),
+    # 書籍フォームの選択肢 (ex: /books/choices/<version>/)
+    path(
+        "choices/<str:version>/",
+        views.BookChoicesView.as_view(),
+        name="book-choices",
+    ),
     # 書籍詳細ページ (ex: /books/<id>/)
     path("<str:pk>/", views.BookDetailView.as_view(), name="book-detail"),
     # 書籍更新ページ (ex: /books/update/<id>/)
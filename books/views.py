@@ -1,16 +1,24 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from django import forms
+from django.conf import settings
 from django.db import transaction
 from django.db.models import QuerySet
-from django.http import HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import redirect
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import add_never_cache_headers, patch_cache_control
 from django.views import generic
 
+from core.keyset import Cursor, InvalidCursor, KeysetPage, KeysetPaginator
 from core.mixins import FormActionMixin, LoginRequiredMixin, PageTitleMixin
+from divisions.caches import division_cache
 
-from .forms import BookForm
+from .caches import classification_detail_cache
+from .choices import get_book_choices
+from .forms import BookFilterForm, BookForm
 from .models import Book, Classification, ClassificationDetail
+from .search import search_books
 
 
 class ClassificationViewMixin:
@@ -255,6 +263,40 @@ class ClassificationDetailDeleteView(
     success_url = reverse_lazy("books:classification-detail-list")
 
 
+def get_book_choices_url() -> str:
+    """現在のバージョンの書籍フォームの選択肢のURLを返却する。
+
+    Returns:
+        書籍フォームの選択肢のURL。
+    """
+    version = get_book_choices().version
+    return reverse("books:book-choices", kwargs={"version": version})
+
+
+class BookChoicesView(generic.View):
+    """書籍フォームの選択肢ビュー
+
+    書籍分類、書籍分類詳細及び部署の選択肢をJSONで返却する。URLに選択肢のバージョンを含めるため、
+    ブラウザーが変更されないものとしてキャッシュできるようにする。古いバージョンが指定された場合は、
+    現在のバージョンのURLにリダイレクトする。
+    """
+
+    def get(self, request: HttpRequest, version: str) -> HttpResponse:
+        choices = get_book_choices()
+        if version != choices.version:
+            response: HttpResponse = redirect(get_book_choices_url())
+            add_never_cache_headers(response)
+            return response
+        response = HttpResponse(choices.content, content_type="application/json")
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.BOOK_CHOICES_MAX_AGE,
+            immutable=True,
+        )
+        return response
+
+
 class BookViewMixin:
     """書籍ビューミックスイン"""
 
@@ -262,26 +304,126 @@ class BookViewMixin:
 
 
 class BookListView(BookViewMixin, PageTitleMixin, generic.ListView):
-    """書籍一覧クラスビュー"""
+    """書籍一覧クラスビュー
+
+    書籍を`BOOK_LIST_PAGE_SIZE`設定の数ずつ、キーセットページネーションでページ分割して表示する。
+    書籍の行は、書籍ID、書籍の更新日時、書籍分類、書籍分類詳細及び部署のバージョン並びにユーザーが
+    ログインしているかをキーとしてレンダリングした結果をキャッシュして、変更された行のみを
+    レンダリングする。
+    """
 
     title = "書籍一覧"
     classification: Optional[Classification] = None
+    # 検索する語
+    q = ""
+    # 書籍一覧ページで表示する書籍QuerySet
+    object_list: QuerySet[Book]
+    # ページの書籍のリストを登録するコンテキストの名前
+    context_object_name = "book_list"
+    # カーソルを指定するGETパラメーター
+    cursor_param = "cursor"
+    # 書籍一覧ページで表示する列(書籍分類、書籍分類詳細及び管理部署は結合して取得)
+    list_fields = (
+        "id",
+        "title",
+        "authors",
+        "publisher",
+        "disposed",
+        "updated_at",
+        "classification_detail__code",
+        "classification_detail__name",
+        "classification_detail__classification__code",
+        "classification_detail__classification__name",
+        "division__code",
+        "division__name",
+    )
 
     def get_queryset(self) -> QuerySet[Book]:
-        """書籍一覧ページで表示する書籍QuerySetを返却する。"""
+        """書籍一覧ページで表示する書籍QuerySetを返却する。
+
+        GETパラメーターで指定された条件で書籍を絞り込み、検索する語が指定された場合は、書籍を全文検索
+        して関連度の高い順に並び替える。
+        """
         self.classification = get_classification_from_param(self.request)
-        if not self.classification:
-            return Book.objects.all()
-        else:
-            return Book.objects.filter(
-                classification_detail__classification=self.classification
-            )
+        books = Book.objects.all()
+        # 検証に失敗した条件はエラーを表示して、検証に成功した条件のみで絞り込む
+        self.filter_form = BookFilterForm(self.request.GET)
+        self.filter_form.is_valid()
+        books = self.filter_form.filter_queryset(books)
+        queryset: QuerySet[Book] = books
+        self.q = self.request.GET.get("q", "").strip()
+        if self.q:
+            queryset = search_books(queryset, self.q)
+        # 書籍ごとに書籍分類、書籍分類詳細及び管理部署を取得しないように結合
+        return queryset.select_related(
+            "classification_detail__classification", "division"
+        ).only(*self.list_fields)
+
+    def paginate_keyset(
+        self, queryset: QuerySet[Book], page_size: int
+    ) -> Tuple[KeysetPaginator, KeysetPage, List[Book], bool]:
+        """カーソルが示すページの書籍を取得する。
+
+        全文検索した場合は関連度の順、それ以外は書籍IDの順に並び替えて、直前のページの境界となる
+        書籍より後ろ(または前)の書籍を検索するため、ページの位置によらず一定のコストで取得する。
+
+        Args:
+            queryset: 書籍一覧ページで表示する書籍QuerySet。
+            page_size: 1ページに表示する書籍の数。
+        Returns:
+            キーセットページネーター、キーセットページ、ページの書籍及びページが複数あるか。
+        Exceptions:
+            Http404: カーソルを復号できない場合。
+        """
+        paginator = KeysetPaginator(queryset.query.order_by or ("id",), page_size)
+        cursor = None
+        encoded = self.request.GET.get(self.cursor_param)
+        if encoded:
+            try:
+                cursor = Cursor.decode(encoded, len(paginator.get_keys(queryset)))
+            except InvalidCursor:
+                raise Http404("Invalid cursor")
+        page = paginator.paginate(queryset, cursor)
+        return paginator, page, page.rows, page.has_other_pages()
+
+    def get_page_url(self, cursor: Optional[Cursor]) -> Optional[str]:
+        """カーソルが示すページのURLを返却する。
+
+        Args:
+            cursor: カーソル。
+        Returns:
+            絞り込み条件を維持したページのURL。カーソルがNoneの場合はNone。
+        """
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params[self.cursor_param] = cursor.encode()
+        return f"{self.request.path}?{params.urlencode()}"
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         """コンテキストを取得して、そのコンテキストにすべての書籍分類モデルインスタンスを登録する。"""
+        # `MultipleObjectMixin`のページネーションの代わりに、キーセットページネーションでページ分割
+        paginator, page, rows, is_paginated = self.paginate_keyset(
+            self.object_list, settings.BOOK_LIST_PAGE_SIZE
+        )
+        kwargs.update(
+            object_list=rows,
+            paginator=paginator,
+            page_obj=page,
+            is_paginated=is_paginated,
+        )
         ctx = super().get_context_data(**kwargs)
+        ctx["next_page_url"] = self.get_page_url(page.next_cursor)
+        ctx["previous_page_url"] = self.get_page_url(page.previous_cursor)
         ctx["classification_list"] = Classification.objects.all()
         ctx["current_classification"] = self.classification
+        ctx["q"] = self.q
+        ctx["filter_form"] = self.filter_form
+        # コンテキストに書籍の行をキャッシュする秒数と、書籍の行が参照するマスターのバージョンを登録
+        ctx["row_cache_ttl"] = settings.BOOK_LIST_ROW_CACHE_TTL
+        ctx[
+            "row_cache_version"
+        ] = f"{classification_detail_cache.version}:{division_cache.version}"
         # コンテキストに書籍一覧ページのURLを登録
         ctx["list_page_url"] = reverse("books:book-list")
         return ctx
@@ -316,9 +458,7 @@ class BookCreateView(
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         ctx = super().get_context_data(**kwargs)
-        ctx["classification_details"] = list(
-            ClassificationDetail.objects.all().values("code", "classification", "name")
-        )
+        ctx["choices_url"] = get_book_choices_url()
         return ctx
 
     def get_success_url(self) -> str:
@@ -344,14 +484,13 @@ class BookUpdateView(
 
     def get_initial(self) -> Dict[str, Any]:
         initial = super().get_initial()
-        initial["classification"] = self.object.classification_detail.classification
+        detail = classification_detail_cache.get(self.object.classification_detail_id)
+        initial["classification"] = detail.classification if detail else None
         return initial
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         ctx = super().get_context_data(**kwargs)
-        ctx["classification_details"] = list(
-            ClassificationDetail.objects.all().values("code", "classification", "name")
-        )
+        ctx["choices_url"] = get_book_choices_url()
         return ctx
 
     def get_success_url(self) -> str:
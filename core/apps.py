@@ -0,0 +1,34 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "core"
+    verbose_name = "共通アプリ"
+
+    def ready(self) -> None:
+        from django.apps import apps
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+
+        from .caches import invalidate_table_version
+        from .db import configure_sqlite, install_query_dispatcher
+        from .models import TimestampModel
+
+        connection_created.connect(
+            configure_sqlite, dispatch_uid="core.db.configure_sqlite"
+        )
+        connection_created.connect(
+            install_query_dispatcher, dispatch_uid="core.db.install_query_dispatcher"
+        )
+        # 送信者を限定しないと、すべてのモデルで削除時の関連オブジェクトの高速な削除が無効になるため、
+        # 更新日時を持つモデルごとに登録
+        for model in apps.get_models():
+            if not issubclass(model, TimestampModel):
+                continue
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    invalidate_table_version,
+                    sender=model,
+                    dispatch_uid=f"core.table_version:{model._meta.label_lower}",
+                )
@@ -0,0 +1,178 @@
+import threading
+from datetime import datetime
+from typing import Any, Dict, Generic, Optional, Sequence, Type, TypeVar
+
+import ulid
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+M = TypeVar("M", bound=models.Model)
+
+
+class TableVersion:
+    """テーブルが変更されるたびに更新するバージョン
+
+    バージョンはULIDで、Djangoのキャッシュに保存する。ULIDのタイムスタンプはテーブルを最後に変更した
+    日時を表すため、行の削除を含めて、テーブルの最終更新日時として使用できる。
+    キャッシュにバージョンが存在しない場合は、その時点のULIDを新しいバージョンとする。
+    """
+
+    def __init__(self, key: str) -> None:
+        """イニシャライザ
+
+        Args:
+            key: バージョンを保存するキャッシュのキー。
+        """
+        self.key = key
+
+    @classmethod
+    def for_model(cls, model: Type[models.Model]) -> "TableVersion":
+        """モデルのテーブルのバージョンを返却する。
+
+        Args:
+            model: モデルクラス。
+        Returns:
+            テーブルのバージョン。
+        """
+        return cls(f"table-version:{model._meta.label_lower}")
+
+    @property
+    def version(self) -> str:
+        """バージョン"""
+        version = cache.get(self.key)
+        if version is None:
+            cache.add(self.key, str(ulid.ULID()), None)
+            version = cache.get(self.key)
+        return version
+
+    @property
+    def changed_at(self) -> datetime:
+        """テーブルを最後に変更した日時"""
+        return ulid.ULID.from_str(self.version).datetime
+
+    def update(self) -> None:
+        """バージョンを更新する。"""
+        cache.set(self.key, str(ulid.ULID()), None)
+
+    def invalidate(self, using: Optional[str] = None) -> None:
+        """バージョンを更新して、コミットした後でもう一度更新する。
+
+        コミットする前に他のリクエストが変更前の行を読み込んで、更新したバージョンと組み合わせる
+        場合があるため、コミットした後でもう一度更新する。
+
+        Args:
+            using: テーブルを変更したデータベースのエイリアス。
+        """
+        self.update()
+        transaction.on_commit(self.update, using=using)
+
+
+def invalidate_table_version(
+    sender: Type[models.Model], using: Optional[str] = None, **kwargs: Any
+) -> None:
+    """更新日時を持つモデルが保存または削除されたときに、テーブルのバージョンを更新する。
+
+    一括登録及び一括更新はシグナルを送信しないため、`TableVersion.for_model(model).invalidate()`を
+    明示的に呼び出す必要がある。
+    """
+    TableVersion.for_model(sender).invalidate(using)
+
+
+class CodeCache(Generic[M]):
+    """コードをキー、モデルインスタンスを値としたプロセスローカルキャッシュ
+
+    行数が少なく、ほとんど変更されないマスターテーブルのすべての行を、最初に参照されたときに
+    まとめて読み込んで、プロセス内に保持する。
+    モデルが保存または削除されると、プロセスローカルキャッシュを破棄するとともに、トランザクションが
+    コミットされた後でDjangoのキャッシュに保存したバージョンを更新する。
+    他のプロセスは、参照するたびにバージョンを比較することで、テーブルを読み込まずにキャッシュが
+    古くなったことを検出する。複数のプロセスでバージョンを共有するためには、Djangoのキャッシュに
+    プロセス間で共有できるバックエンド(memcachedやファイルなど)を設定する必要がある。
+    """
+
+    def __init__(self, model: Type[M], select_related: Sequence[str] = ()) -> None:
+        """イニシャライザ
+
+        Args:
+            model: モデルクラス。主キーがコードでなければならない。
+            select_related: モデルインスタンスと一緒に読み込む関連フィールド。
+        """
+        self.model = model
+        self.select_related = tuple(select_related)
+        self._table_version = TableVersion(
+            f"code-cache:{model._meta.label_lower}:version"
+        )
+        self.version_key = self._table_version.key
+        self._instances: Optional[Dict[str, M]] = None
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        """テーブルが変更されるたびに更新されるバージョン
+
+        テーブルの行から作成した値をキャッシュするときに、キャッシュのキーに含めることで、
+        テーブルが変更されたときにキャッシュした値を使用しないようにできる。
+        """
+        return self._table_version.version
+
+    def all(self) -> Dict[str, M]:
+        """コードをキー、モデルインスタンスを値とした辞書を返却する。
+
+        キャッシュが読み込まれていないか、古くなっている場合は、テーブルのすべての行を読み込む。
+
+        Returns:
+            コードをキー、モデルインスタンスを値とした辞書。
+        """
+        # テーブルを読み込む前にバージョンを取得して、読み込み中の変更を次の参照で検出
+        version = self.version
+        instances = self._instances
+        if instances is None or self._version != version:
+            with self._lock:
+                queryset = self.model._default_manager.select_related(
+                    *self.select_related
+                )
+                instances = {instance.pk: instance for instance in queryset}
+                self._instances, self._version = instances, version
+        return instances
+
+    def get(self, code: str) -> Optional[M]:
+        """コードと一致するモデルインスタンスを返却する。
+
+        Args:
+            code: コード。
+        Returns:
+            モデルインスタンス。コードと一致するモデルインスタンスが存在しない場合はNone。
+        """
+        return self.all().get(code)
+
+    def clear(self) -> None:
+        """プロセスローカルキャッシュを破棄する。"""
+        self._instances = None
+
+    def invalidate(self, using: Optional[str] = None, **kwargs: Any) -> None:
+        """プロセスローカルキャッシュを破棄して、コミットした後でバージョンを更新する。
+
+        Args:
+            using: モデルを保存または削除したデータベースのエイリアス。
+        """
+        self.clear()
+        transaction.on_commit(self._table_version.update, using=using)
+
+    def connect(self) -> None:
+        """モデル及び一緒に読み込む関連モデルの保存と削除を受信するシグナルハンドラーを登録する。"""
+        senders = {self.model}
+        for path in self.select_related:
+            model: Any = self.model
+            for name in path.split("__"):
+                model = model._meta.get_field(name).related_model
+                senders.add(model)
+        for sender in senders:
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    self.invalidate,
+                    sender=sender,
+                    weak=False,
+                    dispatch_uid=f"{self.version_key}:{sender._meta.label_lower}",
+                )
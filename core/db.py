@@ -0,0 +1,139 @@
+import sqlite3
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+
+class QueryCounter:
+    """データベースクエリ計測器
+
+    `count_queries`のコンテキスト内で実行されたクエリの数と実行時間を記録する。
+    """
+
+    def __init__(self) -> None:
+        """イニシャライザ"""
+        # 実行したクエリの数
+        self.count = 0
+        # クエリの実行に要した時間(秒)
+        self.duration = 0.0
+
+    def record(self, sql: str, seconds: float) -> None:
+        """実行したクエリを記録する。
+
+        Args:
+            sql: 実行したSQL。
+            seconds: クエリの実行に要した時間(秒)。
+        """
+        self.duration += seconds
+        self.count += 1
+
+
+# 実行中のコンテキストでクエリを計測しているクエリ計測器
+_counters: ContextVar[Tuple[QueryCounter, ...]] = ContextVar(
+    "query_counters", default=()
+)
+
+
+def dispatch_query(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,
+    many: bool,
+    context: Any,
+) -> Any:
+    """クエリを実行して、実行中のコンテキストのクエリ計測器に記録する。
+
+    データベース接続の`execute_wrappers`に常に登録して、`count_queries`のたびに登録及び解除
+    しない。非同期ビューのORMは、複数のリクエストで同じスレッドのデータベース接続を共有するため、
+    リクエストごとに登録及び解除すると、他のリクエストのクエリを記録したり、他のリクエストが登録した
+    計測器を解除したりする。コンテキスト変数は`sync_to_async`で実行するスレッドに引き継がれる
+    ため、クエリを実行したリクエストのクエリ計測器にのみ記録する。
+    """
+    counters = _counters.get()
+    if not counters:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - start
+        for counter in counters:
+            counter.record(sql, seconds)
+
+
+def install_query_dispatcher(
+    sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any
+) -> None:
+    """データベース接続の`execute_wrappers`に`dispatch_query`を登録する。
+
+    `connection_created`シグナルのハンドラーとして登録する。
+
+    Args:
+        connection: データベース接続。
+    """
+    if dispatch_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(dispatch_query)
+
+
+@contextmanager
+def count_queries(counter: Optional[QueryCounter] = None) -> Iterator[QueryCounter]:
+    """コンテキスト内ですべてのデータベース接続で実行されたクエリを計測するコンテキストマネージャー。
+
+    非同期のコンテキストで使用した場合も、`sync_to_async`で実行したクエリを計測する。
+
+    Args:
+        counter: クエリ計測器。Noneの場合は新しいクエリ計測器で計測する。
+    Yields:
+        クエリ計測器。
+    """
+    counter = counter or QueryCounter()
+    for connection in connections.all():
+        install_query_dispatcher(None, connection)
+    token = _counters.set((*_counters.get(), counter))
+    try:
+        yield counter
+    finally:
+        _counters.reset(token)
+
+
+def configure_sqlite(
+    sender: Any, connection: BaseDatabaseWrapper, **kwargs: Any
+) -> None:
+    """SQLiteのデータベース接続を作成したときに、`SQLITE_PRAGMAS`設定のPRAGMAを設定する。
+
+    `connection_created`シグナルのハンドラーとして登録する。`journal_mode`はデータベース
+    ファイルに記録されるが、その他のPRAGMAは接続ごとに設定する必要がある。
+
+    Args:
+        connection: 作成したデータベース接続。
+    """
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def backup_sqlite(source: BaseDatabaseWrapper, path: str, pages: int = -1) -> None:
+    """SQLiteのオンラインバックアップAPIで、データベースをファイルに複製する。
+
+    複製中もデータベースへの書き込みをブロックせず、複製先のデータベースに接続しているプロセスは、
+    複製が完了するまで複製前のデータベースを読み込む。
+
+    Args:
+        source: 複製するSQLiteのデータベース接続。
+        path: 複製先のデータベースファイルのパス。
+        pages: 1回に複製するページの数。負の場合はすべてのページを1回で複製する。
+    """
+    source.ensure_connection()
+    target = sqlite3.connect(path)
+    try:
+        source.connection.backup(target, pages=pages)
+    finally:
+        target.close()
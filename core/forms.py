@@ -0,0 +1,72 @@
+from typing import Any, Iterator, Optional
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.forms.models import ModelChoiceIterator
+
+from .caches import CodeCache
+
+
+class CodeChoiceIterator(ModelChoiceIterator):
+    """コードキャッシュから選択肢を生成するイテレーター"""
+
+    # 選択肢を生成するフォームフィールド
+    field: "CodeChoiceField"
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for instance in self.field.code_cache.all().values():
+            yield self.choice(instance)
+
+    def __len__(self) -> int:
+        return len(self.field.code_cache.all()) + (self.field.empty_label is not None)
+
+    def __bool__(self) -> bool:
+        return self.field.empty_label is not None or bool(self.field.code_cache.all())
+
+
+class CodeChoiceField(forms.ModelChoiceField):
+    """コードキャッシュから選択肢を生成して、選択されたコードをモデルインスタンスに変換する
+    フォームフィールド
+
+    フォームを作成またはレンダリングするたびに、マスターテーブルを検索しない。
+    """
+
+    iterator = CodeChoiceIterator
+    # 選択肢とするモデルのコードキャッシュ
+    code_cache: CodeCache
+
+    def __init__(self, code_cache: CodeCache, **kwargs: Any) -> None:
+        """イニシャライザ
+
+        Args:
+            code_cache: 選択肢とするモデルのコードキャッシュ。
+            kwargs: `ModelChoiceField`のキーワード引数(`queryset`を除く)。
+        """
+        self.code_cache = code_cache
+        super().__init__(code_cache.model._default_manager.all(), **kwargs)
+
+    def to_python(self, value: Any) -> Optional[models.Model]:
+        """選択されたコードと一致するモデルインスタンスをコードキャッシュから取得する。
+
+        Args:
+            value: 選択されたコード。
+        Returns:
+            モデルインスタンス。コードが選択されていない場合はNone。
+        Exceptions:
+            ValidationError: コードと一致するモデルインスタンスが存在しない場合。
+        """
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.code_cache.model):
+            value = value.pk
+        instance = self.code_cache.get(str(value))
+        if instance is None:
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return instance
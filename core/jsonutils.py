@@ -0,0 +1,94 @@
+import datetime
+import decimal
+import json
+import uuid
+from typing import Any, Union
+
+import ulid
+from django.utils.functional import Promise
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def default(obj: Any) -> Any:
+    """JSONエンコーダーが直接エンコードできないオブジェクトを変換する。
+
+    日時、日付及び時刻はorjsonと同じISO 8601形式の文字列に変換するため、orjsonの有無によらず
+    同じバイト列にエンコードされる。
+
+    Args:
+        obj: オブジェクト。
+    Returns:
+        JSONエンコーダーがエンコードできるオブジェクト。
+    Exceptions:
+        TypeError: オブジェクトを変換できない場合。
+    """
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (ulid.ULID, uuid.UUID, Promise)):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        # Django REST frameworkのJSONエンコーダーと同様に浮動小数点数に変換
+        return float(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "__iter__"):
+        if hasattr(obj, "tolist"):
+            return obj.tolist()
+        if hasattr(obj, "items"):
+            return dict(obj.items())
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# 標準ライブラリのJSONエンコーダー(orjsonがインストールされていない場合に使用)
+_encoder = json.JSONEncoder(
+    ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=default
+)
+
+
+def dumps(obj: Any) -> bytes:
+    """オブジェクトを空白を含まないUTF-8のJSONにエンコードする。
+
+    orjsonがインストールされている場合は、文字列を経由せずにバイト列にエンコードする。
+
+    Args:
+        obj: オブジェクト。
+    Returns:
+        JSONのバイト列。
+    Exceptions:
+        TypeError: エンコードできないオブジェクトを含む場合。
+        ValueError: 数値でない浮動小数点数を含む場合(標準ライブラリのみ)。
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+    return _encoder.encode(obj).encode("utf-8")
+
+
+def _reject_constant(name: str) -> Any:
+    """`NaN`及び`Infinity`を拒否する。
+
+    Exceptions:
+        ValueError: 常にスローする。
+    """
+    raise ValueError(f"Out of range float values are not JSON compliant: {name}")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """JSONをデコードする。
+
+    orjsonと同様に、標準ライブラリでデコードする場合も`NaN`及び`Infinity`を拒否する。
+
+    Args:
+        data: JSONのバイト列または文字列。
+    Returns:
+        デコードしたオブジェクト。
+    Exceptions:
+        ValueError: JSONをデコードできない場合。
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data, parse_constant=_reject_constant)
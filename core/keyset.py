@@ -0,0 +1,211 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.db.models import Q, QuerySet
+
+
+class InvalidCursor(Exception):
+    """カーソルを復号できないことを示す例外"""
+
+
+@dataclass
+class Cursor:
+    """キーセットカーソル
+
+    ページの境界となる行の並び替えキーの値と、ページをたどる方向を保持する。
+    """
+
+    # 並び替えキーの値
+    values: List[Any]
+    # 前のページをたどる場合はTrue
+    reverse: bool = False
+
+    def encode(self) -> str:
+        """カーソルをURLに埋め込める文字列に符号化する。
+
+        Returns:
+            符号化したカーソル。
+        """
+        values = [v.isoformat() if hasattr(v, "isoformat") else v for v in self.values]
+        payload = json.dumps({"v": values, "r": self.reverse}, default=str)
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    @classmethod
+    def decode(cls, encoded: str, length: int) -> "Cursor":
+        """符号化したカーソルを復号する。
+
+        Args:
+            encoded: 符号化したカーソル。
+            length: 並び替えキーの数。
+        Returns:
+            カーソル。
+        Exceptions:
+            InvalidCursor: カーソルを復号できない場合。
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            values, reverse = payload["v"], payload["r"]
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+            raise InvalidCursor(encoded)
+        if not isinstance(values, list) or len(values) != length:
+            raise InvalidCursor(encoded)
+        return cls(values=values, reverse=bool(reverse))
+
+
+@dataclass
+class KeysetPage:
+    """キーセットページ"""
+
+    # ページに含まれる行
+    rows: List[Any]
+    # 次のページのカーソル
+    next_cursor: Optional[Cursor]
+    # 前のページのカーソル
+    previous_cursor: Optional[Cursor]
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """キーセットページネーター
+
+    OFFSETではなく、直前のページの境界となる行の並び替えキーより後ろ(または前)の行を検索することで、
+    ページの位置によらず一定のコストでページを取得する。
+    並び替えキーの一意性を保証するため、並び替えキーの末尾には主キーを追加する。
+    並び替えキーは、NULLを許容しないインデックスが付与されたフィールドでなければならない。
+    """
+
+    def __init__(self, ordering: Sequence[str], page_size: int) -> None:
+        """イニシャライザ
+
+        Args:
+            ordering: 並び替えキー。降順の場合はフィールド名の先頭に`-`を付ける。
+            page_size: 1ページに含める行の数。
+        """
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+
+    def get_keys(self, queryset: QuerySet) -> List[Tuple[str, bool]]:
+        """主キーを末尾に追加した並び替えキーを返却する。
+
+        Args:
+            queryset: ページ分割するQuerySet。
+        Returns:
+            フィールド名と降順であるかを示すタプルのリスト。
+        """
+        pk_name = queryset.model._meta.pk.name
+        keys = [
+            (pk_name if f.lstrip("-") == "pk" else f.lstrip("-"), f.startswith("-"))
+            for f in self.ordering
+        ]
+        if not any(name == pk_name for name, _ in keys):
+            keys.append((pk_name, keys[-1][1] if keys else False))
+        return keys
+
+    def get_page_queryset(
+        self, queryset: QuerySet, cursor: Optional[Cursor]
+    ) -> QuerySet:
+        """カーソルが示すページの行と、次のページの有無を判定する1行を取得するQuerySetを返却する。
+
+        Args:
+            queryset: ページ分割するQuerySet。
+            cursor: カーソル。最初のページの場合はNone。
+        Returns:
+            ページの行を取得するQuerySet。
+        """
+        keys = self.get_keys(queryset)
+        reverse = cursor is not None and cursor.reverse
+        # 前のページをたどる場合は、並び替えの方向を反転して検索
+        directions = [(name, desc != reverse) for name, desc in keys]
+        queryset = queryset.order_by(
+            *[f"-{name}" if desc else name for name, desc in directions]
+        )
+        if cursor is not None:
+            queryset = queryset.filter(_seek(directions, cursor.values))
+        return queryset[: self.page_size + 1]
+
+    def get_page(
+        self, rows: List[Any], queryset: QuerySet, cursor: Optional[Cursor]
+    ) -> KeysetPage:
+        """`get_page_queryset`が返却したQuerySetで取得した行からページを構築する。
+
+        Args:
+            rows: `get_page_queryset`が返却したQuerySetで取得した行。
+            queryset: ページ分割するQuerySet。
+            cursor: カーソル。最初のページの場合はNone。
+        Returns:
+            キーセットページ。
+        """
+        keys = self.get_keys(queryset)
+        has_more = self.page_size < len(rows)
+        rows = rows[: self.page_size]
+        if cursor is not None and cursor.reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = Cursor(values=_get_position(rows[-1], keys))
+        if rows and has_previous:
+            previous_cursor = Cursor(values=_get_position(rows[0], keys), reverse=True)
+        return KeysetPage(
+            rows=rows, next_cursor=next_cursor, previous_cursor=previous_cursor
+        )
+
+    def paginate(self, queryset: QuerySet, cursor: Optional[Cursor]) -> KeysetPage:
+        """カーソルが示すページを返却する。
+
+        Args:
+            queryset: ページ分割するQuerySet。
+            cursor: カーソル。最初のページの場合はNone。
+        Returns:
+            キーセットページ。
+        """
+        rows = list(self.get_page_queryset(queryset, cursor))
+        return self.get_page(rows, queryset, cursor)
+
+
+def _seek(keys: Sequence[Tuple[str, bool]], values: Sequence[Any]) -> Q:
+    """並び替えキーが示す位置より後ろの行を検索する条件を返却する。
+
+    `(a, b) > (x, y)`を、インデックスの範囲検索として評価できるように
+    `a >= x AND (a > x OR b > y)`の形式で構築する。
+
+    Args:
+        keys: フィールド名と降順であるかを示すタプルのリスト。
+        values: 位置を示す並び替えキーの値。
+    Returns:
+        検索条件。
+    """
+    (name, desc), value = keys[0], values[0]
+    op = "lt" if desc else "gt"
+    if len(keys) == 1:
+        return Q(**{f"{name}__{op}": value})
+    return Q(**{f"{name}__{op}e": value}) & (
+        Q(**{f"{name}__{op}": value}) | _seek(keys[1:], values[1:])
+    )
+
+
+def _get_position(row: Any, keys: Sequence[Tuple[str, bool]]) -> List[Any]:
+    """行の並び替えキーの値を返却する。
+
+    Args:
+        row: モデルインスタンスまたは名前付きタプル。
+        keys: フィールド名と降順であるかを示すタプルのリスト。
+    Returns:
+        並び替えキーの値。
+    """
+    return [getattr(row, name) for name, _ in keys]
@@ -0,0 +1,104 @@
+import threading
+import time
+from typing import Any, Dict, List
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import OperationalError, connection
+
+from api1.books.bulk import BookBulkWriter
+from books.models import Book
+
+
+class Command(BaseCommand):
+    help = (
+        "書籍を一括で登録及び削除する書き込みスレッドの実行中に、読み込みスレッドのスループットを"
+        "計測します。環境変数`SQLITE_PROFILE`に`production`を指定した場合と比較してください。"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--readers", type=int, default=4, help="読み込みスレッドの数")
+        parser.add_argument("--duration", type=float, default=10.0, help="計測する秒数")
+        parser.add_argument(
+            "--batch-size", type=int, default=500, help="書き込みスレッドが1回に登録する書籍の数"
+        )
+        parser.add_argument(
+            "--classification-detail", default="000", help="登録する書籍の書籍分類詳細コード"
+        )
+        parser.add_argument("--division", default="58", help="登録する書籍の部署コード")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with connection.cursor() as cursor:
+            settings = []
+            for name in ("journal_mode", "synchronous", "mmap_size", "cache_size"):
+                cursor.execute(f"PRAGMA {name}")
+                settings.append(f"{name}={cursor.fetchone()[0]}")
+        self.stdout.write(", ".join(settings))
+
+        stop = threading.Event()
+        results: Dict[str, List[int]] = {"reads": [], "writes": [], "errors": []}
+        lock = threading.Lock()
+
+        def record(name: str, count: int) -> None:
+            with lock:
+                results[name].append(count)
+
+        def reader() -> None:
+            reads = errors = 0
+            try:
+                while not stop.is_set():
+                    try:
+                        list(
+                            Book.objects.select_related(
+                                "classification_detail__classification", "division"
+                            ).order_by("-id")[:100]
+                        )
+                        reads += 1
+                    except OperationalError:
+                        errors += 1
+            finally:
+                connection.close()
+                record("reads", reads)
+                record("errors", errors)
+
+        def writer() -> None:
+            item = {
+                "op": "create",
+                "title": "benchmark",
+                "classification_detail_code": options["classification_detail"],
+                "division_code": options["division"],
+            }
+            writes = errors = 0
+            bulk = BookBulkWriter(batch_size=options["batch_size"])
+            try:
+                while not stop.is_set():
+                    try:
+                        operations = bulk.execute([item] * options["batch_size"])
+                        if any(op.errors is not None for op in operations):
+                            raise ValueError(operations[0].errors)
+                        # 登録した書籍を削除して、書籍の数を維持
+                        bulk.execute(
+                            [{"op": "delete", "id": op.id} for op in operations]
+                        )
+                        writes += 2
+                    except OperationalError:
+                        errors += 1
+            finally:
+                connection.close()
+                record("writes", writes)
+                record("errors", errors)
+
+        threads = [threading.Thread(target=reader) for _ in range(options["readers"])]
+        threads.append(threading.Thread(target=writer))
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options["duration"])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"reads: {sum(results['reads']) / elapsed:.1f}/s, "
+            f"writes: {sum(results['writes']) / elapsed:.1f} transactions/s, "
+            f"errors: {sum(results['errors'])}"
+        )
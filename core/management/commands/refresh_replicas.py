@@ -0,0 +1,42 @@
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connections
+
+from core.db import backup_sqlite
+
+
+class Command(BaseCommand):
+    help = "SQLiteのオンラインバックアップAPIで、プライマリのデータベースをリードレプリカに複製します。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="指定した秒数ごとに複製を繰り返す(省略した場合は1回だけ複製)",
+        )
+        parser.add_argument(
+            "--pages", type=int, default=-1, help="1回に複製するページの数(省略した場合はすべてのページ)"
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No read replicas are configured (DATABASE_REPLICAS).")
+        primary = connections["default"]
+        if primary.vendor != "sqlite":
+            raise CommandError("The primary database is not SQLite.")
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                start = time.perf_counter()
+                backup_sqlite(
+                    primary,
+                    str(connections[alias].settings_dict["NAME"]),
+                    options["pages"],
+                )
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f"Refreshed {alias} in {elapsed:.3f}s")
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,246 @@
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.http import HttpResponseBase
+from django.test import Client
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from accounts.models import User
+from books.isbn import isbn13_check_digit
+from books.models import Book, ClassificationDetail
+from books.seeding import seed_catalogue
+from core.db import count_queries
+from divisions.models import Division
+
+# 計測するリクエストを送信する関数
+Case = Callable[[], HttpResponseBase]
+
+# 計測で使用するキャッシュ(計測したケースごとに削除する)
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "run-benchmarks",
+    }
+}
+
+
+class Command(BaseCommand):
+    help = "テスト用のデータベースに合成データを登録して、書籍の一覧、詳細及び登録、書籍分類の一覧並びにトークンの取得に要する時間を、データ量ごとに計測します。"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--sizes", default="100,1000,10000", help="計測する書籍の数(カンマ区切り)"
+        )
+        parser.add_argument("--repeat", "-n", type=int, default=20, help="計測する回数")
+        parser.add_argument("--warmup", type=int, default=3, help="計測する前に送信するリクエストの数")
+        parser.add_argument("--case", action="append", help="計測するケース(省略した場合はすべて)")
+        parser.add_argument("--output", "-o", help="計測結果を書き込むJSONファイルのパス")
+        parser.add_argument("--compare", help="比較する計測結果のJSONファイルのパス")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        try:
+            sizes = sorted(int(size) for size in options["sizes"].split(","))
+        except ValueError:
+            raise CommandError("--sizesにはカンマ区切りの整数を指定してください。")
+        baseline = None
+        if options["compare"]:
+            baseline = json.loads(Path(options["compare"]).read_text())
+        results: List[Dict[str, Any]] = []
+        # 開発用のデータベースを変更しないように、デバッグを無効にしたテスト用のデータベースで計測
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity=0, interactive=False)
+        # 共有キャッシュを参照及び削除しないように、計測用のローカルメモリキャッシュで計測
+        isolated_cache = override_settings(CACHES=BENCHMARK_CACHES)
+        isolated_cache.enable()
+        try:
+            for size in sizes:
+                seed_catalogue(
+                    books=max(size - Book.objects.count(), 0),
+                    seed=size,
+                    users=10,
+                )
+                cases = build_cases(options["case"])
+                for name, case in cases.items():
+                    result = {"size": size, "case": name}
+                    result.update(measure(case, options["repeat"], options["warmup"]))
+                    results.append(result)
+                    self.report(result, baseline)
+        finally:
+            isolated_cache.disable()
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+        if options["output"]:
+            document = {
+                "commit": get_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": settings.DATABASES["default"]["ENGINE"],
+                "repeat": options["repeat"],
+                "results": results,
+            }
+            path = Path(options["output"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(document, ensure_ascii=False, indent=2) + "\n")
+            self.stdout.write(f"計測結果を{path}に書き込みました。")
+
+    def report(
+        self, result: Dict[str, Any], baseline: Optional[Dict[str, Any]]
+    ) -> None:
+        """計測結果を出力する。
+
+        Args:
+            result: 計測結果。
+            baseline: 比較する計測結果のJSONドキュメント。
+        """
+        line = (
+            f"{result['size']:>7} {result['case']:<24} "
+            f"median {result['median_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+            f"{result['queries']} queries"
+        )
+        previous = find_result(baseline, result["size"], result["case"])
+        if previous and previous["median_ms"]:
+            line += f"  ({result['median_ms'] / previous['median_ms']:.2f}x)"
+        self.stdout.write(line)
+
+
+def build_cases(names: Optional[List[str]]) -> Dict[str, Case]:
+    """計測するケースを構築する。
+
+    Args:
+        names: 計測するケースの名前のリスト。Noneの場合はすべてのケース。
+    Returns:
+        ケースの名前と、リクエストを送信する関数の辞書。
+    Exceptions:
+        CommandError: 存在しないケースを指定した場合。
+    """
+    user = User.objects.order_by("email").first()
+    assert user is not None
+    # 書籍の詳細は、書籍IDの順で中央の書籍を取得
+    book_ids = Book.objects.order_by("id").values_list("id", flat=True)
+    book_id = book_ids[book_ids.count() // 2]
+    # ログインしたクライアント
+    html = Client()
+    html.force_login(user)
+    api = Client()
+    credentials = {"email": user.email, "password": "password"}
+    response = api.post("/api1/auth/token/", credentials)
+    api.defaults["HTTP_AUTHORIZATION"] = f"Bearer {response.json()['access']}"
+    # 登録する書籍の書籍分類詳細及び部署は、合成データのうちコードが最小のもの
+    detail = ClassificationDetail.objects.order_by("code").first()
+    division = Division.objects.order_by("code").first()
+    assert detail is not None and division is not None
+    book: Dict[str, Any] = {
+        "title": "計測用の書籍",
+        "classification_detail_code": detail.code,
+        "authors": "計測 太郎",
+        "publisher": "計測出版",
+        "published_at": "2023-01-01",
+        "division_code": division.code,
+        "disposed": False,
+    }
+    # 登録する書籍のISBN(合成データと重複しないように接頭辞`979`を使用)
+    serials = itertools.count()
+
+    def create() -> HttpResponseBase:
+        digits = f"979{next(serials):09d}"
+        data = {**book, "isbn": digits + isbn13_check_digit(digits)}
+        return api.post("/api1/books/", data, content_type="application/json")
+
+    isbn = Book.objects.exclude(isbn13=None).values_list("isbn13", flat=True)[0]
+    cases: Dict[str, Case] = {
+        "api_book_list": lambda: api.get("/api1/books/"),
+        "api_book_retrieve": lambda: api.get(f"/api1/books/{book_id}/"),
+        "api_book_by_isbn": lambda: api.get(f"/api1/books/by-isbn/{isbn}/"),
+        "api_classification_list": lambda: api.get("/api1/books/classifications/"),
+        "html_book_list": lambda: html.get("/books/"),
+        "html_book_detail": lambda: html.get(f"/books/{book_id}/"),
+        "api_book_create": create,
+        "token_obtain": lambda: Client().post("/api1/auth/token/", credentials),
+    }
+    if not names:
+        return cases
+    unknown = set(names) - set(cases)
+    if unknown:
+        raise CommandError(f"存在しないケースです: {', '.join(sorted(unknown))}")
+    return {name: cases[name] for name in names}
+
+
+def measure(case: Case, repeat: int, warmup: int) -> Dict[str, Any]:
+    """リクエストを繰り返し送信して、処理に要した時間と実行したクエリの数を計測する。
+
+    Args:
+        case: リクエストを送信する関数。
+        repeat: 計測する回数。
+        warmup: 計測する前に送信するリクエストの数。
+    Returns:
+        処理に要した時間(ミリ秒)の統計量と、1リクエストあたりのクエリの数。
+    Exceptions:
+        CommandError: リクエストが失敗した場合。
+    """
+    for _ in range(warmup):
+        case()
+    latencies: List[float] = []
+    with count_queries() as counter:
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            response = case()
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                raise CommandError(f"リクエストが失敗しました: {response.status_code}")
+    latencies.sort()
+    # 計測結果を比較するときに、キャッシュの状態が次のケースに影響しないように、計測用のキャッシュを削除
+    cache.clear()
+    return {
+        "min_ms": round(latencies[0], 3),
+        "median_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(
+            latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)], 3
+        ),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "queries": round(counter.count / len(latencies), 1),
+    }
+
+
+def find_result(
+    document: Optional[Dict[str, Any]], size: int, case: str
+) -> Optional[Dict[str, Any]]:
+    """計測結果のJSONドキュメントから、書籍の数とケースが一致する計測結果を検索する。"""
+    if document is None:
+        return None
+    for result in document.get("results", []):
+        if result["size"] == size and result["case"] == case:
+            return result
+    return None
+
+
+def get_commit() -> Optional[str]:
+    """現在のGitのコミットハッシュを返却する。Gitリポジトリでない場合はNone。"""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
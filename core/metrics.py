@@ -0,0 +1,300 @@
+import bisect
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from .db import QueryCounter
+
+# ラベルの名前と値の組
+Labels = Tuple[Tuple[str, str], ...]
+
+# リクエストの処理に要した時間(秒)のバケット
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# リクエストで実行したクエリの数のバケット
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# レスポンスボディのバイト数のバケット
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# クエリの実行に要した時間(秒)のバケット
+QUERY_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+# ヒストグラムの名前、説明及びバケット
+HISTOGRAMS: Dict[str, Tuple[str, Sequence[float]]] = {
+    "http_request_duration_seconds": (
+        "Request latency by view and method.",
+        LATENCY_BUCKETS,
+    ),
+    "http_request_db_queries": (
+        "Database queries per request by view and method.",
+        QUERY_COUNT_BUCKETS,
+    ),
+    "http_response_size_bytes": (
+        "Response body size by view and method.",
+        SIZE_BUCKETS,
+    ),
+    "db_query_duration_seconds": (
+        "Database query latency by query shape.",
+        QUERY_LATENCY_BUCKETS,
+    ),
+}
+
+# クエリの形状のラベルの最大文字数
+MAX_SHAPE_LENGTH = 200
+
+
+def get_query_shape(sql: str) -> str:
+    """パラメーターの数によらずに同じ形状となるように、SQLを正規化する。
+
+    `IN (%s, %s, ...)`や複数行の`VALUES`のプレースホルダーを1つの`%s`にまとめて、数値のリテラルを`?`に
+    置き換える。
+
+    Args:
+        sql: SQL。
+    Returns:
+        クエリの形状。
+    """
+    shape = re.sub(r"\s+", " ", sql).strip()
+    shape = re.sub(r"\b\d+\b", "?", shape)
+    shape = re.sub(r"%s(, %s)+", "%s", shape)
+    shape = re.sub(r"\(%s\)(, \(%s\))+", "(%s)", shape)
+    return shape[:MAX_SHAPE_LENGTH]
+
+
+class MetricsRegistry:
+    """メトリクスレジストリ
+
+    ヒストグラムをプロセス内に記録する。`directory`が指定された場合は、一定の間隔でプロセスごとの
+    ファイルに書き込み、収集するときにディレクトリ内のすべてのファイルを合計することで、複数の
+    プロセス(WSGIサーバーのワーカーなど)のメトリクスを集計する。
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        flush_interval: float = 5.0,
+        pid: Optional[int] = None,
+    ) -> None:
+        """イニシャライザ
+
+        Args:
+            directory: プロセス間でメトリクスを共有するディレクトリ。Noneの場合は共有しない。
+            flush_interval: メトリクスをファイルに書き込む間隔(秒)。
+            pid: ファイル名に使用するプロセスID。Noneの場合は現在のプロセスID。
+        """
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self.pid = pid
+        # ヒストグラムの名前とラベルをキー、バケットごとの観測数、合計及び観測数を値とした辞書
+        self._series: Dict[str, Dict[Labels, List[float]]] = {}
+        self._lock = threading.Lock()
+        self._flushed_at = 0.0
+
+    @property
+    def path(self) -> Optional[Path]:
+        """このプロセスのメトリクスを書き込むファイルのパス"""
+        if self.directory is None:
+            return None
+        return self.directory / f"metrics-{self.pid or os.getpid()}.json"
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """ヒストグラムに値を記録する。
+
+        Args:
+            name: ヒストグラムの名前。
+            value: 観測した値。
+            labels: ラベル。
+        """
+        buckets = HISTOGRAMS[name][1]
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0.0] * (len(buckets) + 3)
+            # 値以上の最小のバケット(バケットを超える場合は+Inf)に加算して、出力するときに累積
+            values[bisect.bisect_left(buckets, value)] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    def flush(self, force: bool = False) -> None:
+        """前回の書き込みから一定の時間が経過した場合に、メトリクスをファイルに書き込む。
+
+        Args:
+            force: 経過時間によらず書き込む場合は`True`。
+        """
+        path = self.path
+        now = time.monotonic()
+        if path is None or (not force and now - self._flushed_at < self.flush_interval):
+            return
+        self._flushed_at = now
+        with self._lock:
+            data = {
+                name: [
+                    [[list(label) for label in key], values]
+                    for key, values in series.items()
+                ]
+                for name, series in self._series.items()
+            }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 読み込み中のプロセスが書き込み途中のファイルを読み込まないように、置き換えて書き込む
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def _load(self) -> Iterable[Dict[str, Dict[Labels, List[float]]]]:
+        """他のプロセスがファイルに書き込んだメトリクスを読み込む。
+
+        終了したプロセスのファイルは、ワーカーの再起動のたびにファイルが増えないように削除する。
+        削除したプロセスのメトリクスは合計から除かれるため、Prometheusはカウンターのリセットとして
+        扱う。
+        """
+        if self.directory is None or not self.directory.exists():
+            return
+        for path in self.directory.glob("metrics-*.json"):
+            if path == self.path:
+                continue
+            pid = path.stem.split("-", 1)[1]
+            if pid.isdigit() and not _is_process_alive(int(pid)):
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            yield {
+                name: {
+                    tuple(tuple(pair) for pair in key): values  # type: ignore
+                    for key, values in series
+                }
+                for name, series in data.items()
+            }
+
+    def collect(self) -> Dict[str, Dict[Labels, List[float]]]:
+        """すべてのプロセスのメトリクスを合計する。
+
+        Returns:
+            ヒストグラムの名前とラベルをキー、バケットごとの観測数、合計及び観測数を値とした辞書。
+        """
+        with self._lock:
+            merged = {
+                name: {key: list(values) for key, values in series.items()}
+                for name, series in self._series.items()
+            }
+        for data in self._load():
+            for name, series in data.items():
+                target = merged.setdefault(name, {})
+                for key, values in series.items():
+                    if key in target:
+                        target[key] = [a + b for a, b in zip(target[key], values)]
+                    else:
+                        target[key] = list(values)
+        return merged
+
+    def render(self) -> str:
+        """すべてのプロセスのメトリクスをPrometheusのテキスト形式で出力する。
+
+        Returns:
+            Prometheusのテキスト形式のメトリクス。
+        """
+        collected = self.collect()
+        lines: List[str] = []
+        for name, (description, buckets) in HISTOGRAMS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, values in sorted(collected.get(name, {}).items()):
+                pairs = [f'{k}="{_escape(v)}"' for k, v in key]
+                cumulative = 0.0
+                for bound, count in zip([*buckets, math.inf], values):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else _format(bound)
+                    labels = ",".join([*pairs, f'le="{le}"'])
+                    lines.append(f"{name}_bucket{{{labels}}} {_format(cumulative)}")
+                labels = f"{{{','.join(pairs)}}}" if pairs else ""
+                lines.append(f"{name}_sum{labels} {_format(values[-2])}")
+                lines.append(f"{name}_count{labels} {_format(values[-1])}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """このプロセスのメトリクスを破棄する。"""
+        with self._lock:
+            self._series.clear()
+
+
+def _is_process_alive(pid: int) -> bool:
+    """プロセスが実行中か確認する。
+
+    シグナルを送信できないプラットフォームでは、常に実行中とみなす。
+
+    Args:
+        pid: プロセスID。
+    Returns:
+        プロセスが実行中の場合はTrue。
+    """
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 他のユーザーのプロセスは実行中
+        return True
+    return True
+
+
+def _escape(value: str) -> str:
+    """Prometheusのラベルの値をエスケープする。"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    """Prometheusの値を出力する。整数の場合は小数点以下を出力しない。"""
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class MetricsQueryCounter(QueryCounter):
+    """クエリの形状ごとに実行時間をメトリクスに記録するデータベースクエリ計測器"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        """イニシャライザ
+
+        Args:
+            registry: メトリクスレジストリ。
+        """
+        super().__init__()
+        self.registry = registry
+
+    def record(self, sql: str, seconds: float) -> None:
+        super().record(sql, seconds)
+        self.registry.observe(
+            "db_query_duration_seconds", seconds, shape=get_query_shape(sql)
+        )
+
+
+# メトリクスレジストリ
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> MetricsRegistry:
+    """設定に従って作成したメトリクスレジストリを返却する。
+
+    Returns:
+        メトリクスレジストリ。
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry(
+                    settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL
+                )
+    return _registry
@@ -0,0 +1,307 @@
+import hashlib
+import logging
+import random
+import re
+import time
+from typing import Any, Callable, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponseBase
+from django.template.response import SimpleTemplateResponse, TemplateResponse
+
+from .db import QueryCounter, count_queries
+from .metrics import MetricsQueryCounter, get_registry
+from .routers import read_from_replicas
+from .timings import RequestTimings, collect_timings, get_timings
+
+logger = logging.getLogger(__name__)
+
+# 安全なメソッド
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _get_pin_key(credential: str) -> str:
+    """クライアントをプライマリに固定していることを示すキャッシュのキーを返却する。
+
+    Args:
+        credential: クライアントを識別する資格情報(トークンまたはセッションキー)。
+    Returns:
+        キャッシュのキー。
+    """
+    digest = hashlib.md5(credential.encode("utf-8"), usedforsecurity=False)
+    return f"replica-pin:{digest.hexdigest()}"
+
+
+def _get_credentials(
+    request: HttpRequest, response: Optional[HttpResponseBase] = None
+) -> List[str]:
+    """リクエストを送信したクライアントを識別する資格情報を返却する。
+
+    Args:
+        request: リクエストインスタンス。
+        response: レスポンス。ログインなどでセッションキーを変更した場合は、変更後のセッションキーも
+            返却する。
+    Returns:
+        `Authorization`ヘッダーとセッションキーのリスト。
+    """
+    credentials = []
+    authorization = request.META.get("HTTP_AUTHORIZATION")
+    if authorization:
+        credentials.append(authorization)
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key:
+        credentials.append(session_key)
+    if response is not None and settings.SESSION_COOKIE_NAME in response.cookies:
+        credentials.append(response.cookies[settings.SESSION_COOKIE_NAME].value)
+    return [credential for credential in credentials if credential]
+
+
+class ReplicaRoutingMiddleware:
+    """安全なメソッドのリクエストの読み込みを、リードレプリカに振り分けるミドルウェア
+
+    書き込んだ直後のリクエストでリードレプリカから古いデータを読み込まないように、安全でない
+    メソッドのリクエストを送信したクライアント(トークンまたはセッション)を、
+    `DATABASE_REPLICA_PIN_SECONDS`設定の秒数だけプライマリに固定する。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        """イニシャライザ
+
+        Args:
+            get_response: 次のミドルウェアまたはビューを呼び出す関数。
+        """
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def use_replicas(self, request: HttpRequest) -> bool:
+        """リクエストの読み込みをリードレプリカに振り分けるか判定する。
+
+        Args:
+            request: リクエストインスタンス。
+        Returns:
+            リードレプリカに振り分ける場合は`True`。
+        """
+        if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS:
+            return False
+        keys = [_get_pin_key(c) for c in _get_credentials(request)]
+        return not keys or not cache.get_many(keys)
+
+    def pin(self, request: HttpRequest, response: HttpResponseBase) -> None:
+        """安全でないメソッドのリクエストを送信したクライアントを、プライマリに固定する。
+
+        Args:
+            request: リクエストインスタンス。
+            response: レスポンス。
+        """
+        if not settings.DATABASE_REPLICAS or request.method in SAFE_METHODS:
+            return
+        cache.set_many(
+            {_get_pin_key(c): True for c in _get_credentials(request, response)},
+            settings.DATABASE_REPLICA_PIN_SECONDS,
+        )
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with read_from_replicas(self.use_replicas(request)):
+            response = self.get_response(request)
+        self.pin(request, response)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> Any:
+        with read_from_replicas(self.use_replicas(request)):
+            response = await self.get_response(request)
+        self.pin(request, response)
+        return response
+
+
+class ServerTimingMiddleware:
+    """リクエストの処理に要した時間を計測して、`Server-Timing`ヘッダーとログで報告するミドルウェア
+
+    `SERVER_TIMING_PATHS`設定の正規表現と一致するパスのリクエストと、`SERVER_TIMING_SAMPLE_RATE`
+    設定の割合で無作為に抽出したリクエストを計測する。
+    データベースのクエリの数と実行時間(`db`)、シリアライズ(`serialize`)、JSONのレンダリング
+    (`render`)、テンプレートのレンダリング(`template`)及びリクエスト全体(`total`)に要した時間を
+    報告する。すべてのミドルウェアを含めて計測するため、最初のミドルウェアとして配置する。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        """イニシャライザ
+
+        Args:
+            get_response: 次のミドルウェアまたはビューを呼び出す関数。
+        """
+        self.get_response = get_response
+        self.paths = [re.compile(p) for p in settings.SERVER_TIMING_PATHS]
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def should_measure(self, request: HttpRequest) -> bool:
+        """リクエストを計測するか判定する。
+
+        Args:
+            request: リクエストインスタンス。
+        Returns:
+            計測する場合は`True`。
+        """
+        if any(p.search(request.path) for p in self.paths):
+            return True
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        return 0 < rate and random.random() < rate
+
+    def process_template_response(
+        self, request: HttpRequest, response: SimpleTemplateResponse
+    ) -> SimpleTemplateResponse:
+        timings = get_timings()
+        # Django REST frameworkのレスポンスはテンプレートを使用しないため、レンダラーで計測
+        if timings is not None and isinstance(response, TemplateResponse):
+            # テンプレートレスポンスは、この直後にレンダリングされる
+            start = time.perf_counter()
+            response.add_post_render_callback(
+                lambda _: timings.add("template", time.perf_counter() - start)
+            )
+        return response
+
+    def report(
+        self,
+        request: HttpRequest,
+        response: HttpResponseBase,
+        timings: RequestTimings,
+        counter: QueryCounter,
+        total: float,
+    ) -> None:
+        """計測結果を`Server-Timing`ヘッダーに設定して、ログに記録する。
+
+        Args:
+            request: リクエストインスタンス。
+            response: レスポンス。
+            timings: リクエストの処理の段階ごとに要した時間。
+            counter: データベースクエリ計測器。
+            total: リクエスト全体に要した時間(秒)。
+        """
+        metrics = [
+            f'db;dur={counter.duration * 1000:.2f};desc="{counter.count} queries"'
+        ]
+        metrics += [
+            f"{name};dur={seconds * 1000:.2f}"
+            for name, seconds in timings.durations.items()
+        ]
+        metrics.append(f"total;dur={total * 1000:.2f}")
+        if response.has_header("Server-Timing"):
+            metrics.insert(0, response["Server-Timing"])
+        response["Server-Timing"] = ", ".join(metrics)
+        values = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "db_queries": counter.count,
+            "db_ms": round(counter.duration * 1000, 2),
+            **{
+                f"{name}_ms": round(seconds * 1000, 2)
+                for name, seconds in timings.durations.items()
+            },
+            "total_ms": round(total * 1000, 2),
+        }
+        logger.info(
+            " ".join(f"{key}={value}" for key, value in values.items()),
+            extra={"timings": values},
+        )
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.should_measure(request):
+            return self.get_response(request)
+        start = time.perf_counter()
+        with collect_timings() as timings, count_queries() as counter:
+            response = self.get_response(request)
+        self.report(request, response, timings, counter, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> Any:
+        if not self.should_measure(request):
+            return await self.get_response(request)
+        start = time.perf_counter()
+        with collect_timings() as timings, count_queries() as counter:
+            response = await self.get_response(request)
+        self.report(request, response, timings, counter, time.perf_counter() - start)
+        return response
+
+
+class MetricsMiddleware:
+    """リクエストのメトリクスを記録するミドルウェア
+
+    URLの名前(名前がない場合はビューのパス)とメソッドごとに、リクエストの処理に要した時間、
+    実行したクエリの数及びレスポンスボディのバイト数のヒストグラムを記録して、クエリの形状ごとに
+    クエリの実行に要した時間のヒストグラムを記録する。
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        """イニシャライザ
+
+        Args:
+            get_response: 次のミドルウェアまたはビューを呼び出す関数。
+        """
+        self.get_response = get_response
+        self.registry = get_registry()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def record(
+        self,
+        request: HttpRequest,
+        response: HttpResponseBase,
+        counter: QueryCounter,
+        seconds: float,
+    ) -> None:
+        """リクエストのメトリクスを記録する。
+
+        Args:
+            request: リクエストインスタンス。
+            response: レスポンス。
+            counter: データベースクエリ計測器。
+            seconds: リクエストの処理に要した時間(秒)。
+        """
+        match = getattr(request, "resolver_match", None)
+        labels = {
+            "view": match.view_name if match is not None else "<unresolved>",
+            "method": request.method or "",
+        }
+        registry = self.registry
+        registry.observe("http_request_duration_seconds", seconds, **labels)
+        registry.observe("http_request_db_queries", counter.count, **labels)
+        if not response.streaming:
+            registry.observe(
+                "http_response_size_bytes",
+                len(response.content),  # type: ignore
+                **labels,
+            )
+        registry.flush()
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with count_queries(MetricsQueryCounter(self.registry)) as counter:
+            response = self.get_response(request)
+        self.record(request, response, counter, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> Any:
+        start = time.perf_counter()
+        with count_queries(MetricsQueryCounter(self.registry)) as counter:
+            response = await self.get_response(request)
+        self.record(request, response, counter, time.perf_counter() - start)
+        return response
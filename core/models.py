@@ -1,3 +1,6 @@
+from typing import Any, Dict, List, Tuple
+
+import ulid
 from django.db import models
 
 
@@ -14,11 +17,70 @@ class TimestampModel(models.Model):
 
 
 class ULIDField(models.CharField):
-    """ULIDモデルフィールド"""
+    """ULIDモデルフィールド
+
+    モデルインスタンスでは、ULIDを26文字の文字列で表現する。
+    `binary`が`True`の場合は、ULIDを16バイトのバイナリでデータベースに保存する。バイナリは文字列と同じ
+    順序で並ぶため、主キーの範囲検索やキーセットページネーションの結果は変わらない。
+    """
 
-    def __init__(self, *args, **kwargs) -> None:
+    def __init__(self, *args, binary: bool = False, **kwargs) -> None:
         kwargs["max_length"] = 26
+        self.binary = binary
         super().__init__(*args, **kwargs)
 
+    def deconstruct(self) -> Tuple[str, str, List[Any], Dict[str, Any]]:
+        name, path, args, kwargs = super().deconstruct()
+        if self.binary:
+            kwargs["binary"] = True
+        return name, path, args, kwargs
+
     def db_type(self, connection) -> str:
-        return "char(26)"
+        if not self.binary:
+            return "char(26)"
+        if connection.vendor == "sqlite":
+            return "blob"
+        if connection.vendor == "postgresql":
+            return "bytea"
+        return "binary(16)"
+
+    def get_default(self) -> Any:
+        # データベースから読み込んだ値と同様に、既定値も文字列で表現
+        return self.to_python(super().get_default())
+
+    def from_db_value(self, value: Any, expression, connection) -> Any:
+        return self.to_python(value)
+
+    def to_python(self, value: Any) -> Any:
+        if isinstance(value, (bytes, memoryview)):
+            return str(ulid.ULID.from_bytes(bytes(value)))
+        return super().to_python(value)
+
+    def get_prep_value(self, value: Any) -> Any:
+        value = super().get_prep_value(value)
+        if value is None or not self.binary:
+            return value
+        try:
+            return ulid.ULID.from_str(value).bytes
+        except ValueError:
+            # ULIDでない値は、バイナリのULIDと一致しない文字列のまま比較する
+            return value
+
+
+class FullTextSearchField(models.TextField):
+    """SQLiteのFTS5仮想テーブルで、テーブル名と同じ名前の隠し列を表すモデルフィールド
+
+    `match`ルックアップで、仮想テーブルのすべての列を全文検索する。
+    """
+
+
+@FullTextSearchField.register_lookup
+class Match(models.Lookup):
+    """FTS5仮想テーブルを全文検索するルックアップ"""
+
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection) -> Tuple[str, List[Any]]:
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
@@ -0,0 +1,75 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional, Type
+
+from django.conf import settings
+from django.db import models
+
+# リードレプリカから読み込むか
+_read_from_replicas: ContextVar[bool] = ContextVar("read_from_replicas", default=False)
+
+
+@contextmanager
+def read_from_replicas(enabled: bool = True) -> Iterator[None]:
+    """コンテキスト内の読み込みを、リードレプリカから読み込むか指定するコンテキストマネージャー。
+
+    Args:
+        enabled: リードレプリカから読み込む場合は`True`。
+    """
+    token = _read_from_replicas.set(enabled)
+    try:
+        yield
+    finally:
+        _read_from_replicas.reset(token)
+
+
+class ReplicaRouter:
+    """リードレプリカデータベースルーター
+
+    `read_from_replicas`コンテキスト内(安全なメソッドのリクエストなど)の読み込みを、
+    `DATABASE_REPLICAS`設定のデータベースエイリアスから無作為に選択したリードレプリカに振り分けて、
+    その他の読み込みとすべての書き込みをプライマリ(`default`)に振り分ける。
+    セッションは書き込んだ直後に読み込むため、常にプライマリから読み込む。
+    """
+
+    # プライマリのデータベースエイリアス
+    primary = "default"
+    # 常にプライマリから読み込むアプリラベル
+    primary_app_labels = {"sessions"}
+
+    def get_replicas(self) -> Any:
+        """リードレプリカのデータベースエイリアスを返却する。
+
+        Returns:
+            リードレプリカのデータベースエイリアスのリスト。
+        """
+        return settings.DATABASE_REPLICAS
+
+    def db_for_read(self, model: Type[models.Model], **hints: Any) -> Optional[str]:
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # 関連モデルは、モデルインスタンスを読み込んだデータベースから読み込む
+            return instance._state.db
+        replicas = self.get_replicas()
+        if (
+            not replicas
+            or not _read_from_replicas.get()
+            or model._meta.app_label in self.primary_app_labels
+        ):
+            return self.primary
+        return random.choice(replicas)
+
+    def db_for_write(self, model: Type[models.Model], **hints: Any) -> Optional[str]:
+        return self.primary
+
+    def allow_relation(
+        self, obj1: models.Model, obj2: models.Model, **hints: Any
+    ) -> bool:
+        # リードレプリカはプライマリの複製のため、どのデータベースのモデルインスタンスも関連付けられる
+        databases = {self.primary, *self.get_replicas()}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db: str, app_label: str, **hints: Any) -> bool:
+        # リードレプリカはプライマリを複製して更新
+        return db not in self.get_replicas()
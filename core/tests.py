@@ -0,0 +1,337 @@
+import asyncio
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, router
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from accounts.models import User
+from book_management.cache import get_cache_config
+from books.models import Book
+from divisions.models import Division
+
+from .caches import CodeCache, TableVersion
+from .db import backup_sqlite, count_queries
+from .metrics import MetricsRegistry, get_query_shape, get_registry
+from .middleware import ReplicaRoutingMiddleware
+from .routers import read_from_replicas
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 1024 * 1024,
+    "busy_timeout": 5000,
+}
+
+
+class ConfigureSQLiteTest(SimpleTestCase):
+    """SQLiteのPRAGMAを設定するシグナルハンドラーのテスト"""
+
+    @override_settings(SQLITE_PRAGMAS=PRAGMAS)
+    def test_pragmas(self) -> None:
+        """接続を作成したときに`SQLITE_PRAGMAS`設定のPRAGMAを設定することを確認する。"""
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {
+                **connections["default"].settings_dict,
+                "NAME": str(Path(directory) / "db.sqlite3"),
+            }
+            wrapper = type(connections["default"])(settings_dict, alias="pragmas")
+            try:
+                with wrapper.cursor() as cursor:
+                    values = {}
+                    for name in PRAGMAS:
+                        cursor.execute(f"PRAGMA {name}")
+                        values[name] = cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+        # `synchronous`は数値で返却される(NORMALは1)
+        self.assertEqual(
+            values,
+            {
+                "journal_mode": "wal",
+                "synchronous": 1,
+                "mmap_size": 1024 * 1024,
+                "busy_timeout": 5000,
+            },
+        )
+
+
+@override_settings(DATABASE_REPLICAS=["replica1", "replica2"])
+class ReplicaRouterTest(SimpleTestCase):
+    """リードレプリカデータベースルーターのテスト"""
+
+    def tearDown(self) -> None:
+        cache.clear()
+
+    def test_route(self) -> None:
+        """コンテキスト内の読み込みのみをリードレプリカに振り分けることを確認する。"""
+        self.assertEqual(router.db_for_read(Book), "default")
+        with read_from_replicas():
+            self.assertIn(router.db_for_read(Book), ["replica1", "replica2"])
+            self.assertEqual(router.db_for_write(Book), "default")
+            book = Book(title="book")
+            book._state.db = "default"
+            self.assertEqual(router.db_for_read(Book, instance=book), "default")
+            with read_from_replicas(False):
+                self.assertEqual(router.db_for_read(Book), "default")
+        self.assertFalse(router.allow_migrate("replica1", "books"))
+
+    def test_read_your_writes(self) -> None:
+        """書き込んだクライアントの読み込みをプライマリに振り分けることを確認する。"""
+
+        def view(request: HttpRequest) -> HttpResponse:
+            return HttpResponse(router.db_for_read(Book))
+
+        middleware = ReplicaRoutingMiddleware(view)
+        factory = RequestFactory()
+        writer = {"Authorization": "Bearer writer"}
+        reader = {"Authorization": "Bearer reader"}
+        self.assertNotEqual(
+            middleware(factory.get("/", headers=writer)).content, b"default"
+        )
+        self.assertEqual(
+            middleware(factory.post("/", headers=writer)).content, b"default"
+        )
+        self.assertEqual(
+            middleware(factory.get("/", headers=writer)).content, b"default"
+        )
+        self.assertNotEqual(
+            middleware(factory.get("/", headers=reader)).content, b"default"
+        )
+
+
+class BackupSQLiteTest(SimpleTestCase):
+    """SQLiteのデータベースを複製する関数のテスト"""
+
+    def test_backup(self) -> None:
+        """データベースをファイルに複製することを確認する。"""
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {
+                **connections["default"].settings_dict,
+                "NAME": str(Path(directory) / "primary.sqlite3"),
+            }
+            primary = type(connections["default"])(settings_dict, alias="primary")
+            replica = str(Path(directory) / "replica.sqlite3")
+            try:
+                with primary.cursor() as cursor:
+                    cursor.execute("CREATE TABLE t (v INTEGER)")
+                    cursor.execute("INSERT INTO t VALUES (1)")
+                backup_sqlite(primary, replica)
+                with primary.cursor() as cursor:
+                    cursor.execute("INSERT INTO t VALUES (2)")
+                backup_sqlite(primary, replica, pages=1)
+            finally:
+                primary.close()
+            target = sqlite3.connect(replica)
+            try:
+                rows = target.execute("SELECT v FROM t ORDER BY v").fetchall()
+            finally:
+                target.close()
+        self.assertEqual(rows, [(1,), (2,)])
+
+
+class ServerTimingMiddlewareTest(TestCase):
+    """処理時間を報告するミドルウェアのテスト"""
+
+    fixtures = ["divisions", "classifications", "classification_details", "books"]
+
+    def _metrics(self, header: str) -> Dict[str, str]:
+        return dict(metric.split(";", 1) for metric in header.split(", "))
+
+    @override_settings(SERVER_TIMING_PATHS=[r"^/api1/books/$"])
+    def test_api(self) -> None:
+        """APIのクエリ、シリアライズ及びレンダリングに要した時間を報告することを確認する。"""
+        with self.assertLogs("core.middleware", "INFO") as logs:
+            response = self.client.get("/api1/books/")
+        metrics = self._metrics(response["Server-Timing"])
+        self.assertEqual(list(metrics), ["db", "serialize", "render", "total"], metrics)
+        self.assertIn('desc="1 queries"', metrics["db"])
+        self.assertIn("path=/api1/books/ status=200 db_queries=1", logs.output[0])
+        response = self.client.get("/api1/books/classifications/")
+        self.assertFalse(response.has_header("Server-Timing"))
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_template(self) -> None:
+        """テンプレートのレンダリングに要した時間を報告することを確認する。"""
+        user = User.objects.create_user("user@example.com", "password", name="user")
+        self.client.force_login(user)
+        with self.assertLogs("core.middleware", "INFO"):
+            response = self.client.get("/books/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("template", self._metrics(response["Server-Timing"]))
+
+    @override_settings(SERVER_TIMING_PATHS=[r"^/api1/async/"])
+    async def test_async(self) -> None:
+        """非同期ビューのクエリを計測することを確認する。"""
+        response = await self.async_client.get(
+            "/api1/async/books/01GYV46C5KXWDRKMB1WR3TW6RK/"
+        )
+        metrics = self._metrics(response["Server-Timing"])
+        self.assertIn('desc="1 queries"', metrics["db"])
+        self.assertIn("serialize", metrics)
+
+    async def test_concurrent_async(self) -> None:
+        """同じデータベース接続を共有する並行したリクエストのクエリを区別することを確認する。"""
+
+        async def request(n: int) -> int:
+            with count_queries() as counter:
+                for _ in range(n):
+                    await sync_to_async(Book.objects.count)()
+                    await asyncio.sleep(0)
+            return counter.count
+
+        self.assertEqual(await asyncio.gather(request(1), request(3)), [1, 3])
+
+
+class MetricsTest(TestCase):
+    """メトリクスのテスト"""
+
+    fixtures = ["divisions", "classifications", "classification_details", "books"]
+
+    def setUp(self) -> None:
+        get_registry().clear()
+
+    def test_endpoint(self) -> None:
+        """ビューとメソッドごとのメトリクスをPrometheusのテキスト形式で返却することを確認する。"""
+        self.client.get("/api1/books/")
+        self.client.get("/api1/books/")
+        staff = User.objects.create_user(
+            "staff@example.com", "password", name="staff", is_staff=True
+        )
+        self.client.force_login(staff)
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        labels = 'method="GET",view="book-list"'
+        self.assertIn(f"http_request_duration_seconds_count{{{labels}}} 2", content)
+        self.assertIn(f'http_request_db_queries_bucket{{{labels},le="0"}} 0', content)
+        self.assertIn(f'http_request_db_queries_bucket{{{labels},le="1"}} 2', content)
+        self.assertIn(f"http_response_size_bytes_count{{{labels}}} 2", content)
+        self.assertIn('db_query_duration_seconds_count{shape="SELECT', content)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_endpoint_access(self) -> None:
+        """スタッフユーザーまたはトークンを送信したリクエストのみ取得できることを確認する。"""
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        user = User.objects.create_user("user@example.com", "password", name="user")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.client.logout()
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer invalid")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+
+    async def test_async(self) -> None:
+        """並行した非同期ビューのリクエストのクエリの数を、リクエストごとに記録することを確認する。"""
+        url = "/api1/async/books/01GYV46C5KXWDRKMB1WR3TW6RK/"
+        await asyncio.gather(*[self.async_client.get(url) for _ in range(3)])
+        content = get_registry().render()
+        labels = 'method="GET",view="api1.books.views.AsyncBookRetrieveView"'
+        self.assertIn(f'http_request_db_queries_bucket{{{labels},le="0"}} 0', content)
+        self.assertIn(f'http_request_db_queries_bucket{{{labels},le="1"}} 3', content)
+
+    def test_multi_process(self) -> None:
+        """ディレクトリを共有するプロセスのメトリクスを合計することを確認する。"""
+        with tempfile.TemporaryDirectory() as directory:
+            worker = MetricsRegistry(directory, pid=1)
+            worker.observe("http_request_duration_seconds", 0.2, view="v", method="GET")
+            worker.flush(force=True)
+            scraper = MetricsRegistry(directory, pid=2)
+            scraper.observe("http_request_duration_seconds", 3, view="v", method="GET")
+            content = scraper.render()
+        labels = 'method="GET",view="v"'
+        self.assertIn(
+            f'http_request_duration_seconds_bucket{{{labels},le="0.25"}} 1', content
+        )
+        self.assertIn(
+            f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', content
+        )
+        self.assertIn(f"http_request_duration_seconds_sum{{{labels}}} 3.2", content)
+
+    def test_prune_dead_process(self) -> None:
+        """終了したプロセスのファイルを削除することを確認する。"""
+        process = subprocess.run(
+            [sys.executable, "-c", "import os; print(os.getpid())"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        pid = int(process.stdout)
+        with tempfile.TemporaryDirectory() as directory:
+            worker = MetricsRegistry(directory, pid=pid)
+            worker.observe("http_request_duration_seconds", 0.2, view="v", method="GET")
+            worker.flush(force=True)
+            path = Path(directory) / f"metrics-{pid}.json"
+            self.assertTrue(path.exists())
+            content = MetricsRegistry(directory).render()
+            self.assertFalse(path.exists())
+        self.assertNotIn('view="v"', content)
+
+    def test_query_shape(self) -> None:
+        """パラメーターの数によらずに同じクエリの形状となることを確認する。"""
+        self.assertEqual(
+            get_query_shape(
+                'SELECT * FROM "books" WHERE "id" IN (%s, %s, %s) LIMIT 21'
+            ),
+            get_query_shape('SELECT *\nFROM "books" WHERE "id" IN (%s) LIMIT 100'),
+        )
+
+
+class SharedCacheTest(TestCase):
+    """ワーカープロセス間でキャッシュを共有するテスト"""
+
+    fixtures = ["divisions"]
+
+    def test_cache_config(self) -> None:
+        """キャッシュのURLから、プロセス間で共有するキャッシュの設定を作成することを確認する。"""
+        config = get_cache_config("redis://cache:6379/1")
+        self.assertEqual(
+            config["BACKEND"], "django.core.cache.backends.redis.RedisCache"
+        )
+        self.assertEqual(config["LOCATION"], "redis://cache:6379/1")
+        config = get_cache_config("memcached://cache1:11211,cache2:11211")
+        self.assertEqual(
+            config["BACKEND"], "django.core.cache.backends.memcached.PyMemcacheCache"
+        )
+        self.assertEqual(config["LOCATION"], ["cache1:11211", "cache2:11211"])
+        config = get_cache_config("", max_entries=100)
+        self.assertEqual(config["OPTIONS"], {"MAX_ENTRIES": 100})
+        with self.assertRaises(ImproperlyConfigured):
+            get_cache_config("file:///tmp/cache")
+
+    def test_code_cache_invalidated_across_workers(self) -> None:
+        """あるワーカーで変更した部署を、同じディレクトリを共有する他のワーカーが読み込むことを
+        確認する。"""
+        with tempfile.TemporaryDirectory() as directory:
+            # 同じディレクトリを共有する、ワーカーごとのファイルキャッシュとコードキャッシュ
+            shared = [FileBasedCache(directory, {}), FileBasedCache(directory, {})]
+            workers = [CodeCache(Division), CodeCache(Division)]
+            for backend, worker in zip(shared, workers):
+                with mock.patch("core.caches.cache", backend):
+                    self.assertEqual(worker.get("58").name, "ICT開発室")
+            division = Division.objects.get(pk="58")
+            division.name = "情報システム室"
+            with mock.patch("core.caches.cache", shared[0]):
+                with self.captureOnCommitCallbacks(execute=True):
+                    division.save()
+                    workers[0].invalidate()
+            with mock.patch("core.caches.cache", shared[1]):
+                self.assertEqual(workers[1].get("58").name, "情報システム室")
+            # テーブルのバージョンも、他のワーカーのキャッシュから参照できる
+            version = TableVersion.for_model(Division)
+            with mock.patch("core.caches.cache", shared[0]):
+                version.invalidate()
+                updated = version.version
+            with mock.patch("core.caches.cache", shared[1]):
+                self.assertEqual(version.version, updated)
@@ -0,0 +1,72 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+
+class RequestTimings:
+    """リクエストの処理の段階ごとに要した時間"""
+
+    def __init__(self) -> None:
+        """イニシャライザ"""
+        # 段階の名前と、要した時間(秒)の辞書
+        self.durations: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        """段階に要した時間を加算する。
+
+        Args:
+            name: 段階の名前。
+            seconds: 要した時間(秒)。
+        """
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+
+# 計測中のリクエストの処理に要した時間
+_current: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def get_timings() -> Optional[RequestTimings]:
+    """計測中のリクエストの処理に要した時間を返却する。
+
+    Returns:
+        リクエストの処理に要した時間。計測していない場合はNone。
+    """
+    return _current.get()
+
+
+@contextmanager
+def collect_timings() -> Iterator[RequestTimings]:
+    """コンテキスト内の処理に要した時間を計測するコンテキストマネージャー。
+
+    Yields:
+        リクエストの処理に要した時間。
+    """
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timer(name: str) -> Iterator[None]:
+    """コンテキスト内の処理に要した時間を、計測中のリクエストの段階に加算するコンテキストマネージャー。
+
+    リクエストを計測していない場合は何もしない。
+
+    Args:
+        name: 段階の名前。
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+
+import ulid
+from django.utils import timezone
+
+# ULIDのタイムスタンプ部分のバイト数
+TIMESTAMP_BYTES = 6
+# ULIDのランダム部分のバイト数
+RANDOMNESS_BYTES = 10
+# ULIDのランダム部分の最大値
+MAX_RANDOMNESS = (1 << (RANDOMNESS_BYTES * 8)) - 1
+
+
+class MonotonicULIDGenerator:
+    """単調増加するULIDを生成するジェネレーター
+
+    同じミリ秒にULIDを生成した場合は、直前のULIDのランダム部分に1を加えることで、生成した順に
+    ULIDが大きくなることを保証する。連続して登録する行の主キーが常にB-treeの末尾に追加されるため、
+    ページの分割が発生しない。
+    """
+
+    def __init__(self) -> None:
+        """イニシャライザ"""
+        self._lock = threading.Lock()
+        self._milliseconds = -1
+        self._randomness = 0
+
+    def generate(self) -> ulid.ULID:
+        """ULIDを生成する。
+
+        Returns:
+            直前に生成したULIDより大きいULID。
+        """
+        with self._lock:
+            milliseconds = time.time_ns() // 1_000_000
+            if milliseconds <= self._milliseconds:
+                # 同じミリ秒(または時計の巻き戻り)の場合は、直前のULIDに1を加える
+                milliseconds = self._milliseconds
+                self._randomness += 1
+                if MAX_RANDOMNESS < self._randomness:
+                    milliseconds += 1
+                    self._randomness = 0
+            else:
+                self._randomness = int.from_bytes(os.urandom(RANDOMNESS_BYTES), "big")
+            self._milliseconds = milliseconds
+            return ulid.ULID.from_bytes(
+                milliseconds.to_bytes(TIMESTAMP_BYTES, "big")
+                + self._randomness.to_bytes(RANDOMNESS_BYTES, "big")
+            )
+
+
+# プロセスで共有する単調増加ULIDジェネレーター
+_generator = MonotonicULIDGenerator()
+
+
+def monotonic_ulid() -> ulid.ULID:
+    """プロセス内で単調増加するULIDを生成する。
+
+    Returns:
+        ULID。
+    """
+    return _generator.generate()
+
+
+def _bound(moment: datetime, randomness: int) -> str:
+    """日時をタイムスタンプとしたULIDの文字列を返却する。"""
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    milliseconds = int(moment.timestamp() * 1000)
+    return str(
+        ulid.ULID.from_bytes(
+            milliseconds.to_bytes(TIMESTAMP_BYTES, "big")
+            + randomness.to_bytes(RANDOMNESS_BYTES, "big")
+        )
+    )
+
+
+def ulid_range(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[Optional[str], Optional[str]]:
+    """日時の範囲に生成されたULIDの最小値と最大値を返却する。
+
+    ULIDはタイムスタンプを先頭に持つため、日時の範囲を主キーの範囲に変換できる。
+
+    Args:
+        start: 開始日時。Noneの場合は下限なし。
+        end: 終了日時(この日時を含む)。Noneの場合は上限なし。
+    Returns:
+        ULIDの最小値と最大値のタプル。
+    """
+    return (
+        _bound(start, 0) if start is not None else None,
+        _bound(end, MAX_RANDOMNESS) if end is not None else None,
+    )
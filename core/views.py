@@ -0,0 +1,44 @@
+import hmac
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpRequest, HttpResponse
+
+from .metrics import get_registry
+
+
+def has_metrics_access(request: HttpRequest) -> bool:
+    """リクエストがメトリクスを取得できるか確認する。
+
+    `METRICS_TOKEN`設定のトークンを`Authorization: Bearer`ヘッダーで送信したリクエストと、
+    スタッフユーザーのリクエストのみ取得できる。
+
+    Args:
+        request: リクエストインスタンス。
+    Returns:
+        メトリクスを取得できる場合はTrue。
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        authorization = request.headers.get("Authorization", "")
+        if hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+            return True
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """すべてのプロセスのメトリクスをPrometheusのテキスト形式で返却する。
+
+    Args:
+        request: リクエストインスタンス。
+    Returns:
+        レスポンス。
+    Exceptions:
+        PermissionDenied: メトリクスを取得できない場合。
+    """
+    if not has_metrics_access(request):
+        raise PermissionDenied
+    return HttpResponse(
+        get_registry().render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -5,3 +5,8 @@ class DivisionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "divisions"
     verbose_name = "部署アプリ"
+
+    def ready(self) -> None:
+        from .caches import division_cache
+
+        division_cache.connect()
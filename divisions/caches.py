@@ -0,0 +1,6 @@
+from core.caches import CodeCache
+
+from .models import Division
+
+# 部署コードをキー、部署モデルインスタンスを値としたキャッシュ
+division_cache = CodeCache(Division)